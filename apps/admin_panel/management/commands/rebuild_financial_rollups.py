@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from apps.admin_panel.rollups import rebuild_financial_rollups, start_watermarks_now
+from apps.payments.models import Deposit, Withdrawal
+from apps.wallets.models import Transaction
+
+class Command(BaseCommand):
+    help = 'Recompute daily financial rollups for a date range (defaults to all history)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day, YYYY-MM-DD')
+        parser.add_argument('--end', help='Last day, YYYY-MM-DD (defaults to today)')
+
+    def handle(self, *args, **options):
+        end = parse_date(options['end']) if options['end'] else timezone.localdate()
+        if options['start']:
+            start = parse_date(options['start'])
+        else:
+            # Full backfill: the incremental job only needs to pick up from here
+            start_watermarks_now()
+            firsts = [model.objects.aggregate(first=Min('created_at'))['first'] for model in (Deposit, Withdrawal, Transaction)]
+            firsts = [timezone.localdate(first) for first in firsts if first]
+            start = min(firsts) if firsts else end
+        if start is None or end is None or start > end:
+            raise CommandError('Invalid date range')
+
+        refreshed = rebuild_financial_rollups(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rollups from {start} to {end}: {refreshed}'))
@@ -0,0 +1,39 @@
+from django.db import models
+
+class DailyFinancialRollup(models.Model):
+    """Count and total of one day's deposits, withdrawals or ledger transactions per type/status/currency"""
+    SOURCE_CHOICES = [
+        ('deposit', 'Deposit'),
+        ('withdrawal', 'Withdrawal'),
+        ('transaction', 'Transaction'),
+    ]
+    
+    day = models.DateField()
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    transaction_type = models.CharField(max_length=20, blank=True)  # Ledger rows only
+    status = models.CharField(max_length=20, blank=True)            # Deposits and withdrawals only
+    currency = models.CharField(max_length=3, default='USD')
+    count = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'source', 'transaction_type', 'status', 'currency'],
+                name='unique_daily_financial_rollup'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.source} {self.transaction_type or self.status} - ${self.total}"
+
+class RollupWatermark(models.Model):
+    """How far the incremental rollup job has read each source table"""
+    source = models.CharField(max_length=20, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    last_updated_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.source} rollup watermark"
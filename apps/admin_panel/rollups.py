@@ -0,0 +1,125 @@
+from django.db import transaction
+from django.db.models import Count, Max, Sum, F
+from django.db.models.functions import TruncDate, TruncWeek, TruncMonth
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from .models import DailyFinancialRollup, RollupWatermark
+from apps.payments.models import Deposit, Withdrawal
+from apps.wallets.models import Transaction
+import logging
+
+logger = logging.getLogger(__name__)
+
+SETTLE_TIME = timedelta(minutes=1)  # Leave rows from still-open transactions to the next run
+INTERVALS = {'day': None, 'week': TruncWeek, 'month': TruncMonth}
+
+def _day_rows(source, days):
+    """Aggregate the source table for whole days, grouped the way the rollup is keyed"""
+    if source == 'transaction':
+        queryset = Transaction.objects.annotate(currency=F('wallet__currency'))
+        group_by = ['transaction_type', 'currency']
+    else:
+        queryset = (Deposit if source == 'deposit' else Withdrawal).objects.all()
+        group_by = ['status', 'currency']
+
+    rows = []
+    for day in days:
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        aggregates = (
+            queryset.filter(created_at__gte=start, created_at__lt=start + timedelta(days=1))
+            .values(*group_by)
+            .annotate(count=Count('id'), total=Sum('amount'))
+        )
+        for row in aggregates:
+            rows.append(DailyFinancialRollup(
+                day=day,
+                source=source,
+                transaction_type=row.get('transaction_type', ''),
+                status=row.get('status', ''),
+                currency=row['currency'],
+                count=row['count'],
+                total=row['total'] or 0
+            ))
+    return rows
+
+def recompute_days(source, days):
+    """Replace the rollup rows of the given days with fresh aggregates"""
+    days = sorted(set(days))
+    if not days:
+        return 0
+    with transaction.atomic():
+        DailyFinancialRollup.objects.filter(source=source, day__in=days).delete()
+        DailyFinancialRollup.objects.bulk_create(_day_rows(source, days))
+    return len(days)
+
+def _dirty_days(queryset):
+    return set(queryset.annotate(day=TruncDate('created_at')).values_list('day', flat=True).distinct())
+
+def update_financial_rollups():
+    """Recompute only the days touched since each source's watermark"""
+    cutoff = timezone.now() - SETTLE_TIME
+    refreshed = {}
+
+    # Ledger rows are immutable, so an id watermark is enough
+    watermark, _ = RollupWatermark.objects.get_or_create(source='transaction')
+    new_rows = Transaction.objects.filter(id__gt=watermark.last_id, created_at__lt=cutoff)
+    last_id = new_rows.aggregate(last=Max('id'))['last']
+    refreshed['transaction'] = 0
+    if last_id:
+        refreshed['transaction'] = recompute_days('transaction', _dirty_days(new_rows.filter(id__lte=last_id)))
+        watermark.last_id = last_id
+    # Saved on quiet runs too: rollups_as_of reads updated_at
+    watermark.save(update_fields=['last_id', 'updated_at'])
+
+    # Deposits and withdrawals change status after insert, so follow updated_at
+    for source, model in [('deposit', Deposit), ('withdrawal', Withdrawal)]:
+        watermark, _ = RollupWatermark.objects.get_or_create(source=source)
+        changed = model.objects.filter(updated_at__lt=cutoff)
+        if watermark.last_updated_at:
+            changed = changed.filter(updated_at__gte=watermark.last_updated_at)
+        refreshed[source] = recompute_days(source, _dirty_days(changed))
+        watermark.last_updated_at = cutoff
+        watermark.save(update_fields=['last_updated_at', 'updated_at'])
+
+    return refreshed
+
+def rebuild_financial_rollups(start, end):
+    """Recompute every source for a date range, e.g. for a backfill or a nightly safety pass"""
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    return {source: recompute_days(source, days) for source, _ in DailyFinancialRollup.SOURCE_CHOICES}
+
+def _rollup_rows(start, end, filters):
+    rows = DailyFinancialRollup.objects.filter(**filters)
+    if start:
+        rows = rows.filter(day__gte=start)
+    if end:
+        rows = rows.filter(day__lte=end)
+    return rows
+
+def start_watermarks_now():
+    """Point every watermark at the present, before a full rebuild covers the past"""
+    cutoff = timezone.now() - SETTLE_TIME
+    last_id = Transaction.objects.filter(created_at__lt=cutoff).aggregate(last=Max('id'))['last'] or 0
+    RollupWatermark.objects.update_or_create(source='transaction', defaults={'last_id': last_id})
+    for source in ['deposit', 'withdrawal']:
+        RollupWatermark.objects.update_or_create(source=source, defaults={'last_updated_at': cutoff})
+
+def rollup_totals(start=None, end=None, **filters):
+    """Total and count over a date range from the rollup table"""
+    totals = _rollup_rows(start, end, filters).aggregate(total=Sum('total'), count=Sum('count'))
+    return {'total': totals['total'] or 0, 'count': totals['count'] or 0}
+
+def rollup_series(interval, start=None, end=None, **filters):
+    """Per day, week or month totals, oldest period first"""
+    rows = _rollup_rows(start, end, filters)
+    trunc = INTERVALS[interval]
+    rows = rows.annotate(period=trunc('day') if trunc else F('day'))
+    return [
+        {'period': row['period'].isoformat(), 'total': float(row['total']), 'count': row['count']}
+        for row in rows.values('period').annotate(total=Sum('total'), count=Sum('count')).order_by('period')
+    ]
+
+def rollups_as_of():
+    """When the least recently advanced watermark last moved"""
+    watermark = RollupWatermark.objects.order_by('updated_at').first()
+    return watermark.updated_at if watermark else None
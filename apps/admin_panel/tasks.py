@@ -0,0 +1,20 @@
+from celery import shared_task
+from django.utils import timezone
+from datetime import timedelta
+from .rollups import update_financial_rollups, rebuild_financial_rollups
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def update_daily_financial_rollups():
+    """Fold rows written since the watermarks into the daily rollups"""
+    refreshed = update_financial_rollups()
+    return f"Refreshed rollup days: {refreshed}"
+
+@shared_task
+def rebuild_recent_financial_rollups(days=2):
+    """Safety pass for rows committed behind a watermark"""
+    today = timezone.localdate()
+    refreshed = rebuild_financial_rollups(today - timedelta(days=days), today)
+    return f"Rebuilt rollup days: {refreshed}"
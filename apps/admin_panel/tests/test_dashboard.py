@@ -0,0 +1,30 @@
+from decimal import Decimal
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.admin_panel.models import RollupWatermark
+from apps.admin_panel.rollups import rollups_as_of, update_financial_rollups
+from apps.core.ids import new_reference
+from apps.payments.models import Withdrawal
+from apps.users.models import User
+
+class AdminDashboardTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(email='admin@example.com', username='admin', password='pass', user_type='admin')
+
+    def test_pending_withdrawals_are_read_live(self):
+        update_financial_rollups()
+        Withdrawal.objects.create(
+            user=self.admin, amount=Decimal('20.00'), payment_method='bank_transfer',
+            account_details={}, transaction_id=new_reference('wd'), status='pending'
+        )
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/api/admin/dashboard/')
+        self.assertEqual(response.json()['payments']['pending_withdrawals'], 1)
+
+    def test_quiet_run_advances_every_watermark(self):
+        update_financial_rollups()
+        before = rollups_as_of()
+        update_financial_rollups()
+        self.assertEqual(RollupWatermark.objects.count(), 3)
+        self.assertGreater(rollups_as_of(), before)
@@ -13,6 +13,8 @@ from apps.referrals.models import ReferralBonus
 from django.db.models import Count, Sum, Avg
 from datetime import datetime, timedelta
 from collections import defaultdict
+from django.utils.dateparse import parse_date
+from .rollups import rollup_totals, rollup_series, rollups_as_of
 import logging
 
 User = get_user_model()
@@ -34,9 +36,10 @@ def admin_dashboard_view(request):
     active_tasks = Task.objects.filter(status='active').count()
     completed_tasks = Task.objects.filter(status='completed').count()
     
-    # Payment statistics
-    total_deposits = Deposit.objects.filter(status='completed').aggregate(total=Sum('amount'))['total'] or 0
-    total_withdrawals = Withdrawal.objects.filter(status='completed').aggregate(total=Sum('amount'))['total'] or 0
+    # Payment statistics (from the daily rollups)
+    total_deposits = rollup_totals(source='deposit', status='completed')['total']
+    total_withdrawals = rollup_totals(source='withdrawal', status='completed')['total']
+    # Read live: the queue moves faster than the rollups
     pending_withdrawals = Withdrawal.objects.filter(status='pending').count()
     
     # Revenue statistics
@@ -57,6 +60,7 @@ def admin_dashboard_view(request):
             'total_deposits': float(total_deposits),
             'total_withdrawals': float(total_withdrawals),
             'pending_withdrawals': pending_withdrawals,
+            'as_of': rollups_as_of(),
         },
         'revenue': {
             'total_earnings': float(total_earnings),
@@ -158,40 +162,34 @@ def transaction_overview_view(request):
     if request.user.user_type not in ['admin', 'moderator']:
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
     
-    # Get transaction statistics
-    deposits = Deposit.objects.filter(status='completed')
-    withdrawals = Withdrawal.objects.filter(status='completed')
-    earnings = Transaction.objects.filter(transaction_type='earning')
-    
-    deposit_stats = deposits.aggregate(
-        total=Sum('amount'),
-        count=Count('id')
-    )
-    
-    withdrawal_stats = withdrawals.aggregate(
-        total=Sum('amount'),
-        count=Count('id')
-    )
-    
-    earning_stats = earnings.aggregate(
-        total=Sum('amount'),
-        count=Count('id')
-    )
-    
-    return Response({
-        'deposits': {
-            'total': float(deposit_stats['total'] or 0),
-            'count': deposit_stats['count'] or 0,
-        },
-        'withdrawals': {
-            'total': float(withdrawal_stats['total'] or 0),
-            'count': withdrawal_stats['count'] or 0,
-        },
-        'earnings': {
-            'total': float(earning_stats['total'] or 0),
-            'count': earning_stats['count'] or 0,
+    # Optional date range and series interval
+    date_from = parse_date(request.GET.get('date_from', '')) if request.GET.get('date_from') else None
+    date_to = parse_date(request.GET.get('date_to', '')) if request.GET.get('date_to') else None
+    interval = request.GET.get('interval')
+    if (request.GET.get('date_from') and not date_from) or (request.GET.get('date_to') and not date_to):
+        return Response({'error': 'Dates must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+    if interval and interval not in ['day', 'week', 'month']:
+        return Response({'error': 'interval must be day, week or month'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Get transaction statistics from the daily rollups
+    sections = {
+        'deposits': {'source': 'deposit', 'status': 'completed'},
+        'withdrawals': {'source': 'withdrawal', 'status': 'completed'},
+        'earnings': {'source': 'transaction', 'transaction_type': 'earning'},
+    }
+    
+    overview = {}
+    for name, filters in sections.items():
+        stats = rollup_totals(date_from, date_to, **filters)
+        overview[name] = {
+            'total': float(stats['total']),
+            'count': stats['count'],
         }
-    })
+        if interval:
+            overview[name]['series'] = rollup_series(interval, date_from, date_to, **filters)
+    
+    overview['as_of'] = rollups_as_of()
+    return Response(overview)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -0,0 +1,143 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject, empty
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from .entitlements import ENTITLEMENTS_CLAIM, is_current
+import copy
+
+PRINCIPAL_CACHE_KEY = 'auth_principal_{user_id}'
+PRINCIPAL_TIMEOUT = 60  # Backstop for changes that skip User.save()
+
+PRINCIPAL_FIELDS = [
+    'id', 'email', 'username', 'user_type', 'active_role',
+    'current_freelancer_plan', 'current_client_plan',
+    'is_active', 'is_staff', 'is_superuser',
+    'is_email_verified', 'is_phone_verified', 'is_kyc_verified', 'is_account_activated',
+    'entitlements_version',
+]
+
+def _principal_key(user_id):
+    return PRINCIPAL_CACHE_KEY.format(user_id=user_id)
+
+def build_principal(user):
+    principal = {field: getattr(user, field) for field in PRINCIPAL_FIELDS}
+    if api_settings.CHECK_REVOKE_TOKEN:
+        principal['password_hash'] = get_md5_hash_password(user.password)
+    return principal
+
+def get_principal(user_id):
+    """Compact cached view of a user, or None if the user does not exist"""
+    key = _principal_key(user_id)
+    principal = cache.get(key)
+    if principal is None:
+        user = get_user_model().objects.filter(id=user_id).first()
+        if user is None:
+            return None
+        principal = build_principal(user)
+        cache.set(key, principal, PRINCIPAL_TIMEOUT)
+    return principal
+
+def invalidate_principal(user_id):
+    """Drop the cached principal once the current transaction commits"""
+    transaction.on_commit(lambda: cache.delete(_principal_key(user_id)))
+
+def invalidate_principals(user_ids):
+    keys = [_principal_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+class CachedPrincipal(SimpleLazyObject):
+    """User stand-in that answers principal fields from the cache.
+
+    Anything else (other fields, methods, isinstance checks, assignment)
+    loads the full User row on first use and is served from it afterwards.
+    """
+
+    def __init__(self, principal):
+        self.__dict__['_principal'] = principal
+        super().__init__(lambda: get_user_model().objects.get(id=principal['id']))
+
+    def __getattr__(self, name):
+        if self._wrapped is empty and name in self._principal:
+            return self._principal[name]
+        return super().__getattr__(name)
+
+    def __copy__(self):
+        if self._wrapped is empty:
+            return type(self)(self._principal)
+        return copy.copy(self._wrapped)
+
+    def __deepcopy__(self, memo):
+        if self._wrapped is empty:
+            result = type(self)(copy.deepcopy(self._principal, memo))
+            memo[id(self)] = result
+            return result
+        return copy.deepcopy(self._wrapped, memo)
+
+    @property
+    def pk(self):
+        return self._principal['id'] if self._wrapped is empty else self._wrapped.pk
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __bool__(self):
+        # Permission checks do `request.user and ...`
+        return True
+
+    def can_access_client_features(self):
+        from apps.plans.registry import is_active_plan
+        return is_active_plan(self.current_client_plan)
+
+    def can_access_freelancer_features(self):
+        from apps.plans.registry import is_active_plan
+        return is_active_plan(self.current_freelancer_plan)
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves a cached principal instead of loading the User row"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        principal = get_principal(user_id)
+        if principal is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not principal['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != principal['password_hash']:
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        claims = validated_token.get(ENTITLEMENTS_CLAIM)
+        if claims is not None and not is_current(claims, principal):
+            # Role or plan changed since the token was minted; the client refreshes
+            raise AuthenticationFailed(_('Entitlements have changed, refresh the token'), code='entitlements_changed')
+
+        return CachedPrincipal(principal)
+
+_jwt_authentication = JWTAuthentication()
+
+def validated_request_token(request):
+    """Validated access token from the Authorization header, or None; for use before DRF runs"""
+    if not hasattr(request, '_validated_jwt'):
+        token = None
+        header = _jwt_authentication.get_header(request)
+        raw_token = _jwt_authentication.get_raw_token(header) if header is not None else None
+        if raw_token is not None:
+            try:
+                token = _jwt_authentication.get_validated_token(raw_token)
+            except (InvalidToken, TokenError):
+                pass
+        request._validated_jwt = token
+    return request._validated_jwt
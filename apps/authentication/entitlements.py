@@ -0,0 +1,115 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F, Q
+from rest_framework_simplejwt.settings import api_settings
+from apps.plans.models import Plan
+from apps.plans.registry import all_plans
+
+ENTITLEMENTS_CLAIM = 'ent'
+
+FREELANCER_ROLES = ['freelancer', 'both']
+CLIENT_ROLES = ['client', 'both']
+
+def _plan_claims(name, plans):
+    plan = plans.get(name)
+    if plan is None:
+        return {'name': name, 'active': False, 'priority': None, 'max_concurrent_tasks': 0, 'daily_task_limit': 0}
+    return {
+        'name': plan.name,
+        'active': plan.is_active,
+        'priority': plan.priority,
+        'max_concurrent_tasks': plan.max_concurrent_tasks,
+        'daily_task_limit': plan.daily_task_limit,
+    }
+
+def entitlement_claims(user, fresh=False):
+    """What the user may do, in the form carried by access tokens.
+
+    Tokens are minted with fresh=True: the plans are read from the database,
+    since the in-process registry can lag a plan edit and a token outlives it.
+    """
+    names = [user.current_freelancer_plan, user.current_client_plan]
+    if fresh:
+        plans = {plan.name: plan for plan in Plan.objects.filter(name__in=names)}
+    else:
+        plans = {plan.name: plan for plan in all_plans() if plan.name in names}
+    return {
+        'ver': user.entitlements_version,
+        'user_type': user.user_type,
+        'role': user.active_role,
+        'freelancer_plan': _plan_claims(user.current_freelancer_plan, plans),
+        'client_plan': _plan_claims(user.current_client_plan, plans),
+    }
+
+class PlanEntitlement:
+    """The plan limits from a token; reads like the Plan it was taken from"""
+
+    def __init__(self, claims):
+        self.name = claims['name']
+        self.is_active = claims['active']
+        self.priority = claims['priority']
+        self.max_concurrent_tasks = claims['max_concurrent_tasks']
+        self.daily_task_limit = claims['daily_task_limit']
+
+class Entitlements:
+    def __init__(self, claims):
+        self.version = claims['ver']
+        self.user_type = claims['user_type']
+        self.role = claims['role']
+        self.freelancer_plan = PlanEntitlement(claims['freelancer_plan'])
+        self.client_plan = PlanEntitlement(claims['client_plan'])
+
+    @classmethod
+    def for_user(cls, user):
+        return cls(entitlement_claims(user))
+
+    @property
+    def is_freelancer(self):
+        return self.role in FREELANCER_ROLES
+
+    @property
+    def is_client(self):
+        return self.role in CLIENT_ROLES
+
+    @property
+    def is_staff_member(self):
+        return self.user_type in ['admin', 'moderator']
+
+    def can_access_freelancer_features(self):
+        return self.freelancer_plan.is_active
+
+    def can_access_client_features(self):
+        return self.client_plan.is_active
+
+def is_current(claims, principal):
+    """False once the user's role or plan changed after the token was minted"""
+    return claims['ver'] == principal['entitlements_version']
+
+def token_entitlements(validated_token):
+    """Entitlements carried by a still-current token, or None"""
+    from .authentication import get_principal
+
+    claims = validated_token.get(ENTITLEMENTS_CLAIM)
+    if claims is None:
+        return None
+    principal = get_principal(validated_token.get(api_settings.USER_ID_CLAIM))
+    if principal is None or not is_current(claims, principal):
+        return None
+    return Entitlements(claims)
+
+def request_entitlements(request):
+    """Entitlements for a DRF request: from the token claims when present, else from request.user"""
+    token = request.auth
+    if token is not None and ENTITLEMENTS_CLAIM in token:
+        # CachedJWTAuthentication already rejected stale claims
+        return Entitlements(token[ENTITLEMENTS_CLAIM])
+    return Entitlements.for_user(request.user)
+
+def bump_plan_entitlements(plan_name):
+    """Outdate tokens minted for users on a plan whose limits changed"""
+    from .authentication import invalidate_principals
+
+    users = get_user_model().objects.filter(Q(current_freelancer_plan=plan_name) | Q(current_client_plan=plan_name))
+    user_ids = list(users.values_list('id', flat=True))
+    updated = users.update(entitlements_version=F('entitlements_version') + 1)
+    invalidate_principals(user_ids)
+    return updated
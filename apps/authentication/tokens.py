@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .entitlements import ENTITLEMENTS_CLAIM, entitlement_claims
+
+class EntitlementRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the user's current entitlements"""
+
+    _user = None
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token._user = user
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = self._user
+        if user is None:
+            # Refresh: claims are rebuilt from the database, never copied forward
+            user = get_user_model().objects.filter(
+                **{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}
+            ).first()
+            if user is None or not user.is_active:
+                raise TokenError(_('User not found or inactive'))
+        access[ENTITLEMENTS_CLAIM] = entitlement_claims(user, fresh=True)
+        return access
+
+class EntitlementTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = EntitlementRefreshToken
+
+class EntitlementTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = EntitlementRefreshToken
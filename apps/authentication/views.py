@@ -2,7 +2,6 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import login, logout
 from django.core.mail import send_mail
 from django.conf import settings
@@ -14,7 +13,8 @@ from apps.users.serializers import (
     PhoneVerificationSerializer, ProfileSerializer, ChangePasswordSerializer,
     RoleSwitchSerializer
 )
-from apps.core.utils import generate_verification_token, send_sms_verification
+from apps.core.utils import generate_verification_token, send_sms_verification, get_client_ip
+from .tokens import EntitlementRefreshToken
 from apps.plans.models import Plan
 import logging
 
@@ -64,18 +64,18 @@ def login_view(request):
         LoginAttempt.objects.create(
             user=user,
             email=user.email,
-            ip_address=request.META.get('REMOTE_ADDR'),
+            ip_address=get_client_ip(request),
             device_fingerprint=device_fingerprint,
             success=True
         )
         
         # Update last login info
-        user.last_login_ip = request.META.get('REMOTE_ADDR')
+        user.last_login_ip = get_client_ip(request)
         user.last_login_device = device_fingerprint
         user.save()
         
         # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = EntitlementRefreshToken.for_user(user)
         
         return Response({
             'refresh': str(refresh),
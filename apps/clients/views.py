@@ -7,7 +7,10 @@ from apps.tasks.models import Task
 from apps.documents.models import Document, DocumentUpload
 from apps.payments.models import Deposit
 from apps.wallets.models import Wallet
+from apps.wallets.ledger import post_transaction
 from apps.notifications.utils import send_notification
+from apps.core.ids import new_reference
+from decimal import Decimal
 import logging
 
 logger = logging.getLogger(__name__)
@@ -142,11 +145,12 @@ def activate_client_account_view(request):
     request.user.save()
     
     # Record deposit
+    activation_reference = new_reference('activation')
     Deposit.objects.create(
         user=request.user,
         amount=amount,
         payment_method='account_activation',
-        transaction_id=f'activation_{request.user.id}',
+        transaction_id=activation_reference,
         status='completed'
     )
     
@@ -155,12 +159,12 @@ def activate_client_account_view(request):
     request.user.save()
     
     # Update wallet
-    Transaction.objects.create(
+    post_transaction(
         wallet=wallet,
-        amount=float(amount),
+        amount=Decimal(str(amount)),
         transaction_type='deposit',
         description='Account activation deposit',
-        reference=f'activation_{request.user.id}'
+        reference=activation_reference
     )
     
     # Send notification
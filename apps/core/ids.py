@@ -0,0 +1,133 @@
+from django.conf import settings
+from django.core.cache import cache
+from apps.core.utils import cache_is_shared
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# 64-bit layout: 41 bits of milliseconds since EPOCH_MS, 10 bits worker, 12 bits sequence
+EPOCH_MS = 1735689600000  # 2025-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+WORKER_LEASE_KEY = 'id_worker_lease_{worker_id}'
+WORKER_LEASE_TIMEOUT = 60 * 60  # Renewed at half-life while the process keeps generating
+
+class WorkerIdUnavailable(Exception):
+    pass
+
+class SnowflakeGenerator:
+    """k-sortable 64-bit ids, unique per (worker id, millisecond, sequence)"""
+
+    def __init__(self, worker_id=None):
+        self._fixed_worker_id = worker_id
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _after_fork(self):
+        # The parent's lock may have been held by another thread at fork time
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._worker_id = None
+        self._lease_token = None
+        self._lease_renew_at = 0
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _lease_worker_id(self):
+        token = f'{socket.gethostname()}:{self._pid}:{uuid.uuid4().hex[:8]}'
+        start = random.randint(0, MAX_WORKER_ID)
+        for offset in range(MAX_WORKER_ID + 1):
+            worker_id = (start + offset) & MAX_WORKER_ID
+            if cache.add(WORKER_LEASE_KEY.format(worker_id=worker_id), token, WORKER_LEASE_TIMEOUT):
+                self._lease_token = token
+                self._lease_renew_at = time.monotonic() + WORKER_LEASE_TIMEOUT / 2
+                return worker_id
+        raise WorkerIdUnavailable('All worker ids are leased')
+
+    def _renew_lease(self):
+        key = WORKER_LEASE_KEY.format(worker_id=self._worker_id)
+        if cache.get(key) not in (None, self._lease_token):
+            # Our lease lapsed and another process took the id
+            self._worker_id = self._lease_worker_id()
+            return
+        cache.set(key, self._lease_token, WORKER_LEASE_TIMEOUT)
+        self._lease_renew_at = time.monotonic() + WORKER_LEASE_TIMEOUT / 2
+
+    def _resolve_worker_id(self):
+        configured = self._fixed_worker_id
+        if configured is None:
+            configured = getattr(settings, 'ID_WORKER_ID', None)
+        if configured is not None:
+            worker_id = int(configured)
+            if not 0 <= worker_id <= MAX_WORKER_ID:
+                raise WorkerIdUnavailable(f'ID_WORKER_ID must be between 0 and {MAX_WORKER_ID}')
+            return worker_id
+        if cache_is_shared():
+            return self._lease_worker_id()
+        # Per-process cache: pids are distinct on one host, so this is only safe single-host
+        logger.warning('No ID_WORKER_ID and no shared cache; deriving the id worker from the pid')
+        return self._pid & MAX_WORKER_ID
+
+    @property
+    def worker_id(self):
+        with self._lock:
+            self._ensure_worker()
+            return self._worker_id
+
+    def _ensure_worker(self):
+        if self._pid != os.getpid():
+            # Forked (gunicorn preload, multiprocessing): never share the parent's worker id
+            self._reset()
+        if self._worker_id is None:
+            self._worker_id = self._resolve_worker_id()
+        elif self._lease_token and time.monotonic() >= self._lease_renew_at:
+            self._renew_lease()
+
+    def next_id(self):
+        with self._lock:
+            self._ensure_worker()
+            now_ms = int(time.time() * 1000)
+            if now_ms < self._last_ms:
+                # Clock stepped back: keep counting on the last timestamp instead of reusing ids
+                now_ms = self._last_ms
+
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    while now_ms <= self._last_ms:
+                        now_ms = int(time.time() * 1000)
+                        if now_ms < self._last_ms:
+                            now_ms = self._last_ms + 1  # Borrow the next millisecond
+            else:
+                self._sequence = 0
+
+            self._last_ms = now_ms
+            return ((now_ms - EPOCH_MS) << (WORKER_BITS + SEQUENCE_BITS)) | (self._worker_id << SEQUENCE_BITS) | self._sequence
+
+_generator = SnowflakeGenerator()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_generator._after_fork)
+
+def next_id():
+    return _generator.next_id()
+
+def new_reference(prefix):
+    """Unique, time-ordered reference such as dep_7300561238394880"""
+    return f'{prefix}_{next_id()}'
+
+def id_timestamp(snowflake_id):
+    """Unix time in seconds encoded in an id"""
+    return ((snowflake_id >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS) / 1000
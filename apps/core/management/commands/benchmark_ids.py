@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.ids import next_id
+import multiprocessing
+import time
+
+def _generate(count):
+    ids = [next_id() for _ in range(count)]
+    # Ids from one generator must be strictly increasing
+    ordered = all(a < b for a, b in zip(ids, ids[1:]))
+    return ids, ordered
+
+def _process_worker(args):
+    threads, per_thread = args
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(_generate, [per_thread] * threads))
+    ids = [i for batch, _ in results for i in batch]
+    return ids, all(ordered for _, ordered in results)
+
+class Command(BaseCommand):
+    help = 'Generate ids across processes and threads, then verify uniqueness and ordering'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000000, help='Total ids to generate')
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--threads', type=int, default=4, help='Threads per process')
+
+    def handle(self, *args, **options):
+        processes, threads = options['processes'], options['threads']
+        per_thread = options['count'] // (processes * threads)
+        if per_thread <= 0:
+            raise CommandError('--count must be at least processes * threads')
+
+        started = time.monotonic()
+        # fork, so children exercise the generator's after-fork worker id reset
+        with multiprocessing.get_context('fork').Pool(processes) as pool:
+            results = pool.map(_process_worker, [(threads, per_thread)] * processes)
+        elapsed = time.monotonic() - started
+
+        ids = [i for batch, _ in results for i in batch]
+        unique = len(set(ids))
+        ordered = all(ordered for _, ordered in results)
+
+        self.stdout.write(f'generated: {len(ids)}')
+        self.stdout.write(f'unique: {unique}')
+        self.stdout.write(f'per_thread_monotonic: {ordered}')
+        self.stdout.write(f'elapsed: {elapsed:.3f}s')
+        self.stdout.write(f'per_second: {len(ids) / elapsed:,.0f}')
+
+        if unique != len(ids) or not ordered:
+            raise CommandError(f'{len(ids) - unique} duplicate ids generated')
+        self.stdout.write(self.style.SUCCESS('All ids unique'))
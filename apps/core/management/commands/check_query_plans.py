@@ -0,0 +1,109 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from datetime import timedelta
+from apps.users.models import User, LoginAttempt, SessionControl
+from apps.tasks.models import Task, TaskAssignment
+from apps.notifications.models import Notification
+from apps.wallets.models import Wallet, Transaction
+import re
+
+class Rollback(Exception):
+    pass
+
+def hot_queries(user, wallet):
+    """The filters that run on (almost) every request, keyed by a short name"""
+    now = timezone.now()
+    return {
+        'assignment_user_status': TaskAssignment.objects.filter(user=user, status__in=['accepted', 'submitted']),
+        'task_status_deadline': Task.objects.filter(status__in=['pending', 'active', 'simulated'], deadline__lte=now),
+        'notification_unread': Notification.objects.filter(user=user, is_read=False),
+        'notification_list': Notification.objects.filter(user=user).order_by('-created_at'),
+        'transaction_wallet_type': Transaction.objects.filter(wallet=wallet, transaction_type='earning').order_by('-created_at'),
+        'loginattempt_ip_time': LoginAttempt.objects.filter(ip_address='10.0.0.1', timestamp__gte=now - timedelta(hours=24)),
+        'session_active_user': SessionControl.objects.filter(user=user, is_active=True),
+    }
+
+def sequential_scans(plan, table):
+    """Plan lines that read the whole table instead of using an index"""
+    if connection.vendor == 'postgresql':
+        return [line.strip() for line in plan.splitlines() if re.search(rf'Seq Scan on {table}\b', line)]
+    return [line.strip() for line in plan.splitlines() if re.search(rf'\bSCAN {table}$', line.strip())]
+
+def seed(rows):
+    """Fill the hot tables with a skewed dataset; returns a seeded user and their wallet"""
+    now = timezone.now()
+    users = User.objects.bulk_create([
+        User(email=f'plan-check-{i}@example.com', username=f'plan-check-{i}', referral_code=f'PLANCHK{i:05d}')
+        for i in range(max(rows // 50, 2))
+    ])
+    wallets = Wallet.objects.bulk_create([Wallet(user=user) for user in users])
+    tasks = Task.objects.bulk_create([
+        Task(
+            title=f'Plan check {i}',
+            description='Seeded for query plan checks',
+            reward=1,
+            status=['active', 'completed', 'simulated', 'expired'][i % 4],
+            created_by=users[0],
+            deadline=now + timedelta(hours=i - rows // 2)
+        )
+        for i in range(rows)
+    ])
+    TaskAssignment.objects.bulk_create([
+        TaskAssignment(task=task, user=users[i % len(users)], status=['accepted', 'approved', 'submitted'][i % 3])
+        for i, task in enumerate(tasks)
+    ])
+    Notification.objects.bulk_create([
+        Notification(user=users[i % len(users)], title='Check', message='Check', notification_type='system_message', is_read=i % 5 != 0)
+        for i in range(rows)
+    ])
+    Transaction.objects.bulk_create([
+        Transaction(wallet=wallets[i % len(wallets)], amount=1, transaction_type=['earning', 'deposit'][i % 2], description='Check')
+        for i in range(rows)
+    ])
+    LoginAttempt.objects.bulk_create([
+        LoginAttempt(ip_address=f'10.0.{i % 250}.{i % 200}', device_fingerprint='check', success=True)
+        for i in range(rows)
+    ])
+    SessionControl.objects.bulk_create([
+        SessionControl(user=users[i % len(users)], session_key=f'check{i}', device_fingerprint='check', ip_address='10.0.0.1', is_active=i % 10 == 0)
+        for i in range(rows)
+    ])
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+        if connection.vendor == 'postgresql':
+            # Report whether an index *can* serve the query rather than what
+            # the planner picks for a table of this size
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    return users[1], wallets[1]
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot-path queries against a seeded dataset and fail on any sequential scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Rows to seed per table (rolled back afterwards)')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only failures')
+
+    def handle(self, *args, **options):
+        failures = {}
+        try:
+            with transaction.atomic():
+                user, wallet = seed(options['rows'])
+                for name, queryset in hot_queries(user, wallet).items():
+                    plan = queryset.explain()
+                    scans = sequential_scans(plan, queryset.model._meta.db_table)
+                    if scans:
+                        failures[name] = plan
+                    if scans or options['verbose_plans']:
+                        self.stdout.write(f'{name}:\n{plan}\n')
+                    else:
+                        self.stdout.write(f'{name}: ok')
+                raise Rollback
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"Sequential scan in: {', '.join(sorted(failures))}")
+        self.stdout.write(self.style.SUCCESS('All hot-path queries use an index'))
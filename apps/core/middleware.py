@@ -1,7 +1,11 @@
 from django.utils import timezone
 from django.http import JsonResponse
-from apps.users.models import User, SessionControl
-from apps.core.utils import generate_device_fingerprint
+from apps.users.models import User
+from apps.authentication.authentication import validated_request_token
+from apps.authentication.entitlements import Entitlements, token_entitlements
+from apps.core.ratelimit import check_rate_limit
+from apps.core.sessions import touch_session
+from apps.core.utils import generate_device_fingerprint, get_client_ip
 from django.core.cache import cache
 from django.conf import settings
 import logging
@@ -13,106 +17,81 @@ class SessionControlMiddleware:
         self.get_response = get_response
 
     def __call__(self, request):
-        if request.user.is_authenticated:
-            # Check for existing active sessions
-            active_sessions = SessionControl.objects.filter(
-                user=request.user,
-                is_active=True
-            ).exclude(session_key=request.session.session_key)
-            
-            if active_sessions.exists():
-                # Log out other sessions
-                active_sessions.update(is_active=False)
-            
-            # Create or update current session
-            SessionControl.objects.update_or_create(
-                user=request.user,
-                session_key=request.session.session_key,
-                defaults={
-                    'device_fingerprint': generate_device_fingerprint(request),
-                    'ip_address': request.META.get('REMOTE_ADDR', ''),
-                    'last_activity': timezone.now(),
-                    'is_active': True
-                }
+        if request.user.is_authenticated and request.session.session_key:
+            # Cache-only on the common path; SessionControl rows are written behind
+            touch_session(
+                request.user,
+                request.session.session_key,
+                generate_device_fingerprint(request),
+                get_client_ip(request)
             )
         
         response = self.get_response(request)
         return response
 
-class FraudDetectionMiddleware:
+class RateLimitMiddleware:
+    """Sliding-window limits per route and per user or IP (see apps.core.ratelimit)"""
+
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        # Rate limiting based on IP
-        ip_address = request.META.get('REMOTE_ADDR', '')
-        cache_key = f'rate_limit_{ip_address}'
-        
-        request_count = cache.get(cache_key, 0)
-        if request_count >= 100:  # 100 requests per hour
-            return JsonResponse({
+        decision = check_rate_limit(request)
+        if decision is not None and not decision.allowed:
+            response = JsonResponse({
                 'error': 'Rate limit exceeded'
             }, status=429)
-        
-        cache.set(cache_key, request_count + 1, 3600)  # 1 hour
-        
-        response = self.get_response(request)
-        return response
-
-class RateLimitMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request):
-        # Implement rate limiting logic
-        user = request.user
-        if user.is_authenticated:
-            cache_key = f'rate_limit_user_{user.id}'
-            request_count = cache.get(cache_key, 0)
-            
-            if request_count >= 5000:  # 1000 requests per hour
-                return JsonResponse({
-                    'error': 'Rate limit exceeded'
-                }, status=429)
-            
-            cache.set(cache_key, request_count + 1, 3600)
+            response['Retry-After'] = str(decision.retry_after)
+            return response
         
         response = self.get_response(request)
+        if decision is not None:
+            response['X-RateLimit-Limit'] = str(decision.limit)
+            response['X-RateLimit-Remaining'] = str(decision.remaining)
         return response
 
 class SubscriptionVerificationMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
+    def _entitlements(self, request):
+        # Session users carry no claims; bearer tokens are checked from their claims alone
+        if request.user.is_authenticated:
+            return Entitlements.for_user(request.user)
+        token = validated_request_token(request)
+        return token_entitlements(token) if token is not None else None
+
     def __call__(self, request):
         # Check subscription for specific endpoints
         path = request.path
         
         # Check client-specific endpoints
         if path.startswith('/api/clients/') or path.startswith('/api/documents/'):
-            if request.user.is_authenticated:
-                if request.user.active_role not in ['client', 'both']:
+            entitlements = self._entitlements(request)
+            if entitlements is not None:
+                if not entitlements.is_client:
                     return JsonResponse({
                         'error': 'Access denied - client role required'
                     }, status=403)
                 
-                if not request.user.can_access_client_features():
+                if not entitlements.can_access_client_features():
                     return JsonResponse({
                         'error': 'No active client subscription'
                     }, status=400)
         
         # Check freelancer-specific endpoints
         elif path.startswith('/api/freelancers/'):
-            if request.user.is_authenticated:
-                if request.user.active_role not in ['freelancer', 'both']:
+            entitlements = self._entitlements(request)
+            if entitlements is not None:
+                if not entitlements.is_freelancer:
                     return JsonResponse({
                         'error': 'Access denied - freelancer role required'
                     }, status=403)
                 
-                if not request.user.can_access_freelancer_features():
+                if not entitlements.can_access_freelancer_features():
                     return JsonResponse({
                         'error': 'No active freelancer subscription'
                     }, status=400)
         
         response = self.get_response(request)
-        return response
\ No newline at end of file
+        return response
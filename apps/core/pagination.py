@@ -0,0 +1,124 @@
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+import base64
+import json
+
+class InvalidCursor(Exception):
+    pass
+
+class CursorPage:
+    def __init__(self, items, next_cursor, previous_cursor, count=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+def parse_limit(value, default, maximum):
+    """Page size from a query parameter, clamped to maximum; ValueError if not a positive integer"""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be a positive integer')
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(limit, maximum)
+
+def encode_cursor(obj, direction):
+    """Build an opaque token pointing at obj's (created_at, id) position"""
+    payload = json.dumps({'c': obj.created_at.isoformat(), 'i': obj.pk, 'd': direction})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        created_at = parse_datetime(payload['c'])
+        if created_at is None or payload['d'] not in ('n', 'p'):
+            raise ValueError
+        return created_at, int(payload['i']), payload['d']
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+
+def estimate_count(queryset):
+    """Cheap total for an unfiltered table, exact COUNT otherwise"""
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+    return queryset.count()
+
+def cursor_paginate(queryset, cursor, limit, with_count=False):
+    """Keyset pagination over (created_at, id), newest first"""
+    count = estimate_count(queryset) if with_count else None
+
+    direction = 'n'
+    if cursor:
+        created_at, pk, direction = decode_cursor(cursor)
+        if direction == 'n':
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+        else:
+            queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+
+    if direction == 'n':
+        rows = list(queryset.order_by('-created_at', '-pk')[:limit + 1])
+    else:
+        rows = list(queryset.order_by('created_at', 'pk')[:limit + 1])
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == 'p':
+        rows.reverse()
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if direction == 'n':
+            next_cursor = encode_cursor(rows[-1], 'n') if has_more else None
+            previous_cursor = encode_cursor(rows[0], 'p') if cursor else None
+        else:
+            next_cursor = encode_cursor(rows[-1], 'n')
+            previous_cursor = encode_cursor(rows[0], 'p') if has_more else None
+
+    return CursorPage(rows, next_cursor, previous_cursor, count)
+
+def paginate_request(request, queryset, serialize, default_limit=10, max_limit=100):
+    """Page a newest-first queryset from request.GET into a response body.
+
+    Keyset pages when a cursor is passed (even an empty one), numbered pages
+    otherwise. Raises ValueError for a bad limit and InvalidCursor for a bad cursor.
+    """
+    limit = parse_limit(request.GET.get('limit'), default_limit, max_limit)
+
+    if 'cursor' in request.GET:
+        cursor_page = cursor_paginate(
+            queryset,
+            request.GET.get('cursor'),
+            limit,
+            with_count=request.GET.get('with_count') == 'true'
+        )
+        data = {
+            'results': [serialize(obj) for obj in cursor_page.items],
+            'next': cursor_page.next_cursor,
+            'previous': cursor_page.previous_cursor
+        }
+        if cursor_page.count is not None:
+            data['count'] = cursor_page.count
+        return data
+
+    paginator = Paginator(queryset, limit)
+    page_obj = paginator.get_page(request.GET.get('page', 1))
+    return {
+        'results': [serialize(obj) for obj in page_obj],
+        'count': paginator.count,
+        'next': page_obj.has_next(),
+        'previous': page_obj.has_previous(),
+        'total_pages': paginator.num_pages
+    }
@@ -0,0 +1,184 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from apps.authentication.authentication import validated_request_token
+from apps.core.utils import get_client_ip
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'local',       # 'local' (per process, for development and tests) or 'redis'
+    'ANON_RATE': '100/hour',  # Per IP address
+    'USER_RATE': '5000/hour', # Per user
+    'POLICIES': [],           # Route policies, first matching prefix wins; rate None exempts
+    'KEY_PREFIX': 'ratelimit',
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Sliding window counter: the previous fixed window counts in proportion to
+# how much of it still overlaps the sliding window. Increments only when the
+# request is allowed, so rejected requests do not extend a block.
+SLIDING_WINDOW_SCRIPT = """
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if previous * tonumber(ARGV[3]) + current >= tonumber(ARGV[1]) then
+    return {0, previous, current}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]) * 2)
+end
+return {1, previous, current}
+"""
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'RATE_LIMITS', {}))
+    return config
+
+def parse_rate(rate):
+    """'100/hour' -> (100, 3600)"""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+class Decision:
+    def __init__(self, allowed, limit, remaining, retry_after):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+def _decide(allowed, previous, current, limit, window, elapsed):
+    weight = 1 - elapsed / window
+    used = previous * weight + current
+    if allowed:
+        return Decision(True, limit, max(0, int(limit - used)), 0)
+
+    if current >= limit:
+        # Only the next window brings the count back under the limit
+        retry_after = window - elapsed
+    else:
+        # Wait for the previous window's share to decay far enough
+        retry_after = window * (1 - (limit - current) / previous) - elapsed
+    return Decision(False, limit, 0, max(1, math.ceil(retry_after)))
+
+class LocalSlidingWindow:
+    """In-process counters; each worker limits on its own, so only for development and tests"""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._pruned_at = 0
+
+    def hit(self, key, limit, window):
+        now = time.time()
+        index = int(now // window)
+        elapsed = now - index * window
+        current_key, previous_key = (key, window, index), (key, window, index - 1)
+
+        with self._lock:
+            previous = self._counts.get(previous_key, 0)
+            current = self._counts.get(current_key, 0)
+            allowed = previous * (1 - elapsed / window) + current < limit
+            if allowed:
+                current += 1
+                self._counts[current_key] = current
+            if now - self._pruned_at >= 60:
+                self._prune(now)
+
+        return _decide(allowed, previous, current, limit, window, elapsed)
+
+    def _prune(self, now):
+        # Drop windows that can no longer be a previous window
+        self._pruned_at = now
+        stale = [k for k in self._counts if (k[2] + 2) * k[1] <= now]
+        for k in stale:
+            del self._counts[k]
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+class RedisSlidingWindow:
+    """Counters shared by every worker; one EVALSHA round trip per request"""
+
+    def __init__(self):
+        try:
+            from django_redis import get_redis_connection
+            client = get_redis_connection('default')
+        except (ImportError, NotImplementedError) as e:
+            raise ImproperlyConfigured('The redis rate limit backend requires a django-redis cache') from e
+        self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def hit(self, key, limit, window):
+        now = time.time()
+        index = int(now // window)
+        elapsed = now - index * window
+        allowed, previous, current = self._script(
+            keys=[f'{key}:{index}', f'{key}:{index - 1}'],
+            args=[limit, window, 1 - elapsed / window]
+        )
+        return _decide(bool(allowed), int(previous), int(current), limit, window, elapsed)
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_rate_limit_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if _config()['BACKEND'] == 'redis':
+                    _backend = RedisSlidingWindow()
+                else:
+                    _backend = LocalSlidingWindow()
+    return _backend
+
+def _token_user_id(request):
+    """User id from a valid access token, without loading the user"""
+    token = validated_request_token(request)
+    return token.get(jwt_settings.USER_ID_CLAIM) if token is not None else None
+
+def request_identity(request):
+    """('user', id) for session or JWT users, ('ip', address) otherwise"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return 'user', user.pk
+    user_id = _token_user_id(request)
+    if user_id is not None:
+        return 'user', user_id
+    return 'ip', get_client_ip(request)
+
+def resolve_policy(request):
+    """First route policy whose prefix matches the path, or None"""
+    for policy in _config()['POLICIES']:
+        if request.path.startswith(policy['prefix']):
+            return policy
+    return None
+
+def check_rate_limit(request):
+    """Count the request against its policy; returns a Decision, or None when unlimited"""
+    config = _config()
+    policy = resolve_policy(request)
+    if policy is not None and policy.get('rate') is None:
+        return None
+
+    if policy is not None and policy.get('scope') == 'ip':
+        kind, identity = 'ip', get_client_ip(request)
+    else:
+        kind, identity = request_identity(request)
+
+    if policy is not None:
+        name, rate = policy.get('name', policy['prefix']), policy['rate']
+    else:
+        name = 'default'
+        rate = config['USER_RATE'] if kind == 'user' else config['ANON_RATE']
+
+    limit, window = parse_rate(rate)
+    key = f"{config['KEY_PREFIX']}:{name}:{kind}:{identity}:{window}"
+    return get_rate_limit_backend().hit(key, limit, window)
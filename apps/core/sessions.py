@@ -0,0 +1,279 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from apps.users.models import SessionControl
+from functools import reduce
+import atexit
+import logging
+import operator
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'local',      # 'local' (per process, for development and tests) or 'redis'
+    'FLUSH_INTERVAL': 30.0,  # Persist activity for a session at most this often, in seconds
+    'BATCH_SIZE': 500,       # Rows written per flush statement
+    'KEY_PREFIX': 'session_control',
+}
+
+# Compare-and-set of the user's active session: rewrites the entry only when
+# the session, device or IP changed or the flush interval has passed, and
+# reports whether it did, so two requests never both act on a stale read.
+TOUCH_SCRIPT = """
+local current = redis.call('HMGET', KEYS[1], 'session_key', 'device_fingerprint', 'ip_address', 'flushed_at')
+if current[1] == ARGV[1] and current[2] == ARGV[2] and current[3] == ARGV[3]
+        and tonumber(ARGV[4]) - tonumber(current[4]) < tonumber(ARGV[5]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'session_key', ARGV[1], 'device_fingerprint', ARGV[2], 'ip_address', ARGV[3], 'flushed_at', ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+return 1
+"""
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'SESSION_CONTROL', {}))
+    return config
+
+def _needs_write(entry, session_key, device_fingerprint, ip_address, now, interval):
+    return (
+        entry is None
+        or entry['session_key'] != session_key
+        or entry['device_fingerprint'] != device_fingerprint
+        or entry['ip_address'] != ip_address
+        or now - entry['flushed_at'] >= interval
+    )
+
+class LocalSessionRegistry:
+    """In-process registry; each worker tracks its own sessions, so only for development and tests"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._pruned_at = 0
+
+    def touch(self, user_id, session_key, device_fingerprint, ip_address, now, interval, ttl):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry['expires_at'] <= now:
+                entry = None
+            if not _needs_write(entry, session_key, device_fingerprint, ip_address, now, interval):
+                return False
+            self._entries[user_id] = {
+                'session_key': session_key,
+                'device_fingerprint': device_fingerprint,
+                'ip_address': ip_address,
+                'flushed_at': now,
+                'expires_at': now + ttl,
+            }
+            if now - self._pruned_at >= 60:
+                self._prune(now)
+            return True
+
+    def holders(self, user_ids):
+        now = time.time()
+        with self._lock:
+            entries = {user_id: self._entries.get(user_id) for user_id in user_ids}
+        return {
+            user_id: entry['session_key']
+            for user_id, entry in entries.items() if entry is not None and entry['expires_at'] > now
+        }
+
+    def _prune(self, now):
+        self._pruned_at = now
+        stale = [user_id for user_id, entry in self._entries.items() if entry['expires_at'] <= now]
+        for user_id in stale:
+            del self._entries[user_id]
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisSessionRegistry:
+    """Registry shared by every worker; one EVALSHA round trip per request"""
+
+    def __init__(self, key_prefix):
+        try:
+            from django_redis import get_redis_connection
+            self.client = get_redis_connection('default')
+        except (ImportError, NotImplementedError) as e:
+            raise ImproperlyConfigured('The redis session control backend requires a django-redis cache') from e
+        self.key_prefix = key_prefix
+        self._script = self.client.register_script(TOUCH_SCRIPT)
+
+    def _key(self, user_id):
+        return f'{self.key_prefix}:{user_id}'
+
+    def touch(self, user_id, session_key, device_fingerprint, ip_address, now, interval, ttl):
+        return bool(self._script(
+            keys=[self._key(user_id)],
+            args=[session_key, device_fingerprint, ip_address, now, interval, ttl]
+        ))
+
+    def holders(self, user_ids):
+        user_ids = list(user_ids)
+        pipe = self.client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.hget(self._key(user_id), 'session_key')
+        return {
+            user_id: holder.decode()
+            for user_id, holder in zip(user_ids, pipe.execute()) if holder is not None
+        }
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_session_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                config = _config()
+                if config['BACKEND'] == 'redis':
+                    _registry = RedisSessionRegistry(config['KEY_PREFIX'])
+                else:
+                    _registry = LocalSessionRegistry()
+    return _registry
+
+def flush_sessions(entries):
+    """Upsert SessionControl rows for a batch of sessions and retire the rest"""
+    if not entries:
+        return 0
+
+    # The registry decides which session won when several were queued for a user
+    holders = get_session_registry().holders({entry['user_id'] for entry in entries})
+    current = {}
+    for entry in entries:
+        holder = holders.get(entry['user_id'])
+        entry = dict(entry, is_active=holder is None or holder == entry['session_key'])
+        current[(entry['user_id'], entry['session_key'])] = entry
+
+    user_ids = {user_id for user_id, _ in current}
+    pairs = reduce(operator.or_, (Q(user_id=user_id, session_key=key) for user_id, key in current))
+
+    with transaction.atomic():
+        SessionControl.objects.filter(user_id__in=user_ids, is_active=True).exclude(pairs).update(is_active=False)
+
+        existing = {
+            (row.user_id, row.session_key): row
+            for row in SessionControl.objects.filter(pairs)
+        }
+        to_update, to_create = [], []
+        for pair, entry in current.items():
+            row = existing.get(pair)
+            if row is None:
+                row = SessionControl(user_id=entry['user_id'], session_key=entry['session_key'])
+                to_create.append(row)
+            else:
+                to_update.append(row)
+            row.device_fingerprint = entry['device_fingerprint']
+            row.ip_address = entry['ip_address']
+            row.last_activity = entry['last_activity']
+            row.is_active = entry['is_active']
+
+        batch_size = _config()['BATCH_SIZE']
+        SessionControl.objects.bulk_update(
+            to_update, ['device_fingerprint', 'ip_address', 'last_activity', 'is_active'], batch_size=batch_size
+        )
+        SessionControl.objects.bulk_create(to_create, batch_size=batch_size)
+
+    return len(current)
+
+class SessionWriteBehind:
+    """Per-process queue of session activity, coalesced per session and flushed by a background thread"""
+
+    def __init__(self, flush_interval):
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def add(self, entry):
+        with self._lock:
+            self._pending[(entry['user_id'], entry['session_key'])] = entry
+        self._ensure_flusher()
+
+    def depth(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            try:
+                return flush_sessions(list(pending.values()))
+            except Exception:
+                logger.exception('Failed to flush %s session activity entries', len(pending))
+                with self._lock:
+                    # Anything queued since is newer and wins
+                    self._pending = {**pending, **self._pending}
+                return 0
+
+    def _ensure_flusher(self):
+        # Re-spawn after a fork: gunicorn workers do not inherit running threads
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='session-control-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+_write_behind = None
+_write_behind_lock = threading.Lock()
+
+def get_write_behind():
+    global _write_behind
+    if _write_behind is None:
+        with _write_behind_lock:
+            if _write_behind is None:
+                _write_behind = SessionWriteBehind(_config()['FLUSH_INTERVAL'])
+    return _write_behind
+
+def touch_session(user, session_key, device_fingerprint, ip_address):
+    """Mark session_key as the user's only active session.
+
+    Touches the session registry only; the database catches up through the
+    write-behind queue at most once per FLUSH_INTERVAL per session, plus
+    whenever the active session, device or IP address changes.
+    """
+    config = _config()
+    written = get_session_registry().touch(
+        user.id, session_key, device_fingerprint, ip_address,
+        time.time(), config['FLUSH_INTERVAL'], settings.SESSION_COOKIE_AGE
+    )
+    if not written:
+        return False
+
+    get_write_behind().add({
+        'user_id': user.id,
+        'session_key': session_key,
+        'device_fingerprint': device_fingerprint,
+        'ip_address': ip_address,
+        'last_activity': timezone.now(),
+    })
+    return True
+
+@atexit.register
+def _flush_on_exit():
+    if _write_behind is not None:
+        _write_behind.flush()
@@ -0,0 +1,31 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.core.management.commands.check_query_plans import hot_queries, seed, sequential_scans
+
+class HotQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.wallet = seed(2000)
+
+    def test_hot_queries_use_an_index(self):
+        for name, queryset in hot_queries(self.user, self.wallet).items():
+            with self.subTest(name):
+                plan = queryset.explain()
+                self.assertEqual(sequential_scans(plan, queryset.model._meta.db_table), [], plan)
+
+    def test_notification_endpoints_run_one_query(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(client.get('/api/notifications/unread-count/').status_code, 200)
+        with self.assertNumQueries(1):
+            self.assertEqual(client.get('/api/notifications/').status_code, 200)
+
+    def test_transaction_page_query_count_is_flat(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.assertNumQueries(2):
+            response = client.get('/api/wallets/transactions/', {'cursor': '', 'limit': 10})
+        self.assertEqual(len(response.json()['results']), 10)
+        with self.assertNumQueries(2):
+            client.get('/api/wallets/transactions/', {'cursor': response.json()['next'], 'limit': 10})
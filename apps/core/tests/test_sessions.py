@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.test import TestCase
+from django.utils import timezone
+from apps.core.sessions import LocalSessionRegistry, flush_sessions, get_session_registry
+from apps.users.models import SessionControl, User
+import threading
+import time
+
+class LocalSessionRegistryTests(TestCase):
+    def test_concurrent_touches_write_once(self):
+        registry = LocalSessionRegistry()
+        barrier = threading.Barrier(20)
+        now = time.time()
+
+        def touch(_):
+            barrier.wait()
+            return registry.touch(1, 'abc', 'device', '10.0.0.1', now, 30, 3600)
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            results = list(pool.map(touch, range(20)))
+        self.assertEqual(sum(results), 1)
+
+    def test_rewrites_on_change_or_after_the_interval(self):
+        registry = LocalSessionRegistry()
+        now = time.time()
+        self.assertTrue(registry.touch(1, 'abc', 'device', '10.0.0.1', now, 30, 3600))
+        self.assertFalse(registry.touch(1, 'abc', 'device', '10.0.0.1', now + 1, 30, 3600))
+        self.assertTrue(registry.touch(1, 'abc', 'device', '10.0.0.2', now + 2, 30, 3600))
+        self.assertTrue(registry.touch(1, 'abc', 'device', '10.0.0.2', now + 40, 30, 3600))
+        self.assertTrue(registry.touch(1, 'def', 'device', '10.0.0.2', now + 41, 30, 3600))
+        self.assertEqual(registry.holders([1, 2]), {1: 'def'})
+
+class FlushSessionsTests(TestCase):
+    def setUp(self):
+        get_session_registry().reset()
+
+    def test_only_the_registered_session_stays_active(self):
+        user = User.objects.create_user(email='worker@example.com', username='worker', password='pass')
+        registry = get_session_registry()
+        entries = []
+        for session_key in ('old', 'new'):
+            registry.touch(user.id, session_key, 'device', '10.0.0.1', time.time(), 30, 3600)
+            entries.append({
+                'user_id': user.id, 'session_key': session_key, 'device_fingerprint': 'device',
+                'ip_address': '10.0.0.1', 'last_activity': timezone.now(),
+            })
+
+        flush_sessions(entries)
+        active = SessionControl.objects.filter(user=user, is_active=True).values_list('session_key', flat=True)
+        self.assertEqual(list(active), ['new'])
@@ -2,6 +2,7 @@ from django.utils.crypto import get_random_string
 from django.core.mail import send_mail
 from django.conf import settings
 import hashlib
+import ipaddress
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,36 @@ def send_sms_verification(phone_number, token):
     logger.info(f"SMS verification sent to {phone_number}: {token}")
     return True
 
+def cache_is_shared(alias='default'):
+    """Whether every process sees the same cache; locmem and dummy are per process"""
+    from django.core.cache import caches
+    from django.core.cache.backends.dummy import DummyCache
+    from django.core.cache.backends.locmem import LocMemCache
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+def get_client_ip(request):
+    """Client address, read from X-Forwarded-For when the app runs behind trusted proxies.
+
+    Each of the TRUSTED_PROXY_COUNT proxies appends the address it received
+    the request from, so the client is that many entries from the right;
+    anything further left was sent by the client and can be forged.
+    """
+    remote_addr = request.META.get('REMOTE_ADDR', '')
+    proxies = getattr(settings, 'TRUSTED_PROXY_COUNT', 0)
+    if proxies <= 0:
+        return remote_addr
+
+    forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if part.strip()]
+    if len(forwarded) < proxies:
+        # Did not come through every proxy
+        return remote_addr
+    candidate = forwarded[-proxies]
+    try:
+        ipaddress.ip_address(candidate)
+    except ValueError:
+        return remote_addr
+    return candidate
+
 def generate_device_fingerprint(request):
     """Generate a unique device fingerprint"""
     user_agent = request.META.get('HTTP_USER_AGENT', '')
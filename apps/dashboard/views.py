@@ -1,10 +1,14 @@
+from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from apps.users.models import User
 from apps.tasks.models import Task
+from apps.tasks.search import search_tasks
+from apps.tasks.views import admin_task_row
+from apps.users.views import admin_user_row
 from apps.payments.models import Deposit, Withdrawal
 from django.db.models import Count, Sum, Avg
-from django.core.paginator import Paginator
+from apps.core.pagination import paginate_request, InvalidCursor
 from django.db.models import Q
 
 # Remove the permission_classes decorator for testing
@@ -57,8 +61,6 @@ def user_list_api(request):
 
     # Get query parameters
     search_term = request.GET.get('search', '')
-    page = int(request.GET.get('page', 1))
-    limit = int(request.GET.get('limit', 10))
 
     # Filter users
     users = User.objects.all().order_by('-created_at')
@@ -70,37 +72,12 @@ def user_list_api(request):
             Q(phone_number__icontains=search_term)
         )
 
-    # Paginate
-    paginator = Paginator(users, limit)
-    page_obj = paginator.get_page(page)
-
-    # Serialize data
-    user_data = []
-    for user in page_obj:
-        user_data.append({
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'phone_number': str(user.phone_number),
-            'user_type': user.user_type,
-            'is_active': user.is_active,
-            'is_email_verified': user.is_email_verified,
-            'is_phone_verified': user.is_phone_verified,
-            'is_kyc_verified': user.is_kyc_verified,
-            'current_plan': user.current_plan,
-            'total_earnings': float(user.total_earnings),
-            'total_deposits': float(user.total_deposits),
-            'total_withdrawals': float(user.total_withdrawals),
-            'created_at': user.created_at.isoformat()
-        })
-
-    response_data = {
-        'results': user_data,
-        'count': paginator.count,
-        'next': page_obj.has_next(),
-        'previous': page_obj.has_previous(),
-        'total_pages': paginator.num_pages
-    }
+    try:
+        response_data = paginate_request(request, users, admin_user_row)
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     return Response(response_data)
 
@@ -112,49 +89,21 @@ def task_list_api(request):
 
     # Get query parameters
     search_term = request.GET.get('search', '')
-    page = int(request.GET.get('page', 1))
-    limit = int(request.GET.get('limit', 10))
 
     # Filter tasks
     tasks = Task.objects.all().select_related('created_by', 'plan_required').order_by('-created_at')
 
     if search_term:
-        tasks = tasks.filter(
-            Q(title__icontains=search_term) |
-            Q(description__icontains=search_term)
-        )
+        # Keyset pages follow (created_at, id), not the search rank
+        if 'cursor' in request.GET:
+            return Response({'error': 'cursor cannot be combined with search'}, status=status.HTTP_400_BAD_REQUEST)
+        tasks = search_tasks(tasks, search_term)
+
+    try:
+        response_data = paginate_request(request, tasks, admin_task_row)
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Paginate
-    paginator = Paginator(tasks, limit)
-    page_obj = paginator.get_page(page)
-
-    # Serialize data
-    task_data = []
-    for task in page_obj:
-        task_data.append({
-            'id': task.id,
-            'title': task.title,
-            'description': task.description,
-            'reward': float(task.reward),
-            'max_assignments': task.max_assignments,
-            'current_assignments': task.current_assignments,
-            'plan_required': task.plan_required.name if task.plan_required else None,
-            'status': task.status,
-            'created_by': {
-                'id': task.created_by.id,
-                'username': task.created_by.username,
-                'email': task.created_by.email
-            } if task.created_by else None,
-            'created_at': task.created_at.isoformat(),
-            'deadline': task.deadline.isoformat() if task.deadline else None,
-        })
-
-    response_data = {
-        'results': task_data,
-        'count': paginator.count,
-        'next': page_obj.has_next(),
-        'previous': page_obj.has_previous(),
-        'total_pages': paginator.num_pages
-    }
-
-    return Response(response_data)
\ No newline at end of file
+    return Response(response_data)
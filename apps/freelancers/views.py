@@ -4,8 +4,10 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from apps.users.models import User
 from apps.tasks.models import TaskAssignment, TaskSubmission
-from apps.plans.models import Plan
+from apps.plans.registry import get_plan
 from apps.wallets.models import Wallet, Transaction
+from apps.wallets.utils import filter_transactions, MAX_PAGE_SIZE
+from apps.core.pagination import cursor_paginate, parse_limit, InvalidCursor
 from apps.notifications.models import Notification
 from apps.notifications.utils import send_notification
 import logging
@@ -72,7 +74,21 @@ def freelancer_earnings_view(request):
     transactions = Transaction.objects.filter(
         wallet__user=request.user,
         transaction_type='earning'
-    ).order_by('-created_at')
+    )
+    # Keyset pages when a cursor is passed (even an empty one), the full history otherwise
+    use_cursor = 'cursor' in request.GET
+    try:
+        transactions = filter_transactions(transactions, request.GET)
+        if use_cursor:
+            limit = parse_limit(request.GET.get('limit'), 50, MAX_PAGE_SIZE)
+            cursor_page = cursor_paginate(transactions, request.GET.get('cursor'), limit)
+            items = cursor_page.items
+        else:
+            items = transactions.order_by('-created_at')
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
     
     earnings_data = [
         {
@@ -81,13 +97,17 @@ def freelancer_earnings_view(request):
             'date': t.created_at,
             'reference': t.reference
         }
-        for t in transactions
+        for t in items
     ]
     
-    return Response({
+    response_data = {
         'total_earnings': float(request.user.total_earnings),
         'earnings_history': earnings_data
-    })
+    }
+    if use_cursor:
+        response_data['next'] = cursor_page.next_cursor
+        response_data['previous'] = cursor_page.previous_cursor
+    return Response(response_data)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -97,7 +117,7 @@ def freelancer_profile_view(request):
         return Response({'error': 'Access denied - freelancer role required'}, status=status.HTTP_403_FORBIDDEN)
     
     # Get plan details
-    plan = Plan.objects.get(name=request.user.current_freelancer_plan)
+    plan = get_plan(request.user.current_freelancer_plan)
     
     profile_data = {
         'username': request.user.username,
@@ -14,6 +14,7 @@ class Notification(models.Model):
         ('message_received', 'Message Received'),
         ('account_activated', 'Account Activated'),
         ('task_completed', 'Task Completed'),
+        ('referral_bonus', 'Referral Bonus'),
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
@@ -27,6 +28,14 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read', 'created_at'], name='notification_user_read_idx'),
+            models.Index(
+                fields=['user', '-created_at'],
+                name='notification_unread_idx',
+                condition=models.Q(is_read=False)
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.user.username if self.user else 'Admin'}"
@@ -1,3 +1,4 @@
+from django.db import transaction
 from .models import Notification
 from .tasks import process_notification
 
@@ -18,4 +19,32 @@ def send_notification(user=None, user_type=None, title='', message='', notificat
     # Process notification asynchronously
     process_notification.delay(notification.id)
     
-    return notification
\ No newline at end of file
+    return notification
+
+def send_notifications_bulk(notifications):
+    """Insert many notifications at once and queue them for delivery after commit"""
+    if not notifications:
+        return []
+    
+    created = Notification.objects.bulk_create([
+        Notification(
+            user=item.get('user'),
+            user_type=item.get('user_type'),
+            title=item.get('title', ''),
+            message=item.get('message', ''),
+            notification_type=item.get('notification_type', ''),
+            data=item.get('data') or {}
+        )
+        for item in notifications
+    ])
+    
+    notification_ids = [notification.id for notification in created]
+    
+    def queue_delivery():
+        for notification_id in notification_ids:
+            process_notification.delay(notification_id)
+    
+    # Process notifications asynchronously once the rows are committed
+    transaction.on_commit(queue_delivery)
+    
+    return created
@@ -0,0 +1,237 @@
+from collections import deque
+from django.conf import settings
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+import logging
+import random
+import requests
+import stripe
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'apps.payments.gateway.StripeGateway',
+    'CONNECT_TIMEOUT': 3.0,
+    'READ_TIMEOUT': 10.0,
+    'MAX_CONCURRENCY': 10,      # Provider calls in flight per process
+    'ACQUIRE_TIMEOUT': 0.5,     # Wait this long for a slot before failing fast
+    'POOL_SIZE': 10,            # Persistent HTTPS connections kept per process
+    'MAX_RETRIES': 1,           # SDK retries; safe because calls carry idempotency keys
+    'FAILURE_THRESHOLD': 5,     # Consecutive failures that open the circuit
+    'RESET_TIMEOUT': 30.0,      # Seconds before a half-open probe is allowed
+}
+
+class PaymentGatewayError(Exception):
+    """The provider rejected the request (bad card, invalid params)"""
+
+class GatewayUnavailable(PaymentGatewayError):
+    """The provider is slow, down, or shed by the circuit breaker; safe to retry later"""
+
+class CircuitBreaker:
+    """Opens after consecutive failures, lets one probe through after reset_timeout"""
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    logger.warning('Payment gateway circuit opened after %s failures', self.failures)
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+class GatewayMetrics:
+    """Per-process call counters and a rolling latency window"""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.counters = {'calls': 0, 'succeeded': 0, 'rejected': 0, 'unavailable': 0, 'short_circuited': 0, 'saturated': 0}
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def observe(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            data = dict(self.counters)
+        if latencies:
+            data['latency_ms'] = {
+                'p50': round(latencies[len(latencies) // 2] * 1000, 1),
+                'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+                'max': round(latencies[-1] * 1000, 1),
+            }
+        return data
+
+class PaymentGateway:
+    """Wraps every provider call with a concurrency limit, the breaker and metrics"""
+
+    def __init__(self, config):
+        self.config = config
+        self.breaker = CircuitBreaker(config['FAILURE_THRESHOLD'], config['RESET_TIMEOUT'])
+        self.metrics = GatewayMetrics()
+        self._slots = threading.BoundedSemaphore(config['MAX_CONCURRENCY'])
+
+    def _call(self, operation, *args, **kwargs):
+        # Take a slot first: a half-open probe must not be claimed by a call that never runs
+        if not self._slots.acquire(timeout=self.config['ACQUIRE_TIMEOUT']):
+            self.metrics.count('saturated')
+            raise GatewayUnavailable('Payment provider is busy, try again shortly')
+        try:
+            if not self.breaker.allow():
+                self.metrics.count('short_circuited')
+                raise GatewayUnavailable('Payment provider is temporarily unavailable')
+
+            self.metrics.count('calls')
+            started = time.monotonic()
+            try:
+                result = operation(*args, **kwargs)
+            except GatewayUnavailable:
+                self.breaker.record_failure()
+                self.metrics.count('unavailable')
+                raise
+            except PaymentGatewayError:
+                # A business rejection proves the provider is healthy
+                self.breaker.record_success()
+                self.metrics.count('rejected')
+                raise
+            except Exception:
+                # Unexpected errors count against the provider and release a half-open probe
+                self.breaker.record_failure()
+                self.metrics.count('unavailable')
+                raise
+            else:
+                self.breaker.record_success()
+                self.metrics.count('succeeded')
+                return result
+            finally:
+                self.metrics.observe(time.monotonic() - started)
+        finally:
+            self._slots.release()
+
+    def create_payment_intent(self, amount_cents, currency, metadata, idempotency_key):
+        """Return {'id', 'client_secret'} for a new payment intent"""
+        return self._call(self._create_payment_intent, amount_cents, currency, metadata, idempotency_key)
+
+    def retrieve_event(self, event_id):
+        return self._call(self._retrieve_event, event_id)
+
+    def status(self):
+        return {'backend': type(self).__name__, 'circuit': self.breaker.state, **self.metrics.snapshot()}
+
+class StripeGateway(PaymentGateway):
+    def __init__(self, config):
+        super().__init__(config)
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config['POOL_SIZE'], max_retries=0)
+        session.mount('https://', adapter)
+        # The SDK's client is module-global; share one pooled session for every call
+        stripe.default_http_client = stripe.http_client.RequestsClient(
+            timeout=(config['CONNECT_TIMEOUT'], config['READ_TIMEOUT']),
+            session=session
+        )
+        stripe.max_network_retries = config['MAX_RETRIES']
+        if settings.STRIPE_SECRET_KEY:
+            stripe.api_key = settings.STRIPE_SECRET_KEY
+
+    def _translate(self, fn, *args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except (stripe.error.APIConnectionError, stripe.error.RateLimitError, stripe.error.APIError) as e:
+            raise GatewayUnavailable(str(e)) from e
+        except stripe.error.StripeError as e:
+            raise PaymentGatewayError(str(e)) from e
+
+    def _create_payment_intent(self, amount_cents, currency, metadata, idempotency_key):
+        intent = self._translate(
+            stripe.PaymentIntent.create,
+            amount=amount_cents,
+            currency=currency,
+            metadata=metadata,
+            idempotency_key=idempotency_key
+        )
+        return {'id': intent.id, 'client_secret': intent.client_secret}
+
+    def _retrieve_event(self, event_id):
+        return self._translate(stripe.Event.retrieve, event_id).to_dict_recursive()
+
+class FakeGateway(PaymentGateway):
+    """Local provider with injectable latency and failures, honouring READ_TIMEOUT"""
+
+    def __init__(self, config, latency=0.0, failure_rate=0.0, decline_rate=0.0):
+        super().__init__(config)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.decline_rate = decline_rate
+
+    def _simulate(self):
+        if self.latency > self.config['READ_TIMEOUT']:
+            time.sleep(self.config['READ_TIMEOUT'])
+            raise GatewayUnavailable('Read timed out')
+        time.sleep(self.latency)
+        roll = random.random()
+        if roll < self.failure_rate:
+            raise GatewayUnavailable('Simulated provider error')
+        if roll < self.failure_rate + self.decline_rate:
+            raise PaymentGatewayError('Simulated decline')
+
+    def _create_payment_intent(self, amount_cents, currency, metadata, idempotency_key):
+        self._simulate()
+        intent_id = f'pi_fake_{uuid.uuid4().hex[:16]}'
+        return {'id': intent_id, 'client_secret': f'{intent_id}_secret'}
+
+    def _retrieve_event(self, event_id):
+        self._simulate()
+        raise PaymentGatewayError(f'No such event: {event_id}')
+
+def gateway_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'PAYMENT_GATEWAY', {}))
+    return config
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_payment_gateway():
+    """Process-wide gateway, so the connection pool, breaker and metrics are shared"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                config = gateway_config()
+                _gateway = import_string(config['BACKEND'])(config)
+    return _gateway
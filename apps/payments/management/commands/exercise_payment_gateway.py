@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from apps.payments.gateway import FakeGateway, GatewayUnavailable, PaymentGatewayError, gateway_config
+import json
+import time
+
+class Command(BaseCommand):
+    help = 'Drive the fake payment gateway with injected latency and failures and print its metrics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20, help='Simulated request threads')
+        parser.add_argument('--latency', type=float, default=0.05, help='Provider latency in seconds')
+        parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of calls failing as provider errors')
+        parser.add_argument('--decline-rate', type=float, default=0.0, help='Share of calls declined')
+        parser.add_argument('--read-timeout', type=float, help='Override READ_TIMEOUT')
+
+    def handle(self, *args, **options):
+        config = gateway_config()
+        if options['read_timeout'] is not None:
+            config['READ_TIMEOUT'] = options['read_timeout']
+        gateway = FakeGateway(
+            config,
+            latency=options['latency'],
+            failure_rate=options['failure_rate'],
+            decline_rate=options['decline_rate']
+        )
+
+        def call(i):
+            started = time.monotonic()
+            try:
+                gateway.create_payment_intent(1000, 'usd', {'n': i}, f'exercise_{i}')
+                outcome = 'ok'
+            except GatewayUnavailable:
+                outcome = 'unavailable'
+            except PaymentGatewayError:
+                outcome = 'declined'
+            return outcome, time.monotonic() - started
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(call, range(options['requests'])))
+        elapsed = time.monotonic() - started
+
+        outcomes = {}
+        for outcome, _ in results:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        worst = max(seconds for _, seconds in results)
+
+        self.stdout.write(f'outcomes: {outcomes}')
+        self.stdout.write(f'slowest caller wait: {worst * 1000:.1f}ms')
+        self.stdout.write(f'elapsed: {elapsed:.2f}s')
+        self.stdout.write(json.dumps(gateway.status(), indent=2))
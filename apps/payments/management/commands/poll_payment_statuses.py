@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from apps.payments.polling import FakeStatusProvider, poll_payment_statuses
+
+class Command(BaseCommand):
+    help = 'Run one status poll over due deposits and withdrawals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fake', action='store_true', help="Poll the 'fake' payment method with the local provider")
+        parser.add_argument('--fake-latency', type=float, default=0.05)
+        parser.add_argument('--fake-completion-rate', type=float, default=0.5)
+        parser.add_argument('--fake-failure-rate', type=float, default=0.1)
+
+    def handle(self, *args, **options):
+        providers = None
+        if options['fake']:
+            providers = {'fake': FakeStatusProvider(
+                latency=options['fake_latency'],
+                completion_rate=options['fake_completion_rate'],
+                failure_rate=options['fake_failure_rate']
+            )}
+
+        stats = poll_payment_statuses(providers=providers)
+        for key, value in stats.items():
+            self.stdout.write(f'{key}: {value}')
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from apps.payments.payouts import FakePayoutProvider, run_payouts
+
+class Command(BaseCommand):
+    help = 'Pay out pending withdrawals in batches and report throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Withdrawals claimed per batch (defaults to PAYOUTS)')
+        parser.add_argument('--concurrency', type=int, help='Provider calls in flight (defaults to PAYOUTS)')
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+        parser.add_argument('--fake', action='store_true', help='Use the local fake provider regardless of settings')
+        parser.add_argument('--fake-latency', type=float, default=0.05)
+        parser.add_argument('--fake-failure-rate', type=float, default=0.0)
+
+    def handle(self, *args, **options):
+        provider = None
+        if options['fake']:
+            provider = FakePayoutProvider(latency=options['fake_latency'], failure_rate=options['fake_failure_rate'])
+
+        totals = run_payouts(
+            max_batches=options['max_batches'],
+            provider=provider,
+            batch_size=options['batch_size'],
+            concurrency=options['concurrency']
+        )
+        for key, value in totals.items():
+            self.stdout.write(f'{key}: {value}')
+        self.stdout.write(self.style.SUCCESS('Payout run finished'))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from apps.payments.gateway import get_payment_gateway, PaymentGatewayError
+from apps.payments.models import StripeEvent
+from apps.payments.tasks import process_stripe_events
+from apps.payments.webhooks import record_stripe_event, replay_stripe_events
+
+class Command(BaseCommand):
+    help = 'Re-queue stored Stripe webhook events, optionally fetching missing ones from Stripe'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event-id', action='append', default=[], help='Event id to replay (repeatable)')
+        parser.add_argument('--failed', action='store_true', help='Replay every event that exhausted its retries')
+        parser.add_argument('--since', help='Replay events received at or after this ISO datetime')
+        parser.add_argument('--type', help='Only replay events of this type')
+        parser.add_argument('--fetch', action='store_true', help='Retrieve event ids that were never delivered from the Stripe API')
+        parser.add_argument('--sync', action='store_true', help='Process in this process instead of queueing the Celery task')
+
+    def handle(self, *args, **options):
+        if not (options['event_id'] or options['failed'] or options['since']):
+            raise CommandError('Provide --event-id, --failed or --since')
+
+        if options['fetch']:
+            known = set(StripeEvent.objects.filter(event_id__in=options['event_id']).values_list('event_id', flat=True))
+            for event_id in set(options['event_id']) - known:
+                try:
+                    event = get_payment_gateway().retrieve_event(event_id)
+                except PaymentGatewayError as e:
+                    raise CommandError(f'Could not fetch {event_id}: {e}')
+                record_stripe_event(event)
+                self.stdout.write(f'Fetched {event_id} from Stripe')
+
+        events = StripeEvent.objects.all()
+        if options['event_id']:
+            events = events.filter(event_id__in=options['event_id'])
+        if options['failed']:
+            events = events.filter(status='failed')
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError('--since must be an ISO datetime')
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            events = events.filter(received_at__gte=since)
+        if options['type']:
+            events = events.filter(event_type=options['type'])
+
+        count = replay_stripe_events(events)
+        if options['sync']:
+            self.stdout.write(process_stripe_events())
+        else:
+            process_stripe_events.delay()
+
+        self.stdout.write(self.style.SUCCESS(f'Queued {count} Stripe events for replay'))
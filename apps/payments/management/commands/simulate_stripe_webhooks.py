@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from decimal import Decimal
+from apps.core.ids import new_reference
+from apps.payments.models import Deposit
+from apps.users.models import User
+import hashlib
+import hmac
+import json
+import random
+import requests
+import time
+import uuid
+
+def sign_payload(payload, secret, timestamp=None):
+    """Build a Stripe-Signature header the same way Stripe does"""
+    timestamp = timestamp or int(time.time())
+    signature = hmac.new(secret.encode(), f'{timestamp}.{payload}'.encode(), hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={signature}'
+
+def build_event(deposit):
+    return {
+        'id': f'evt_{uuid.uuid4().hex[:24]}',
+        'object': 'event',
+        'type': 'payment_intent.succeeded',
+        'created': int(time.time()),
+        'data': {
+            'object': {
+                'id': f'pi_{uuid.uuid4().hex[:24]}',
+                'object': 'payment_intent',
+                'amount': int(deposit.amount * 100),
+                'currency': 'usd',
+                'metadata': {'deposit_id': str(deposit.id)},
+            }
+        },
+    }
+
+class Command(BaseCommand):
+    help = 'Local Stripe stand-in: fire bursts of signed payment_intent.succeeded events, including redeliveries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-email', required=True, help='Owner of the generated pending deposits')
+        parser.add_argument('--count', type=int, default=100, help='Number of distinct events')
+        parser.add_argument('--duplicates', type=int, default=2, help='Times each event is delivered')
+        parser.add_argument('--amount', default='10.00')
+        parser.add_argument('--url', help='Webhook URL of a running server; defaults to an in-process test client')
+        parser.add_argument('--concurrency', type=int, default=16, help='Parallel deliveries when --url is given')
+
+    def handle(self, *args, **options):
+        secret = settings.STRIPE_WEBHOOK_SECRET
+        if not secret:
+            raise CommandError('STRIPE_WEBHOOK_SECRET must be set to sign events')
+
+        user = User.objects.filter(email=options['user_email']).first()
+        if user is None:
+            raise CommandError('User not found')
+
+        deposits = Deposit.objects.bulk_create([
+            Deposit(
+                user=user,
+                amount=Decimal(options['amount']),
+                payment_method='stripe',
+                transaction_id=new_reference('dep'),
+                status='pending'
+            )
+            for _ in range(options['count'])
+        ])
+        payloads = [json.dumps(build_event(deposit)) for deposit in deposits] * options['duplicates']
+        random.shuffle(payloads)
+
+        if options['url']:
+            def deliver(payload):
+                response = requests.post(
+                    options['url'],
+                    data=payload,
+                    headers={'Content-Type': 'application/json', 'Stripe-Signature': sign_payload(payload, secret)},
+                    timeout=10
+                )
+                return response.status_code
+
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                started = time.monotonic()
+                statuses = list(pool.map(deliver, payloads))
+        else:
+            client = Client()
+            url = reverse('stripe_webhook')
+            started = time.monotonic()
+            statuses = [
+                client.post(url, data=payload, content_type='application/json',
+                            HTTP_STRIPE_SIGNATURE=sign_payload(payload, secret)).status_code
+                for payload in payloads
+            ]
+
+        elapsed = time.monotonic() - started
+        ok = statuses.count(200)
+        self.stdout.write(self.style.SUCCESS(
+            f'Delivered {len(payloads)} events ({ok} accepted) in {elapsed:.2f}s for {len(deposits)} deposits; '
+            f'expected wallet credit {Decimal(options["amount"]) * len(deposits)}'
+        ))
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_rollup_timestamps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deposit',
+            name='next_poll_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='deposit',
+            name='poll_attempts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='withdrawal',
+            name='next_poll_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='withdrawal',
+            name='poll_attempts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='deposit',
+            index=models.Index(fields=['status', 'next_poll_at'], name='deposit_poll_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='withdrawal',
+            index=models.Index(fields=['status', 'next_poll_at'], name='withdrawal_poll_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 # Create with:
 from django.db import models
+from django.utils import timezone
 from apps.users.models import User
 
 class Deposit(models.Model):
@@ -20,6 +21,15 @@ class Deposit(models.Model):
     metadata = models.JSONField(default=dict)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    next_poll_at = models.DateTimeField(null=True, blank=True)  # Status polling for providers without webhooks
+    poll_attempts = models.IntegerField(default=0)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='deposit_created_idx'),
+            models.Index(fields=['updated_at'], name='deposit_updated_idx'),
+            models.Index(fields=['status', 'next_poll_at'], name='deposit_poll_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - ${self.amount} - {self.status}"
@@ -43,7 +53,17 @@ class Withdrawal(models.Model):
     reference = models.CharField(max_length=100, blank=True)
     admin_notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     processed_at = models.DateTimeField(null=True, blank=True)
+    next_poll_at = models.DateTimeField(null=True, blank=True)
+    poll_attempts = models.IntegerField(default=0)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='withdrawal_created_idx'),
+            models.Index(fields=['updated_at'], name='withdrawal_updated_idx'),
+            models.Index(fields=['status', 'next_poll_at'], name='withdrawal_poll_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - ${self.amount} - {self.status}"
@@ -57,4 +77,31 @@ class PaymentMethod(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
-        return f"{self.user.username} - {self.method_type}"
\ No newline at end of file
+        return f"{self.user.username} - {self.method_type}"
+
+class StripeEvent(models.Model):
+    """Raw Stripe webhook event, stored once per event id and processed by a worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('failed', 'Failed'),
+    ]
+    
+    event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)  # Pushed back after each failure
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'received_at'], name='stripe_event_status_idx'),
+            models.Index(fields=['status', 'next_attempt_at'], name='stripe_event_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} - {self.event_id} - {self.status}"
@@ -0,0 +1,218 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import Withdrawal
+from apps.users.models import User
+from apps.wallets.models import Wallet
+from apps.wallets.ledger import post_transaction, InsufficientBalance
+from apps.notifications.utils import send_notification
+import logging
+import random
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'PROVIDER': None,        # Dotted path; nothing is paid out until one is configured
+    'BATCH_SIZE': 100,
+    'CONCURRENCY': 8,        # Provider calls in flight per worker
+}
+
+class PayoutError(Exception):
+    """The provider definitively refused the payout; the debit is reversed"""
+
+class PayoutResult:
+    def __init__(self, reference, status):
+        self.reference = reference
+        self.status = status  # 'completed', or 'processing' while the provider settles
+
+class PayoutProvider:
+    """Send money out; implementations must treat withdrawal.transaction_id as an idempotency key"""
+
+    def send(self, withdrawal):
+        raise NotImplementedError
+
+class FakePayoutProvider(PayoutProvider):
+    """Local stand-in with configurable latency and outcome mix"""
+
+    def __init__(self, latency=0.05, failure_rate=0.0, async_rate=0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.async_rate = async_rate
+
+    def send(self, withdrawal):
+        time.sleep(self.latency)
+        roll = random.random()
+        if roll < self.failure_rate:
+            raise PayoutError('Payout declined by provider')
+        status = 'processing' if roll < self.failure_rate + self.async_rate else 'completed'
+        return PayoutResult(f'fake_po_{uuid.uuid4().hex[:16]}', status)
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'PAYOUTS', {}))
+    return config
+
+def get_payout_provider():
+    provider = _config()['PROVIDER']
+    if not provider:
+        raise ImproperlyConfigured('PAYOUTS["PROVIDER"] is not set; refusing to pay out withdrawals')
+    provider = import_string(provider)() if isinstance(provider, str) else provider
+    if isinstance(provider, FakePayoutProvider) and not settings.DEBUG:
+        # The fake completes withdrawals without moving any money
+        raise ImproperlyConfigured('FakePayoutProvider can only be configured with DEBUG on')
+    return provider
+
+def claim_withdrawals(batch_size):
+    """Lock a batch of pending withdrawals, debit their wallets and mark them processing.
+
+    SKIP LOCKED lets parallel workers take disjoint batches; the debit and the
+    status change commit together, so a withdrawal is never claimed twice.
+    """
+    claimed, rejected = [], []
+    with transaction.atomic():
+        withdrawals = list(
+            Withdrawal.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('user')
+            .filter(status='pending')
+            .order_by('created_at')[:batch_size]
+        )
+        for withdrawal in withdrawals:
+            wallet, created = Wallet.objects.get_or_create(user_id=withdrawal.user_id)
+            try:
+                post_transaction(
+                    wallet=wallet,
+                    amount=withdrawal.amount,
+                    transaction_type='withdrawal',
+                    description=f'Withdrawal via {withdrawal.payment_method}',
+                    reference=withdrawal.transaction_id
+                )
+            except InsufficientBalance:
+                withdrawal.status = 'rejected'
+                withdrawal.admin_notes = 'Insufficient balance at payout time'
+                withdrawal.processed_at = timezone.now()
+                rejected.append(withdrawal)
+            else:
+                withdrawal.status = 'processing'
+                claimed.append(withdrawal)
+            withdrawal.updated_at = timezone.now()
+
+        Withdrawal.objects.bulk_update(withdrawals, ['status', 'admin_notes', 'processed_at', 'updated_at'])
+    return claimed, rejected
+
+def _send(provider, withdrawal):
+    try:
+        return provider.send(withdrawal), None
+    except Exception as e:
+        return None, e
+    finally:
+        close_old_connections()
+
+def complete_withdrawal(withdrawal, reference=''):
+    """Move a processing withdrawal to completed exactly once"""
+    with transaction.atomic():
+        updated = Withdrawal.objects.filter(id=withdrawal.id, status='processing').update(
+            status='completed',
+            reference=reference or withdrawal.reference,
+            processed_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+        if not updated:
+            return False
+        User.objects.filter(id=withdrawal.user_id).update(total_withdrawals=F('total_withdrawals') + withdrawal.amount)
+        send_notification(
+            user=withdrawal.user,
+            title='Withdrawal Completed',
+            message=f'Your withdrawal of ${withdrawal.amount} has been sent',
+            notification_type='withdrawal_completed'
+        )
+    return True
+
+def reverse_withdrawal(withdrawal, reason):
+    """Reject a processing withdrawal and credit the debited amount back"""
+    with transaction.atomic():
+        updated = Withdrawal.objects.filter(id=withdrawal.id, status='processing').update(
+            status='rejected',
+            admin_notes=reason,
+            processed_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+        if not updated:
+            return False
+        wallet, created = Wallet.objects.get_or_create(user_id=withdrawal.user_id)
+        post_transaction(
+            wallet=wallet,
+            amount=withdrawal.amount,
+            transaction_type='withdrawal_reversal',
+            description=f'Reversal of withdrawal {withdrawal.transaction_id}: {reason}',
+            reference=withdrawal.transaction_id
+        )
+    return True
+
+def process_withdrawal_batch(provider=None, batch_size=None, concurrency=None):
+    """Claim one batch, pay it out and record the outcomes"""
+    config = _config()
+    provider = provider or get_payout_provider()
+    batch_size = batch_size or config['BATCH_SIZE']
+    concurrency = concurrency or config['CONCURRENCY']
+
+    stats = {'claimed': 0, 'completed': 0, 'processing': 0, 'rejected': 0, 'errors': 0, 'amount': 0}
+    claimed, rejected = claim_withdrawals(batch_size)
+    stats['claimed'] = len(claimed) + len(rejected)
+    stats['rejected'] = len(rejected)
+    if not claimed:
+        return stats
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda w: _send(provider, w), claimed))
+
+    for withdrawal, (result, error) in zip(claimed, outcomes):
+        if isinstance(error, PayoutError):
+            reverse_withdrawal(withdrawal, str(error))
+            stats['rejected'] += 1
+        elif error is not None:
+            # Unknown outcome: never re-sent blindly. The poller resolves it by the
+            # client reference, the idempotency key the provider was sent
+            logger.error(f'Payout for withdrawal {withdrawal.id} failed with an unknown outcome: {error}')
+            Withdrawal.objects.filter(id=withdrawal.id).update(
+                reference=withdrawal.transaction_id,
+                next_poll_at=timezone.now(),
+                admin_notes=f'Payout error: {error}',
+                updated_at=timezone.now()
+            )
+            stats['errors'] += 1
+        elif result.status == 'completed':
+            complete_withdrawal(withdrawal, result.reference)
+            stats['completed'] += 1
+            stats['amount'] += withdrawal.amount
+        else:
+            # Only now does the status poller pick it up, by the provider's reference
+            Withdrawal.objects.filter(id=withdrawal.id).update(
+                reference=result.reference, next_poll_at=timezone.now(), updated_at=timezone.now()
+            )
+            stats['processing'] += 1
+    return stats
+
+def run_payouts(max_batches=None, **kwargs):
+    """Drain the pending queue and report totals and throughput"""
+    provider = kwargs.pop('provider', None) or get_payout_provider()
+    totals = {'batches': 0, 'claimed': 0, 'completed': 0, 'processing': 0, 'rejected': 0, 'errors': 0, 'amount': 0}
+    started = time.monotonic()
+
+    while max_batches is None or totals['batches'] < max_batches:
+        stats = process_withdrawal_batch(provider=provider, **kwargs)
+        if not stats['claimed']:
+            break
+        totals['batches'] += 1
+        for key, value in stats.items():
+            totals[key] += value
+
+    totals['elapsed'] = round(time.monotonic() - started, 3)
+    totals['per_second'] = round(totals['claimed'] / totals['elapsed'], 1) if totals['elapsed'] else 0.0
+    logger.info('Payout run: %s', totals)
+    return totals
@@ -0,0 +1,190 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from datetime import timedelta
+from .models import Deposit, Withdrawal
+from .payouts import complete_withdrawal, reverse_withdrawal
+from .webhooks import complete_deposit
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'PROVIDERS': {},         # payment_method -> dotted path of a StatusProvider
+    'BATCH_SIZE': 500,       # Rows claimed per model per run
+    'CONCURRENCY': 20,       # Provider requests in flight across all providers
+    'BASE_DELAY': 30,        # Seconds before the second check; doubles per attempt
+    'MAX_DELAY': 3600,
+    'MAX_ATTEMPTS': 30,      # Then deposits are cancelled and withdrawals left for an admin
+    'CLAIM_TIMEOUT': 300,    # A crashed poller's rows become due again after this
+}
+
+# Statuses a provider may report for a payment reference
+COMPLETED, FAILED, PENDING = 'completed', 'failed', 'pending'
+
+class StatusProvider:
+    """Asynchronous status lookups for one payment method.
+
+    check_many receives up to max_batch payments and returns {payment.id: status};
+    missing ids are treated as still pending. A withdrawal whose payout outcome
+    was unknown carries its transaction_id as the reference; a provider that
+    never received it should report it as failed so the debit is reversed.
+    """
+    max_batch = 50
+
+    async def check_many(self, payments):
+        raise NotImplementedError
+
+class FakeStatusProvider(StatusProvider):
+    """Local provider that settles payments at random after a simulated round trip"""
+
+    def __init__(self, latency=0.05, completion_rate=0.5, failure_rate=0.1):
+        self.latency = latency
+        self.completion_rate = completion_rate
+        self.failure_rate = failure_rate
+
+    async def check_many(self, payments):
+        await asyncio.sleep(self.latency)
+        results = {}
+        for payment in payments:
+            roll = random.random()
+            if roll < self.completion_rate:
+                results[payment.id] = COMPLETED
+            elif roll < self.completion_rate + self.failure_rate:
+                results[payment.id] = FAILED
+            else:
+                results[payment.id] = PENDING
+        return results
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'PAYMENT_STATUS_POLLING', {}))
+    return config
+
+def deposit_payment_methods():
+    """Methods users may deposit with: Stripe (confirmed by webhook) and every polled method"""
+    return ['stripe'] + [method for method in _config()['PROVIDERS'] if method != 'stripe']
+
+def get_status_providers():
+    return {method: import_string(path)() for method, path in _config()['PROVIDERS'].items()}
+
+def backoff_delay(attempts, config):
+    """Exponential backoff with jitter, capped at MAX_DELAY"""
+    delay = min(config['BASE_DELAY'] * (2 ** attempts), config['MAX_DELAY'])
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+def _due(model, now):
+    if model is Withdrawal:
+        # The payout engine schedules a withdrawal only after send() handed back a
+        # provider reference; rows it is still sending must never be polled
+        return Q(next_poll_at__lte=now) & ~Q(reference='')
+    return Q(next_poll_at__isnull=True) | Q(next_poll_at__lte=now)
+
+def claim_due(model, status, methods, config):
+    """Lease due rows to this poller by pushing next_poll_at past the claim timeout"""
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            model.objects.select_for_update(skip_locked=True)
+            .filter(status=status, payment_method__in=methods, poll_attempts__lt=config['MAX_ATTEMPTS'])
+            .filter(_due(model, now))
+            .order_by(F('next_poll_at').asc(nulls_first=True))[:config['BATCH_SIZE']]
+        )
+        model.objects.filter(id__in=[row.id for row in rows]).update(
+            next_poll_at=now + timedelta(seconds=config['CLAIM_TIMEOUT'])
+        )
+    return rows
+
+async def _check_all(work, concurrency):
+    """Run every (provider, batch) lookup with one shared concurrency limit"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(provider, batch):
+        async with semaphore:
+            try:
+                return await provider.check_many(batch)
+            except Exception:
+                logger.exception(f'Status lookup failed for {len(batch)} {type(provider).__name__} payments')
+                return {}
+
+    results = await asyncio.gather(*(run(provider, batch) for provider, batch in work))
+    merged = {}
+    for result in results:
+        merged.update(result)
+    return merged
+
+def _lookup(rows, providers, config):
+    work = []
+    by_method = {}
+    for row in rows:
+        by_method.setdefault(row.payment_method, []).append(row)
+    for method, payments in by_method.items():
+        provider = providers[method]
+        for i in range(0, len(payments), provider.max_batch):
+            work.append((provider, payments[i:i + provider.max_batch]))
+    return asyncio.run(_check_all(work, config['CONCURRENCY'])) if work else {}
+
+def _reschedule(model, rows, config):
+    """Bulk-write the next check time for payments that are still pending"""
+    now = timezone.now()
+    for row in rows:
+        row.poll_attempts += 1
+        row.next_poll_at = now + backoff_delay(row.poll_attempts, config)
+    model.objects.bulk_update(rows, ['poll_attempts', 'next_poll_at'], batch_size=500)
+
+def poll_payment_statuses(providers=None):
+    """Check pending deposits and processing withdrawals with their providers and apply the results"""
+    config = _config()
+    providers = providers if providers is not None else get_status_providers()
+    stats = {'checked': 0, 'completed': 0, 'failed': 0, 'pending': 0, 'given_up': 0}
+    if not providers:
+        return stats
+
+    started = time.monotonic()
+    for model, status in [(Deposit, 'pending'), (Withdrawal, 'processing')]:
+        rows = claim_due(model, status, list(providers), config)
+        if not rows:
+            continue
+        results = _lookup(rows, providers, config)
+        stats['checked'] += len(rows)
+
+        still_pending, failed_ids = [], []
+        for row in rows:
+            result = results.get(row.id, PENDING)
+            if result == COMPLETED:
+                if model is Deposit:
+                    with transaction.atomic():
+                        complete_deposit(row.id, f'Deposit via {row.payment_method}')
+                else:
+                    complete_withdrawal(row)
+                stats['completed'] += 1
+            elif result == FAILED:
+                if model is Deposit:
+                    failed_ids.append(row.id)
+                else:
+                    reverse_withdrawal(row, f'{row.payment_method} reported the payout as failed')
+                stats['failed'] += 1
+            else:
+                still_pending.append(row)
+                stats['pending'] += 1
+
+        if failed_ids:
+            Deposit.objects.filter(id__in=failed_ids, status='pending').update(status='failed', updated_at=timezone.now())
+
+        _reschedule(model, still_pending, config)
+        exhausted = [row.id for row in still_pending if row.poll_attempts >= config['MAX_ATTEMPTS']]
+        if exhausted and model is Deposit:
+            # Never confirmed: stop waiting on it
+            Deposit.objects.filter(id__in=exhausted, status='pending').update(status='cancelled', updated_at=timezone.now())
+        elif exhausted:
+            logger.warning(f'Withdrawals {exhausted} never settled with their provider; needs manual review')
+        stats['given_up'] += len(exhausted)
+
+    stats['elapsed'] = round(time.monotonic() - started, 3)
+    logger.info('Payment status poll: %s', stats)
+    return stats
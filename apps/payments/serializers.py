@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Deposit, Withdrawal, PaymentMethod
+from .polling import deposit_payment_methods
 
 class DepositSerializer(serializers.ModelSerializer):
     class Meta:
@@ -21,7 +22,12 @@ class PaymentMethodSerializer(serializers.ModelSerializer):
 
 class CreateDepositSerializer(serializers.Serializer):
     amount = serializers.DecimalField(max_digits=10, decimal_places=2)
-    payment_method = serializers.CharField()
+    payment_method = serializers.ChoiceField(choices=[])
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Read per instance so the polled methods follow settings
+        self.fields['payment_method'].choices = deposit_payment_methods()
 
 class CreateWithdrawalSerializer(serializers.Serializer):
     amount = serializers.DecimalField(max_digits=10, decimal_places=2)
@@ -0,0 +1,46 @@
+from celery import shared_task
+from django.core.exceptions import ImproperlyConfigured
+from .payouts import get_payout_provider, run_payouts
+from .polling import poll_payment_statuses as poll_statuses
+from .webhooks import process_stripe_event_batch, BATCH_SIZE
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCHES_PER_RUN = 50
+
+@shared_task
+def process_stripe_events(batch_size=BATCH_SIZE):
+    """Drain pending Stripe webhook events in batches"""
+    processed = failed = 0
+    for _ in range(MAX_BATCHES_PER_RUN):
+        result = process_stripe_event_batch(batch_size)
+        processed += result['processed']
+        failed += result['failed']
+        if not result['batch_full']:
+            break
+    return f"Processed {processed} Stripe events, {failed} failed"
+
+@shared_task
+def process_withdrawals(max_batches=50):
+    """Pay out pending withdrawals; run on several workers to drain faster"""
+    try:
+        provider = get_payout_provider()
+    except ImproperlyConfigured as e:
+        logger.warning('Skipping withdrawal payouts: %s', e)
+        return f'Skipped: {e}'
+    totals = run_payouts(max_batches=max_batches, provider=provider)
+    return (
+        f"Claimed {totals['claimed']} withdrawals: {totals['completed']} completed, "
+        f"{totals['processing']} processing, {totals['rejected']} rejected, {totals['errors']} errors "
+        f"({totals['per_second']}/s)"
+    )
+
+@shared_task
+def poll_payment_statuses():
+    """Check providers without webhooks for deposits and withdrawals that are due"""
+    stats = poll_statuses()
+    return (
+        f"Checked {stats['checked']} payments: {stats['completed']} completed, "
+        f"{stats['failed']} failed, {stats['pending']} still pending"
+    )
@@ -0,0 +1,55 @@
+from decimal import Decimal
+from django.test import TestCase
+from apps.core.ids import new_reference
+from apps.payments.models import Withdrawal
+from apps.payments.payouts import PayoutProvider, process_withdrawal_batch
+from apps.payments.polling import FAILED, StatusProvider, poll_payment_statuses
+from apps.users.models import User
+from apps.wallets.ledger import post_transaction
+from apps.wallets.models import Wallet
+
+class TimeoutPayoutProvider(PayoutProvider):
+    """The request may or may not have reached the provider"""
+
+    def send(self, withdrawal):
+        raise TimeoutError('read timed out')
+
+class UnknownPayoutStatusProvider(StatusProvider):
+    """Never received the payout"""
+
+    def __init__(self):
+        self.seen = []
+
+    async def check_many(self, payments):
+        self.seen.extend(payment.reference for payment in payments)
+        return {payment.id: FAILED for payment in payments}
+
+class UnknownPayoutOutcomeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='payee@example.com', username='payee', password='pass')
+        self.wallet = Wallet.objects.create(user=self.user)
+        post_transaction(self.wallet, Decimal('100.00'), 'deposit', 'Seed')
+        self.withdrawal = Withdrawal.objects.create(
+            user=self.user, amount=Decimal('40.00'), payment_method='bank',
+            account_details={}, transaction_id=new_reference('wd')
+        )
+
+    def test_unknown_outcome_is_polled_and_reversed(self):
+        stats = process_withdrawal_batch(provider=TimeoutPayoutProvider(), concurrency=1)
+        self.assertEqual(stats['errors'], 1)
+
+        self.withdrawal.refresh_from_db()
+        self.assertEqual(self.withdrawal.status, 'processing')
+        self.assertEqual(self.withdrawal.reference, self.withdrawal.transaction_id)
+        self.assertIsNotNone(self.withdrawal.next_poll_at)
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('60.00'))
+
+        provider = UnknownPayoutStatusProvider()
+        poll_payment_statuses(providers={'bank': provider})
+
+        self.assertEqual(provider.seen, [self.withdrawal.transaction_id])
+        self.withdrawal.refresh_from_db()
+        self.assertEqual(self.withdrawal.status, 'rejected')
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('100.00'))
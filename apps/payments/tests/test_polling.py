@@ -0,0 +1,40 @@
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from apps.payments.models import Deposit
+from apps.payments.polling import COMPLETED, StatusProvider, poll_payment_statuses
+from apps.users.models import User
+from apps.wallets.models import Wallet
+
+class SettlingStatusProvider(StatusProvider):
+    """Reports every payment as completed"""
+
+    async def check_many(self, payments):
+        return {payment.id: COMPLETED for payment in payments}
+
+POLLING = {'PROVIDERS': {'polled': 'apps.payments.tests.test_polling.SettlingStatusProvider'}}
+
+@override_settings(PAYMENT_STATUS_POLLING=POLLING)
+class PolledDepositTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='payer@example.com', username='payer', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_polled_deposit_is_created_and_completed(self):
+        response = self.client.post('/api/payments/deposit/', {'amount': '25.00', 'payment_method': 'polled'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        deposit = Deposit.objects.get(id=response.json()['deposit_id'])
+        self.assertEqual(deposit.status, 'pending')
+
+        stats = poll_payment_statuses()
+
+        self.assertEqual(stats['completed'], 1)
+        deposit.refresh_from_db()
+        self.assertEqual(deposit.status, 'completed')
+        self.assertEqual(Wallet.objects.get(user=self.user).balance, Decimal('25.00'))
+
+    def test_unknown_method_is_rejected(self):
+        response = self.client.post('/api/payments/deposit/', {'amount': '25.00', 'payment_method': 'cash'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Deposit.objects.exists())
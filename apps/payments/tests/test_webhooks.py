@@ -0,0 +1,82 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.core.ids import new_reference
+from apps.payments.management.commands.simulate_stripe_webhooks import build_event, sign_payload
+from apps.payments.models import Deposit, StripeEvent
+from apps.payments.webhooks import RETRY_BASE_DELAY, process_stripe_event_batch
+from apps.users.models import User
+from apps.wallets.models import Wallet
+import json
+
+SECRET = 'whsec_test'
+
+@override_settings(STRIPE_WEBHOOK_SECRET=SECRET)
+class StripeWebhookTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='payer@example.com', username='payer', password='pass')
+        self.deposit = Deposit.objects.create(
+            user=self.user, amount=Decimal('10.00'), payment_method='stripe',
+            transaction_id=new_reference('dep'), status='pending'
+        )
+
+    def deliver(self, payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                '/api/payments/webhook/stripe/', data=payload, content_type='application/json',
+                HTTP_STRIPE_SIGNATURE=sign_payload(payload, SECRET)
+            )
+
+    def test_duplicate_deliveries_credit_once(self):
+        payload = json.dumps(build_event(self.deposit))
+        for _ in range(3):
+            self.assertEqual(self.deliver(payload).status_code, 200)
+
+        self.assertEqual(StripeEvent.objects.get().status, 'processed')
+        self.deposit.refresh_from_db()
+        self.assertEqual(self.deposit.status, 'completed')
+        self.assertEqual(Wallet.objects.get(user=self.user).balance, Decimal('10.00'))
+
+    def test_redelivered_event_with_new_id_credits_once(self):
+        # Stripe can also send a second event for the same payment
+        self.deliver(json.dumps(build_event(self.deposit)))
+        self.deliver(json.dumps(build_event(self.deposit)))
+
+        self.assertEqual(StripeEvent.objects.filter(status='processed').count(), 2)
+        self.assertEqual(Wallet.objects.get(user=self.user).balance, Decimal('10.00'))
+
+    def test_bad_signature_is_rejected(self):
+        payload = json.dumps(build_event(self.deposit))
+        response = self.client.post(
+            '/api/payments/webhook/stripe/', data=payload, content_type='application/json',
+            HTTP_STRIPE_SIGNATURE=sign_payload(payload, 'whsec_other')
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    def test_failed_event_backs_off(self):
+        failing = {'payment_intent.succeeded': mock.Mock(side_effect=RuntimeError('ledger down'))}
+        with mock.patch.dict('apps.payments.webhooks.EVENT_HANDLERS', failing):
+            self.deliver(json.dumps(build_event(self.deposit)))
+            event = StripeEvent.objects.get()
+            self.assertEqual((event.status, event.attempts, event.last_error), ('pending', 1, 'ledger down'))
+            delay = event.next_attempt_at - timezone.now()
+            self.assertTrue(timedelta(seconds=RETRY_BASE_DELAY - 5) < delay <= timedelta(seconds=RETRY_BASE_DELAY))
+
+            # Not due yet
+            self.assertEqual(process_stripe_event_batch(), {'processed': 0, 'failed': 0, 'batch_full': False})
+
+            StripeEvent.objects.update(next_attempt_at=timezone.now())
+            process_stripe_event_batch()
+            event.refresh_from_db()
+            self.assertEqual(event.attempts, 2)
+            delay = event.next_attempt_at - timezone.now()
+            self.assertTrue(timedelta(seconds=2 * RETRY_BASE_DELAY - 5) < delay <= timedelta(seconds=2 * RETRY_BASE_DELAY))
+
+        self.assertEqual(Wallet.objects.filter(user=self.user, balance__gt=0).count(), 0)
+        StripeEvent.objects.update(next_attempt_at=timezone.now())
+        process_stripe_event_batch()
+        self.assertEqual(StripeEvent.objects.get().status, 'processed')
+        self.assertEqual(Wallet.objects.get(user=self.user).balance, Decimal('10.00'))
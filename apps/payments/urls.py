@@ -8,4 +8,5 @@ urlpatterns = [
     path('withdrawal/', views.create_withdrawal_view, name='create_withdrawal'),
     path('methods/', views.user_payment_methods_view, name='payment_methods'),
     path('methods/add/', views.add_payment_method_view, name='add_payment_method'),
+    path('gateway/status/', views.payment_gateway_status_view, name='payment_gateway_status'),
 ]
\ No newline at end of file
@@ -1,22 +1,23 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from django.db import transaction
 from django.utils import timezone
 from .models import Deposit, Withdrawal, PaymentMethod
 from .serializers import CreateDepositSerializer, CreateWithdrawalSerializer, PaymentMethodSerializer
 from apps.wallets.models import Wallet, Transaction
-from apps.referrals.models import ReferralBonus
-from apps.notifications.utils import send_notification
+from .tasks import process_stripe_events
+from .gateway import get_payment_gateway, GatewayUnavailable, PaymentGatewayError
+from .webhooks import record_stripe_event
+from apps.core.ids import new_reference
 import stripe
+import json
 from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
-if settings.STRIPE_SECRET_KEY:
-    stripe.api_key = settings.STRIPE_SECRET_KEY
-
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_deposit_view(request):
@@ -33,24 +34,29 @@ def create_deposit_view(request):
             user=request.user,
             amount=amount,
             payment_method=payment_method,
-            transaction_id=f'dep_{request.user.id}_{timezone.now().timestamp()}',
+            transaction_id=new_reference('dep'),
             status='pending'
         )
         
         # Process payment based on method
         if payment_method == 'stripe':
             try:
-                intent = stripe.PaymentIntent.create(
-                    amount=int(amount * 100),  # Stripe uses cents
+                intent = get_payment_gateway().create_payment_intent(
+                    amount_cents=int(amount * 100),  # Stripe uses cents
                     currency='usd',
-                    metadata={'deposit_id': deposit.id}
+                    metadata={'deposit_id': deposit.id},
+                    idempotency_key=deposit.transaction_id
                 )
                 
                 return Response({
-                    'client_secret': intent.client_secret,
+                    'client_secret': intent['client_secret'],
                     'deposit_id': deposit.id
                 })
-            except stripe.error.StripeError as e:
+            except GatewayUnavailable as e:
+                deposit.status = 'failed'
+                deposit.save()
+                return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            except PaymentGatewayError as e:
                 deposit.status = 'failed'
                 deposit.save()
                 return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -64,8 +70,11 @@ def create_deposit_view(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@throttle_classes([])
 def webhook_stripe_view(request):
+    """Verify and store the event, then leave processing to the worker"""
     payload = request.body
     sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
     
@@ -78,47 +87,9 @@ def webhook_stripe_view(request):
     except stripe.error.SignatureVerificationError:
         return Response({'error': 'Invalid signature'}, status=400)
     
-    if event['type'] == 'payment_intent.succeeded':
-        intent = event['data']['object']
-        deposit_id = intent['metadata'].get('deposit_id')
-        
-        try:
-            deposit = Deposit.objects.get(id=deposit_id)
-            deposit.status = 'completed'
-            deposit.save()
-            
-            # Add to wallet
-            wallet, created = Wallet.objects.get_or_create(user=deposit.user)
-            Transaction.objects.create(
-                wallet=wallet,
-                amount=deposit.amount,
-                transaction_type='deposit',
-                description='Deposit via Stripe',
-                reference=deposit.transaction_id
-            )
-            
-            # Update user deposit total
-            deposit.user.total_deposits += deposit.amount
-            deposit.user.save()
-            
-            # Process referral bonus if applicable
-            if deposit.user.referred_by:
-                ReferralBonus.objects.create(
-                    referrer=deposit.user.referred_by,
-                    referee=deposit.user,
-                    amount=deposit.amount * 0.1,  # 10% referral bonus
-                    deposit=deposit
-                )
-            
-            send_notification(
-                user=deposit.user,
-                title='Deposit Completed',
-                message=f'Your deposit of ${deposit.amount} has been completed successfully',
-                notification_type='deposit_completed'
-            )
-            
-        except Deposit.DoesNotExist:
-            logger.error(f'Deposit with ID {deposit_id} not found')
+    # Store the raw body as delivered; handlers read plain dicts
+    if record_stripe_event(json.loads(payload)):
+        transaction.on_commit(process_stripe_events.delay)
     
     return Response({'status': 'success'})
 
@@ -154,7 +125,7 @@ def create_withdrawal_view(request):
             amount=amount,
             payment_method=payment_method.method_type,
             account_details=account_details,
-            transaction_id=f'wd_{request.user.id}_{timezone.now().timestamp()}',
+            transaction_id=new_reference('wd'),
             status='pending'
         )
         
@@ -193,4 +164,13 @@ def add_payment_method_view(request):
         'message': 'Payment method added',
         'method_id': payment_method.id,
         'is_verified': payment_method.is_verified
-    })
\ No newline at end of file
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def payment_gateway_status_view(request):
+    """Circuit state, call counters and latency of this worker's gateway"""
+    if request.user.user_type not in ['admin', 'moderator']:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    return Response(get_payment_gateway().status())
@@ -0,0 +1,124 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
+from .models import Deposit, StripeEvent
+from apps.users.models import User
+from apps.wallets.models import Wallet
+from apps.wallets.ledger import post_transaction
+from apps.referrals.models import ReferralBonus
+from apps.notifications.utils import send_notification
+import logging
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 30     # Seconds before the first retry, doubled after each failure
+RETRY_MAX_DELAY = 3600
+REFERRAL_BONUS_RATE = Decimal('0.10')
+
+def record_stripe_event(event):
+    """Store a verified event once; returns False for a redelivery"""
+    try:
+        with transaction.atomic():
+            StripeEvent.objects.create(
+                event_id=event['id'],
+                event_type=event['type'],
+                payload=event
+            )
+    except IntegrityError:
+        return False
+    return True
+
+def complete_deposit(deposit_id, description):
+    """Credit a deposit exactly once, whichever confirmation path gets there first"""
+    # Only the first transition to completed credits the wallet
+    if not Deposit.objects.filter(id=deposit_id).exclude(status='completed').update(status='completed', updated_at=timezone.now()):
+        if not Deposit.objects.filter(id=deposit_id).exists():
+            logger.error(f'Deposit with ID {deposit_id} not found')
+        return False
+
+    deposit = Deposit.objects.select_related('user').get(id=deposit_id)
+
+    # Add to wallet
+    wallet, created = Wallet.objects.get_or_create(user=deposit.user)
+    post_transaction(
+        wallet=wallet,
+        amount=deposit.amount,
+        transaction_type='deposit',
+        description=description,
+        reference=deposit.transaction_id
+    )
+
+    # Update user deposit total
+    User.objects.filter(id=deposit.user_id).update(total_deposits=F('total_deposits') + deposit.amount)
+
+    # Process referral bonus if applicable
+    if deposit.user.referred_by_id:
+        ReferralBonus.objects.create(
+            referrer_id=deposit.user.referred_by_id,
+            referee=deposit.user,
+            amount=(deposit.amount * REFERRAL_BONUS_RATE).quantize(Decimal('0.01')),
+            deposit=deposit
+        )
+
+    send_notification(
+        user=deposit.user,
+        title='Deposit Completed',
+        message=f'Your deposit of ${deposit.amount} has been completed successfully',
+        notification_type='deposit_completed'
+    )
+    return True
+
+def handle_payment_intent_succeeded(event):
+    intent = event['data']['object']
+    complete_deposit(intent.get('metadata', {}).get('deposit_id'), 'Deposit via Stripe')
+
+EVENT_HANDLERS = {
+    'payment_intent.succeeded': handle_payment_intent_succeeded,
+}
+
+def retry_delay(attempts):
+    """Exponential backoff after the given number of failed attempts"""
+    return timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY))
+
+def process_stripe_event_batch(batch_size=BATCH_SIZE):
+    """Process one batch of due events; safe to run from several workers at once"""
+    processed = failed = 0
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            StripeEvent.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('received_at')[:batch_size]
+        )
+        for event in events:
+            handler = EVENT_HANDLERS.get(event.event_type)
+            try:
+                # Savepoint per event so one failure does not roll back the batch
+                with transaction.atomic():
+                    if handler:
+                        handler(event.payload)
+            except Exception as e:
+                logger.exception(f'Failed to process Stripe event {event.event_id}')
+                event.attempts += 1
+                event.last_error = str(e)
+                event.status = 'failed' if event.attempts >= MAX_ATTEMPTS else 'pending'
+                event.next_attempt_at = now + retry_delay(event.attempts)
+                failed += 1
+            else:
+                event.attempts += 1
+                event.last_error = ''
+                event.status = 'processed'
+                event.processed_at = timezone.now()
+                processed += 1
+
+        StripeEvent.objects.bulk_update(events, ['status', 'attempts', 'last_error', 'processed_at', 'next_attempt_at'])
+
+    return {'processed': processed, 'failed': failed, 'batch_full': len(events) == batch_size}
+
+def replay_stripe_events(queryset):
+    """Queue stored events for processing again; handlers skip work already applied"""
+    return queryset.update(status='pending', attempts=0, last_error='', processed_at=None, next_attempt_at=timezone.now())
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class PlansConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.plans'
\ No newline at end of file
+    name = 'apps.plans'
+    
+    def ready(self):
+        import apps.plans.signals
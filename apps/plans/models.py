@@ -19,6 +19,19 @@ class Plan(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Copied into access tokens; editing one makes holders refresh
+    CLAIM_FIELDS = ['name', 'is_active', 'priority', 'max_concurrent_tasks', 'daily_task_limit']
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_claims = instance._claim_state()
+        return instance
+    
+    def _claim_state(self):
+        # Deferred fields are missing from __dict__ and compare as unchanged
+        return {field: self.__dict__.get(field) for field in self.CLAIM_FIELDS}
+    
     def __str__(self):
         return self.name
 
@@ -0,0 +1,89 @@
+from django.core.cache import cache
+from django.db import transaction
+from .models import Plan
+from apps.core.utils import cache_is_shared
+from collections import namedtuple
+from types import MappingProxyType
+import threading
+import time
+
+VERSION_CACHE_KEY = 'plan_registry_version'
+VERSION_CHECK_INTERVAL = 5   # Seconds another worker's plan edit may take to show up here
+LOCAL_RELOAD_INTERVAL = 60   # Without a shared cache the version key is per process; reload this often instead
+
+# Immutable once built; readers take a reference and never see a half-built snapshot
+Snapshot = namedtuple('Snapshot', ['version', 'loaded_at', 'checked_at', 'by_name', 'by_id'])
+
+_snapshot = None
+_lock = threading.Lock()
+
+def _current_version():
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(VERSION_CACHE_KEY, 1, None)
+        version = cache.get(VERSION_CACHE_KEY, 1)
+    return version
+
+def _is_fresh(snapshot, now):
+    return snapshot is not None and now - snapshot.checked_at < VERSION_CHECK_INTERVAL
+
+def _load():
+    global _snapshot
+    snapshot, now = _snapshot, time.monotonic()
+    if _is_fresh(snapshot, now):
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if _is_fresh(snapshot, now):
+            return snapshot
+        version = _current_version()
+        stale = (
+            snapshot is None
+            or version != snapshot.version
+            or (not cache_is_shared() and now - snapshot.loaded_at >= LOCAL_RELOAD_INTERVAL)
+        )
+        if stale:
+            plans = list(Plan.objects.order_by('priority'))
+            snapshot = Snapshot(
+                version, now, now,
+                MappingProxyType({plan.name: plan for plan in plans}),
+                MappingProxyType({plan.id: plan for plan in plans}),
+            )
+        else:
+            snapshot = snapshot._replace(checked_at=now)
+        _snapshot = snapshot
+    return snapshot
+
+def all_plans():
+    """Every plan, lowest priority first; treat the instances as read-only"""
+    return list(_load().by_name.values())
+
+def get_plan(name):
+    try:
+        return _load().by_name[name]
+    except KeyError:
+        raise Plan.DoesNotExist(f'Plan {name!r} does not exist')
+
+def get_plan_by_id(plan_id):
+    try:
+        return _load().by_id[int(plan_id)]
+    except (KeyError, TypeError, ValueError):
+        raise Plan.DoesNotExist(f'Plan {plan_id!r} does not exist')
+
+def is_active_plan(name):
+    plan = _load().by_name.get(name)
+    return plan is not None and plan.is_active
+
+def _invalidate():
+    global _snapshot
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, 1, None)
+    _snapshot = None
+
+def invalidate_plan_registry():
+    """Reload plans here now, and in other workers within VERSION_CHECK_INTERVAL
+    with a shared cache or LOCAL_RELOAD_INTERVAL without one"""
+    transaction.on_commit(_invalidate)
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Plan
+from .registry import invalidate_plan_registry
+from apps.authentication.entitlements import bump_plan_entitlements
+
+@receiver(post_save, sender=Plan)
+def plan_saved(sender, instance, created, **kwargs):
+    invalidate_plan_registry()
+    # Access tokens carry plan limits; make holders refresh them only when those change
+    loaded = getattr(instance, '_loaded_claims', None)
+    current = instance._claim_state()
+    if created or loaded is None:
+        bump_plan_entitlements(instance.name)
+    elif loaded != current:
+        bump_plan_entitlements(instance.name)
+        if loaded['name'] and loaded['name'] != current['name']:
+            bump_plan_entitlements(loaded['name'])
+    instance._loaded_claims = current
+
+@receiver(post_delete, sender=Plan)
+def plan_deleted(sender, instance, **kwargs):
+    invalidate_plan_registry()
+    bump_plan_entitlements(instance.name)
@@ -3,9 +3,12 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .models import Plan, PlanUpgrade
+from .registry import all_plans, get_plan, get_plan_by_id
 from .serializers import PlanSerializer, PlanUpgradeRequestSerializer
 from apps.wallets.models import Wallet, Transaction
+from apps.wallets.ledger import post_transaction, InsufficientBalance
 from apps.notifications.utils import send_notification
+from apps.core.ids import new_reference
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,7 +16,7 @@ logger = logging.getLogger(__name__)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def plan_list_view(request):
-    plans = Plan.objects.filter(is_active=True)
+    plans = [plan for plan in all_plans() if plan.is_active]
     serializer = PlanSerializer(plans, many=True)
     return Response(serializer.data)
 
@@ -23,13 +26,13 @@ def upgrade_plan_view(request):
     serializer = PlanUpgradeRequestSerializer(data=request.data)
     if serializer.is_valid():
         try:
-            new_plan = Plan.objects.get(id=serializer.validated_data['plan_id'])
+            new_plan = get_plan_by_id(serializer.validated_data['plan_id'])
             user = request.user
             
             if user.plan == new_plan.name:
                 return Response({'error': 'You are already on this plan'}, status=status.HTTP_400_BAD_REQUEST)
             
-            if new_plan.priority <= Plan.objects.get(name=user.plan).priority:
+            if new_plan.priority <= get_plan(user.plan).priority:
                 return Response({'error': 'Cannot downgrade to a lower priority plan'}, status=status.HTTP_400_BAD_REQUEST)
             
             # Check if user has sufficient balance
@@ -38,13 +41,17 @@ def upgrade_plan_view(request):
                 return Response({'error': 'Insufficient balance'}, status=status.HTTP_400_BAD_REQUEST)
             
             # Process payment
-            Transaction.objects.create(
-                wallet=wallet,
-                amount=new_plan.monthly_price,
-                transaction_type='plan_upgrade',
-                description=f'Plan upgrade from {user.plan} to {new_plan.name}',
-                reference=f'upgrade_{user.id}'
-            )
+            upgrade_reference = new_reference('upgrade')
+            try:
+                post_transaction(
+                    wallet=wallet,
+                    amount=new_plan.monthly_price,
+                    transaction_type='plan_upgrade',
+                    description=f'Plan upgrade from {user.plan} to {new_plan.name}',
+                    reference=upgrade_reference
+                )
+            except InsufficientBalance:
+                return Response({'error': 'Insufficient balance'}, status=status.HTTP_400_BAD_REQUEST)
             
             # Update user plan
             old_plan = user.plan
@@ -58,7 +65,7 @@ def upgrade_plan_view(request):
                 new_plan=new_plan.name,
                 upgrade_cost=new_plan.monthly_price,
                 payment_method=serializer.validated_data['payment_method'],
-                transaction_id=f'upgrade_{user.id}_{new_plan.id}'
+                transaction_id=upgrade_reference
             )
             
             # Send notification
@@ -79,6 +86,6 @@ def upgrade_plan_view(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_plan_view(request):
-    plan = Plan.objects.get(name=request.user.plan)
+    plan = get_plan(request.user.plan)
     serializer = PlanSerializer(plan)
     return Response(serializer.data)
\ No newline at end of file
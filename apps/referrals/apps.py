@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class ReferralsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.referrals'
\ No newline at end of file
+    name = 'apps.referrals'
+    
+    def ready(self):
+        import apps.referrals.signals
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from apps.referrals.utils import rebuild_referral_stats
+
+class Command(BaseCommand):
+    help = 'Recompute ReferralStats from users and ReferralBonus rows'
+
+    def handle(self, *args, **options):
+        count = rebuild_referral_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt referral stats for {count} referrers'))
@@ -0,0 +1,35 @@
+from django.db.models import DEFERRED
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import ReferralBonus
+from .utils import bump_referral_stats
+from apps.users.models import User
+
+@receiver(post_save, sender=ReferralBonus)
+def referral_bonus_created(sender, instance, created, **kwargs):
+    if created and not instance.is_paid:
+        bump_referral_stats(instance.referrer_id, pending_bonus=instance.amount)
+
+@receiver(post_delete, sender=ReferralBonus)
+def referral_bonus_deleted(sender, instance, **kwargs):
+    if not instance.is_paid:
+        bump_referral_stats(instance.referrer_id, pending_bonus=-instance.amount)
+
+@receiver(post_save, sender=User)
+def referrer_changed(sender, instance, created, update_fields, **kwargs):
+    # The loaded referrer is recorded in User.from_db; instances that did not
+    # come from the database, or deferred the field, are not tracked
+    current = instance.__dict__.get('referred_by_id', DEFERRED)
+    if created:
+        previous = None
+    elif update_fields is not None and 'referred_by' not in update_fields:
+        return
+    else:
+        previous = getattr(instance, '_loaded_referred_by_id', DEFERRED)
+
+    if previous is not DEFERRED and current is not DEFERRED and current != previous:
+        if previous:
+            bump_referral_stats(previous, total_referrals=-1)
+        if current:
+            bump_referral_stats(current, total_referrals=1)
+    instance._loaded_referred_by_id = current
@@ -0,0 +1,17 @@
+from celery import shared_task
+from .utils import pay_referral_bonus_batch
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def pay_referral_bonuses(max_batches=50):
+    """Credit unpaid referral bonuses, one aggregated transaction per referrer per batch"""
+    bonuses = referrers = 0
+    for _ in range(max_batches):
+        result = pay_referral_bonus_batch()
+        if not result['bonuses']:
+            break
+        bonuses += result['bonuses']
+        referrers += result['referrers']
+    return f"Paid {bonuses} referral bonuses to {referrers} referrers"
@@ -0,0 +1,108 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Count, Sum, Q
+from django.utils import timezone
+from collections import defaultdict
+from decimal import Decimal
+from .models import ReferralBonus, ReferralStats
+from apps.users.models import User
+from apps.wallets.models import Wallet, Transaction
+from apps.wallets.ledger import post_transactions_bulk
+from apps.notifications.utils import send_notifications_bulk
+import logging
+
+logger = logging.getLogger(__name__)
+
+PAYOUT_BATCH_SIZE = 1000
+
+def bump_referral_stats(user_id, **deltas):
+    """Apply F() deltas to a referrer's stats row, creating it on first use"""
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if ReferralStats.objects.filter(user_id=user_id).update(updated_at=timezone.now(), **updates):
+        return
+    try:
+        with transaction.atomic():
+            ReferralStats.objects.create(user_id=user_id, **deltas)
+    except IntegrityError:
+        # Another writer created the row first
+        ReferralStats.objects.filter(user_id=user_id).update(updated_at=timezone.now(), **updates)
+
+def pay_referral_bonus_batch(batch_size=PAYOUT_BATCH_SIZE):
+    """Pay one batch of unpaid bonuses with a single wallet transaction per referrer"""
+    with transaction.atomic():
+        bonuses = list(
+            ReferralBonus.objects.select_for_update(skip_locked=True)
+            .filter(is_paid=False)
+            .order_by('id')
+            .values_list('id', 'referrer_id', 'amount')[:batch_size]
+        )
+        if not bonuses:
+            return {'bonuses': 0, 'referrers': 0, 'amount': Decimal('0.00')}
+
+        totals = defaultdict(Decimal)
+        bonus_ids = defaultdict(list)
+        for bonus_id, referrer_id, amount in bonuses:
+            totals[referrer_id] += amount
+            bonus_ids[referrer_id].append(bonus_id)
+
+        wallets = {wallet.user_id: wallet for wallet in Wallet.objects.filter(user_id__in=totals.keys())}
+        missing_wallets = [Wallet(user_id=user_id) for user_id in totals if user_id not in wallets]
+        for wallet in Wallet.objects.bulk_create(missing_wallets):
+            wallets[wallet.user_id] = wallet
+
+        post_transactions_bulk([
+            Transaction(
+                wallet=wallets[referrer_id],
+                amount=amount,
+                transaction_type='referral_bonus',
+                description=f'Referral bonuses ({len(bonus_ids[referrer_id])})',
+                reference=f'referral_{bonus_ids[referrer_id][0]}_{bonus_ids[referrer_id][-1]}',
+                metadata={'bonus_ids': bonus_ids[referrer_id]}
+            )
+            for referrer_id, amount in totals.items()
+        ])
+
+        ReferralBonus.objects.filter(id__in=[bonus[0] for bonus in bonuses]).update(is_paid=True, paid_at=timezone.now())
+
+        for referrer_id, amount in totals.items():
+            bump_referral_stats(referrer_id, total_bonus_earned=amount, pending_bonus=-amount)
+
+        send_notifications_bulk([
+            {
+                'user': User(id=referrer_id),
+                'title': 'Referral Bonus Paid',
+                'message': f'${amount} in referral bonuses has been added to your wallet',
+                'notification_type': 'referral_bonus'
+            }
+            for referrer_id, amount in totals.items()
+        ])
+
+    return {'bonuses': len(bonuses), 'referrers': len(totals), 'amount': sum(totals.values())}
+
+def rebuild_referral_stats():
+    """Recompute every ReferralStats row from scratch; for backfills and drift checks"""
+    referrals = dict(
+        User.objects.filter(referred_by__isnull=False)
+        .values('referred_by').annotate(n=Count('id')).values_list('referred_by', 'n')
+    )
+    bonuses = {
+        row['referrer']: row
+        for row in ReferralBonus.objects.values('referrer').annotate(
+            paid=Sum('amount', filter=Q(is_paid=True)),
+            pending=Sum('amount', filter=Q(is_paid=False))
+        )
+    }
+
+    stats = []
+    for user_id in set(referrals) | set(bonuses):
+        row = bonuses.get(user_id, {})
+        stats.append(ReferralStats(
+            user_id=user_id,
+            total_referrals=referrals.get(user_id, 0),
+            total_bonus_earned=row.get('paid') or Decimal('0.00'),
+            pending_bonus=row.get('pending') or Decimal('0.00')
+        ))
+
+    with transaction.atomic():
+        ReferralStats.objects.all().delete()
+        ReferralStats.objects.bulk_create(stats, batch_size=1000)
+    return len(stats)
@@ -0,0 +1,284 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from apps.users.models import User
+from .models import Task, TaskActivityLog
+import atexit
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'sync',       # 'sync', 'memory' or 'redis'
+    'BATCH_SIZE': 200,       # Flush as soon as this many events are buffered
+    'FLUSH_INTERVAL': 2.0,   # ...or at least this often, in seconds
+    'MAX_DEPTH': 10000,      # Past this, events are written synchronously
+    'REDIS_KEY': 'task_activity_log_buffer',
+    'REDIS_LOCK_TIMEOUT': 300,  # A flusher that dies holding the lock blocks others this long
+}
+
+_metrics = {
+    'enqueued': 0,
+    'written': 0,
+    'failed': 0,
+    'sync_writes': 0,
+    'last_flush_at': None,
+}
+_metrics_lock = threading.Lock()
+
+def _config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'TASK_ACTIVITY_LOG', {}))
+    return config
+
+def _count(metric, value=1):
+    with _metrics_lock:
+        _metrics[metric] += value
+
+def _insert_events(events):
+    TaskActivityLog.objects.bulk_create([
+        TaskActivityLog(
+            task_id=event['task_id'],
+            user_id=event['user_id'],
+            activity_type=event['activity_type'],
+            details=event['details'],
+            timestamp=event['timestamp']
+        )
+        for event in events
+    ])
+    return len(events)
+
+def _drop_orphaned(events):
+    task_ids = set(Task.objects.filter(id__in={event['task_id'] for event in events}).values_list('id', flat=True))
+    user_ids = set(User.objects.filter(
+        id__in={event['user_id'] for event in events if event['user_id'] is not None}
+    ).values_list('id', flat=True))
+    kept = [
+        event for event in events
+        if event['task_id'] in task_ids and (event['user_id'] is None or event['user_id'] in user_ids)
+    ]
+    logger.warning('Dropping %s task activity events for deleted tasks or users', len(events) - len(kept))
+    return kept
+
+def write_events(events, buffered=False):
+    """Insert events with a single bulk_create.
+
+    Buffered events can outlive their task or user. Those batches are written
+    in their own transaction, and if a foreign key fails the orphaned rows are
+    dropped and the rest retried.
+    """
+    if not events:
+        return 0
+
+    if not buffered:
+        # The task was loaded by the caller, so no existence check is needed
+        written = _insert_events(events)
+    else:
+        try:
+            with transaction.atomic():
+                written = _insert_events(events)
+        except IntegrityError:
+            events = _drop_orphaned(events)
+            with transaction.atomic():
+                written = _insert_events(events)
+
+    _count('written', written)
+    with _metrics_lock:
+        _metrics['last_flush_at'] = timezone.now()
+    return written
+
+class MemoryActivityBuffer:
+    """Per-process buffer drained by a background flusher thread"""
+
+    def __init__(self, batch_size, flush_interval, max_depth):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_depth = max_depth
+        self._events = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def append(self, event):
+        with self._lock:
+            if len(self._events) >= self.max_depth:
+                full = True
+            else:
+                full = False
+                self._events.append(event)
+                depth = len(self._events)
+
+        if full:
+            # Backpressure: never let the buffer grow without bound
+            _count('sync_writes')
+            write_events([event], buffered=True)
+            return
+
+        self._ensure_flusher()
+        if depth >= self.batch_size:
+            self._wakeup.set()
+
+    def depth(self):
+        with self._lock:
+            return len(self._events)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+            if not events:
+                return 0
+            try:
+                return write_events(events, buffered=True)
+            except Exception:
+                logger.exception('Failed to flush %s task activity events', len(events))
+                _count('failed', len(events))
+                with self._lock:
+                    self._events = events + self._events
+                return 0
+
+    def _ensure_flusher(self):
+        # Re-spawn after a fork: gunicorn workers do not inherit running threads
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='task-activity-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+class RedisActivityBuffer:
+    """Shared buffer in a Redis list, drained by the flush_task_activity_logs task.
+
+    A flush moves a batch to a processing list with LMOVE and deletes it only
+    after bulk_create succeeds. A batch left behind by a failed or killed flush
+    is written first by the next one, so events are written at least once.
+    """
+
+    def __init__(self, batch_size, key, lock_timeout):
+        try:
+            from django_redis import get_redis_connection
+            self.client = get_redis_connection('default')
+        except (ImportError, NotImplementedError) as e:
+            raise ImproperlyConfigured('The redis activity log backend requires a django-redis cache') from e
+        self.batch_size = batch_size
+        self.key = key
+        self.processing_key = f'{key}:processing'
+        self.lock_timeout = lock_timeout
+
+    def append(self, event):
+        payload = dict(event, timestamp=event['timestamp'].isoformat())
+        self.client.rpush(self.key, json.dumps(payload))
+
+    def depth(self):
+        return self.client.llen(self.key) + self.client.llen(self.processing_key)
+
+    def _take_batch(self):
+        pending = self.client.lrange(self.processing_key, 0, -1)
+        if pending:
+            return pending
+        pipe = self.client.pipeline()
+        for _ in range(self.batch_size):
+            pipe.lmove(self.key, self.processing_key, 'LEFT', 'RIGHT')
+        return [raw for raw in pipe.execute() if raw is not None]
+
+    def flush(self):
+        # One flusher at a time owns the processing list
+        lock = self.client.lock(f'{self.key}:lock', timeout=self.lock_timeout)
+        if not lock.acquire(blocking=False):
+            return 0
+
+        written = 0
+        try:
+            while True:
+                raw_events = self._take_batch()
+                if not raw_events:
+                    return written
+
+                events = []
+                for raw in raw_events:
+                    event = json.loads(raw)
+                    event['timestamp'] = parse_datetime(event['timestamp'])
+                    events.append(event)
+                try:
+                    written += write_events(events, buffered=True)
+                except Exception:
+                    # The batch stays in the processing list for the next flush
+                    logger.exception('Failed to flush %s task activity events', len(events))
+                    _count('failed', len(events))
+                    return written
+                self.client.delete(self.processing_key)
+        finally:
+            lock.release()
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+def get_activity_buffer():
+    """Return the configured buffer, or None when logging synchronously"""
+    global _buffer
+    config = _config()
+    if config['BACKEND'] == 'sync':
+        return None
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                if config['BACKEND'] == 'redis':
+                    _buffer = RedisActivityBuffer(config['BATCH_SIZE'], config['REDIS_KEY'], config['REDIS_LOCK_TIMEOUT'])
+                else:
+                    _buffer = MemoryActivityBuffer(config['BATCH_SIZE'], config['FLUSH_INTERVAL'], config['MAX_DEPTH'])
+    return _buffer
+
+def log_task_activity(task, user, activity_type, details=None):
+    """Record a task activity without a database round trip on the request path"""
+    event = {
+        'task_id': task.id,
+        'user_id': user.id if user else None,
+        'activity_type': activity_type,
+        'details': details or {},
+        'timestamp': timezone.now(),
+    }
+    _count('enqueued')
+
+    buffer = get_activity_buffer()
+    if buffer is None:
+        _count('sync_writes')
+        write_events([event])
+    else:
+        # Buffer only what commits, as a synchronous write would
+        transaction.on_commit(lambda: buffer.append(event))
+
+def flush_activity_buffer():
+    buffer = get_activity_buffer()
+    return buffer.flush() if buffer is not None else 0
+
+def activity_log_metrics():
+    """Counters and current buffer depth for monitoring"""
+    buffer = get_activity_buffer()
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    metrics['backend'] = _config()['BACKEND']
+    metrics['buffer_depth'] = buffer.depth() if buffer is not None else 0
+    return metrics
+
+@atexit.register
+def _flush_on_exit():
+    if isinstance(_buffer, MemoryActivityBuffer):
+        _buffer.flush()
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.tasks'
\ No newline at end of file
+    name = 'apps.tasks'
+    
+    def ready(self):
+        import apps.tasks.signals
\ No newline at end of file
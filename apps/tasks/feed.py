@@ -0,0 +1,157 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Task
+from .serializers import TaskListSerializer
+from apps.plans.registry import all_plans
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+FEED_VERSION_KEY = 'task_feed_version'   # Bumped to drop every index and entry (plan edits, bulk changes)
+INDEX_VERSION_KEY = 'task_feed_index_version_{plan}'  # Bumped when a task joins or leaves a tier's feed
+INDEX_KEY = 'task_feed_index_{feed}_{plan}_{index}'
+ENTRY_KEY = 'task_feed_entry_{feed}_{task_id}'
+FEED_TIMEOUT = 60 * 15  # Rebuilt from the database at least every 15 minutes
+FEED_STATUSES = ['active', 'simulated']
+FEED_PAGE_SIZE = 100
+FEED_MAX_PAGE_SIZE = 500
+
+# The feed is one index per plan tier, the ids of the tasks that tier can see
+# newest first, plus one cache entry per task shared by every tier. A task
+# save rewrites only its own entry and bumps the index version of each tier
+# it joined or left; nothing ever reads, modifies and writes back a shared
+# value, so concurrent saves cannot lose each other's updates. A reader that
+# rebuilds an index from a stale snapshot stores it under a version already
+# replaced.
+
+def _version(key):
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock so a counter lost to eviction never reuses a version
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, time.time_ns(), None):
+            cache.incr(key)
+
+def _index_version_key(plan_id):
+    return INDEX_VERSION_KEY.format(plan=plan_id)
+
+def _index_key(feed_version, plan_id, index_version):
+    return INDEX_KEY.format(feed=feed_version, plan=plan_id, index=index_version)
+
+def _entry_key(feed_version, task_id):
+    return ENTRY_KEY.format(feed=feed_version, task_id=task_id)
+
+def _plan_priorities():
+    """Map plan id to priority for every plan tier"""
+    return {plan.id: plan.priority for plan in all_plans()}
+
+def _visible(listing, plan, priorities):
+    plan_id, is_simulated = listing
+    return is_simulated or (plan_id in priorities and priorities[plan_id] <= plan.priority)
+
+def _feed_entry(task):
+    return {
+        'deadline': task.deadline,
+        'data': dict(TaskListSerializer(task).data),
+    }
+
+def _listing(task):
+    """(plan_required_id, is_simulated) for a task that belongs in the feed, or None"""
+    if task.status not in FEED_STATUSES:
+        return None
+    if not task.deadline or task.deadline <= timezone.now():
+        return None
+    if task.current_assignments >= task.max_assignments:
+        return None
+    return (task.plan_required_id, task.is_simulated)
+
+def _build_index(plan, feed_version, index_version):
+    visible_plan_ids = [plan_id for plan_id, priority in _plan_priorities().items() if priority <= plan.priority]
+    task_ids = list(
+        Task.objects.filter(
+            status__in=FEED_STATUSES,
+            deadline__gt=timezone.now(),
+            current_assignments__lt=F('max_assignments')
+        )
+        .filter(Q(is_simulated=True) | Q(plan_required_id__in=visible_plan_ids))
+        .order_by('-created_at', '-id')
+        .values_list('id', flat=True)
+    )
+    cache.set(_index_key(feed_version, plan.id, index_version), task_ids, FEED_TIMEOUT)
+    return task_ids
+
+def _load_entries(feed_version, task_ids):
+    keys = {_entry_key(feed_version, task_id): task_id for task_id in task_ids}
+    cached = cache.get_many(list(keys))
+    entries = {keys[key]: entry for key, entry in cached.items()}
+
+    missing = [task_id for task_id in task_ids if task_id not in entries]
+    if missing:
+        built = {task.id: _feed_entry(task) for task in Task.objects.filter(id__in=missing).select_related('plan_required')}
+        cache.set_many({_entry_key(feed_version, task_id): entry for task_id, entry in built.items()}, FEED_TIMEOUT)
+        entries.update(built)
+    return entries
+
+def get_task_feed(plan, limit=FEED_PAGE_SIZE):
+    """Return up to limit available tasks for a plan tier, newest first"""
+    feed_version = _version(FEED_VERSION_KEY)
+    index_version = _version(_index_version_key(plan.id))
+    candidates = cache.get(_index_key(feed_version, plan.id, index_version))
+    if candidates is None:
+        candidates = _build_index(plan, feed_version, index_version)
+
+    now = timezone.now()
+    tasks = []
+    # Entries are fetched a page at a time; tasks that filled up or expired since
+    # the index was built are skipped until the page is full
+    for start in range(0, len(candidates), limit):
+        chunk = candidates[start:start + limit]
+        entries = _load_entries(feed_version, chunk)
+        for task_id in chunk:
+            entry = entries.get(task_id)
+            if (entry and entry['deadline'] and entry['deadline'] > now
+                    and entry['data']['current_assignments'] < entry['data']['max_assignments']):
+                tasks.append(entry['data'])
+                if len(tasks) == limit:
+                    return tasks
+    return tasks
+
+def refresh_task_in_feeds(task_id):
+    """Rewrite a single task's feed entry, and move on the index of every tier it joined or left"""
+    task = Task.objects.filter(id=task_id).select_related('plan_required').first()
+    listing = _listing(task) if task else None
+    feed_version = _version(FEED_VERSION_KEY)
+
+    if listing is None:
+        cache.delete(_entry_key(feed_version, task_id))
+    else:
+        cache.set(_entry_key(feed_version, task_id), _feed_entry(task), FEED_TIMEOUT)
+
+    plans = all_plans()
+    priorities = {plan.id: plan.priority for plan in plans}
+    index_keys = {plan.id: _index_key(feed_version, plan.id, _version(_index_version_key(plan.id))) for plan in plans}
+    indexes = cache.get_many(list(index_keys.values()))
+    for plan in plans:
+        index = indexes.get(index_keys[plan.id])
+        listed = listing is not None and _visible(listing, plan, priorities)
+        # A missing index may be mid-rebuild from a snapshot without this change
+        if index is None or (task_id in index) != listed:
+            _bump(_index_version_key(plan.id))
+
+def schedule_feed_refresh(task_id):
+    """Refresh the feeds once the surrounding transaction commits"""
+    transaction.on_commit(lambda: refresh_task_in_feeds(task_id))
+
+def invalidate_task_feeds():
+    """Drop the index and every entry so the next read rebuilds them"""
+    _bump(FEED_VERSION_KEY)
@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+from apps.core.utils import cache_is_shared
+from .models import TaskAssignment
+
+DAILY_COUNTER_KEY = 'daily_assignments_{user_id}_{day}'
+ROLLOVER_GRACE = 3600  # Keep yesterday's counter around for an hour after midnight
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+def _counter_key(user_id, day):
+    return DAILY_COUNTER_KEY.format(user_id=user_id, day=day.isoformat())
+
+def _counter_timeout(day):
+    _, end = _day_bounds(day)
+    return max(int((end - timezone.now()).total_seconds()), 0) + ROLLOVER_GRACE
+
+def _assignments_on(user_id, day):
+    start, end = _day_bounds(day)
+    return TaskAssignment.objects.filter(user_id=user_id, assigned_at__gte=start, assigned_at__lt=end).count()
+
+def reserve_daily_slot(user, limit):
+    """Count one assignment against today's plan limit; False once it is used up.
+
+    The counter lives in the shared cache and is keyed by the local date, so
+    it rolls over at midnight. It is seeded from the database only when the
+    key is missing (first assign of the day or after an eviction). A
+    per-process cache would give every worker its own counter, so without a
+    shared cache the limit is checked against the database instead.
+    """
+    day = timezone.localdate()
+    if not cache_is_shared():
+        return _assignments_on(user.id, day) < limit
+
+    key = _counter_key(user.id, day)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        cache.add(key, _assignments_on(user.id, day), _counter_timeout(day))
+        count = cache.incr(key)
+
+    if count > limit:
+        cache.decr(key)
+        return False
+    return True
+
+def release_daily_slot(user):
+    """Undo reserve_daily_slot when the assignment was not created"""
+    if not cache_is_shared():
+        return
+    try:
+        cache.decr(_counter_key(user.id, timezone.localdate()))
+    except ValueError:
+        pass
+
+def reconcile_daily_counters(day=None):
+    """Overwrite the cached counters for a day with the counts in the database"""
+    if not cache_is_shared():
+        return 0
+    day = day or timezone.localdate()
+    start, end = _day_bounds(day)
+    counts = (
+        TaskAssignment.objects.filter(assigned_at__gte=start, assigned_at__lt=end)
+        .values('user_id')
+        .annotate(total=Count('id'))
+    )
+    counters = {_counter_key(row['user_id'], day): row['total'] for row in counts}
+    if counters:
+        cache.set_many(counters, _counter_timeout(day))
+    return len(counters)
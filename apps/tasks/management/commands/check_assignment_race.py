@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, transaction
+from apps.tasks.models import Task, TaskAssignment
+from apps.tasks.utils import reserve_task_slot
+from apps.users.models import User
+import threading
+import time
+import uuid
+
+class Command(BaseCommand):
+    help = 'Fire parallel assigns at one task, verify it never exceeds max_assignments and report throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--freelancers', type=int, default=50, help='Freelancers assigning at once')
+        parser.add_argument('--max-assignments', type=int, default=5)
+        parser.add_argument('--min-rate', type=float, default=0, help='Fail below this many assign attempts per second')
+        parser.add_argument('--keep', action='store_true', help='Keep the task and users afterwards')
+
+    def handle(self, *args, **options):
+        count, max_assignments = options['freelancers'], options['max_assignments']
+        if count <= max_assignments:
+            raise CommandError('--freelancers must exceed --max-assignments to create contention')
+
+        run = uuid.uuid4().hex[:8]
+        users = [
+            User.objects.create_user(email=f'race-{run}-{n}@example.com', username=f'race-{run}-{n}', password=None)
+            for n in range(count)
+        ]
+        task = Task.objects.create(
+            title=f'Assignment race {run}', description='check_assignment_race', reward=0,
+            max_assignments=max_assignments, status='active', created_by=users[0]
+        )
+
+        barrier = threading.Barrier(count)
+
+        def assign(user):
+            barrier.wait()
+            try:
+                # Same reservation the assign view makes
+                with transaction.atomic():
+                    if not reserve_task_slot(task.id):
+                        return False
+                    TaskAssignment.objects.create(task=task, user=user, status='accepted')
+                return True
+            except IntegrityError:
+                return False
+            finally:
+                connection.close()
+
+        try:
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=count) as pool:
+                results = list(pool.map(assign, users))
+            elapsed = time.monotonic() - started
+
+            task.refresh_from_db()
+            assignments = TaskAssignment.objects.filter(task=task).count()
+            self.stdout.write(f'accepted: {sum(results)}')
+            self.stdout.write(f'current_assignments: {task.current_assignments}')
+            self.stdout.write(f'assignment_rows: {assignments}')
+            rate = count / elapsed if elapsed else float('inf')
+            self.stdout.write(f'elapsed: {elapsed:.3f}s')
+            self.stdout.write(f'assign attempts/sec: {rate:.1f}')
+
+            if task.current_assignments > task.max_assignments:
+                raise CommandError(f'Task overbooked: {task.current_assignments} > {task.max_assignments}')
+            if task.current_assignments != assignments or assignments != sum(results):
+                raise CommandError('current_assignments does not match the assignments created')
+            if rate < options['min_rate']:
+                raise CommandError(f"Throughput {rate:.1f}/s is below --min-rate {options['min_rate']}")
+        finally:
+            if not options['keep']:
+                task.delete()
+                User.objects.filter(id__in=[user.id for user in users]).delete()
+
+        self.stdout.write(self.style.SUCCESS(f'Task capped at {task.current_assignments}/{task.max_assignments}'))
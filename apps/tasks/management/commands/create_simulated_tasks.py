@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.users.models import User
+from apps.tasks.utils import bulk_create_simulated_tasks, expand_task_template, parse_task_csv
+import json
+
+class Command(BaseCommand):
+    help = 'Bulk create simulated tasks from a JSON/CSV file or a template repeated --count times'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Path to a .json (list of tasks) or .csv file')
+        parser.add_argument('--template', help='JSON object used as a template; {n} is replaced with the item number')
+        parser.add_argument('--count', type=int, default=0, help='Number of tasks to create from --template')
+        parser.add_argument('--created-by', help='Email of the admin recorded as creator (defaults to the first admin)')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['file']:
+            path = options['file']
+            with open(path, 'rb') as f:
+                content = f.read()
+            if path.endswith('.csv'):
+                items = parse_task_csv(content)
+            else:
+                items = json.loads(content)
+                if not isinstance(items, list):
+                    raise CommandError('JSON file must contain a list of tasks')
+        elif options['template']:
+            if options['count'] <= 0:
+                raise CommandError('--count must be positive when using --template')
+            items = expand_task_template(json.loads(options['template']), options['count'])
+        else:
+            raise CommandError('Provide --file or --template with --count')
+
+        if options['created_by']:
+            created_by = User.objects.filter(email=options['created_by']).first()
+        else:
+            created_by = User.objects.filter(user_type='admin').order_by('id').first()
+        if created_by is None:
+            raise CommandError('Creator not found')
+
+        tasks, errors = bulk_create_simulated_tasks(items, created_by, chunk_size=options['chunk_size'])
+
+        for error in errors:
+            self.stderr.write(f"Item {error['index']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(f'Created {len(tasks)} simulated tasks ({len(errors)} skipped)'))
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:37
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskactivitylog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
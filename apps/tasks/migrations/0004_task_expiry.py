@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_activity_log_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('active', 'Active'), ('completed', 'Completed'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled'), ('simulated', 'Simulated'), ('expired', 'Expired')], default='pending', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='taskactivitylog',
+            name='activity_type',
+            field=models.CharField(choices=[('created', 'Task Created'), ('assigned', 'Task Assigned'), ('accepted', 'Task Accepted'), ('submitted', 'Task Submitted'), ('approved', 'Task Approved'), ('rejected', 'Task Rejected'), ('cancelled', 'Task Cancelled'), ('expired', 'Task Expired')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='taskassignment',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('submitted', 'Submitted'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled')], default='pending', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'deadline'], name='task_status_deadline_idx'),
+        ),
+    ]
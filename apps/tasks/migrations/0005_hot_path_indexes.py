@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_expiry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status__in', ['active', 'simulated'])), fields=['-created_at'], name='task_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskassignment',
+            index=models.Index(fields=['user', 'status'], name='assignment_user_status_idx'),
+        ),
+    ]
@@ -11,6 +11,7 @@ class Task(models.Model):
         ('rejected', 'Rejected'),
         ('cancelled', 'Cancelled'),
         ('simulated', 'Simulated'),  # Admin-created tasks
+        ('expired', 'Expired'),  # Deadline passed before completion
     ]
     
     title = models.CharField(max_length=200)
@@ -26,6 +27,18 @@ class Task(models.Model):
     deadline = models.DateTimeField(null=True, blank=True)
     is_simulated = models.BooleanField(default=False)  # True for admin-created tasks
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'deadline'], name='task_status_deadline_idx'),
+            models.Index(
+                fields=['-created_at'],
+                name='task_live_created_idx',
+                condition=models.Q(status__in=['active', 'simulated'])
+            ),
+            # Keyset pages order by (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='task_created_id_idx'),
+        ]
+    
     def __str__(self):
         return self.title
     
@@ -42,6 +55,7 @@ class TaskAssignment(models.Model):
         ('submitted', 'Submitted'),
         ('approved', 'Approved'),
         ('rejected', 'Rejected'),
+        ('cancelled', 'Cancelled'),
     ]
     
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='assignments')
@@ -56,6 +70,9 @@ class TaskAssignment(models.Model):
     
     class Meta:
         unique_together = ['task', 'user']
+        indexes = [
+            models.Index(fields=['user', 'status'], name='assignment_user_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.task.title}"
@@ -81,13 +98,14 @@ class TaskActivityLog(models.Model):
         ('approved', 'Task Approved'),
         ('rejected', 'Task Rejected'),
         ('cancelled', 'Task Cancelled'),
+        ('expired', 'Task Expired'),
     ]
     
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='activity_logs')
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     activity_type = models.CharField(max_length=20, choices=ACTIVITY_TYPES)
     details = models.JSONField(default=dict)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)  # Set when the event happens, not when it is flushed
     
     def __str__(self):
         return f"{self.activity_type} - {self.task.title}"
\ No newline at end of file
@@ -0,0 +1,65 @@
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, TextField
+from django.db.models.expressions import RawSQL
+import re
+
+POSTGRES_QUERY = "websearch_to_tsquery('english', %s)"
+
+def _fts5_query(term):
+    """Quote each word so user input cannot inject FTS5 query syntax"""
+    words = re.findall(r'\w+', term)
+    return ' '.join(f'"{word}"' for word in words)
+
+def search_tasks(queryset, term):
+    """Full-text search over task title and description, best match first.
+
+    Matching rows get a ``search_rank`` and a highlighted ``search_headline``
+    built from the description. Backed by the generated ``search_vector``
+    column on Postgres and the ``tasks_task_fts`` FTS5 table on SQLite.
+    Results are ordered by rank, so they cannot be keyset paginated.
+    """
+    vendor = connection.vendor
+
+    if vendor == 'postgresql':
+        return queryset.annotate(
+            search_rank=RawSQL(f'ts_rank(tasks_task.search_vector, {POSTGRES_QUERY})', [term], output_field=FloatField()),
+            search_headline=RawSQL(
+                f"ts_headline('english', tasks_task.description, {POSTGRES_QUERY}, "
+                "'StartSel=<mark>, StopSel=</mark>, MaxFragments=2')",
+                [term],
+                output_field=TextField()
+            ),
+        ).filter(
+            RawSQL(f'tasks_task.search_vector @@ {POSTGRES_QUERY}', [term], output_field=BooleanField())
+        ).order_by('-search_rank', '-created_at')
+
+    if vendor == 'sqlite':
+        match = _fts5_query(term)
+        if not match:
+            return queryset.none()
+
+        return queryset.annotate(
+            search_rank=RawSQL(
+                'SELECT bm25(tasks_task_fts, 10.0, 1.0) FROM tasks_task_fts '
+                'WHERE tasks_task_fts MATCH %s AND rowid = tasks_task.id',
+                [match],
+                output_field=FloatField()
+            ),
+            search_headline=RawSQL(
+                "SELECT snippet(tasks_task_fts, 1, '<mark>', '</mark>', '...', 16) FROM tasks_task_fts "
+                'WHERE tasks_task_fts MATCH %s AND rowid = tasks_task.id',
+                [match],
+                output_field=TextField()
+            ),
+        ).filter(
+            RawSQL(
+                'tasks_task.id IN (SELECT rowid FROM tasks_task_fts WHERE tasks_task_fts MATCH %s)',
+                [match],
+                output_field=BooleanField()
+            )
+        ).order_by('search_rank', '-created_at')  # bm25 scores lower for better matches
+
+    return queryset.filter(
+        Q(title__icontains=term) |
+        Q(description__icontains=term)
+    )
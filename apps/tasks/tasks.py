@@ -0,0 +1,69 @@
+from celery import shared_task
+from django.db import transaction
+from django.utils import timezone
+from .models import Task, TaskAssignment, TaskActivityLog
+from .activity import flush_activity_buffer, activity_log_metrics
+from .feed import invalidate_task_feeds
+from .limits import reconcile_daily_counters
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXPIRABLE_STATUSES = ['pending', 'active', 'simulated']
+
+@shared_task
+def flush_task_activity_logs():
+    """Drain buffered task activity events into TaskActivityLog"""
+    written = flush_activity_buffer()
+    metrics = activity_log_metrics()
+    logger.info('Task activity log flush: %s', metrics)
+    return f"Wrote {written} activity logs, {metrics['buffer_depth']} still buffered"
+
+@shared_task
+def expire_overdue_tasks(chunk_size=1000):
+    """Move past-deadline tasks to 'expired' and cancel their open assignments"""
+    now = timezone.now()
+    expired_total = 0
+    cancelled_total = 0
+
+    while True:
+        with transaction.atomic():
+            # Served by the (status, deadline) index
+            task_ids = list(
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(status__in=EXPIRABLE_STATUSES, deadline__lte=now)
+                .order_by('deadline')
+                .values_list('id', flat=True)[:chunk_size]
+            )
+            if not task_ids:
+                break
+
+            Task.objects.filter(id__in=task_ids).update(status='expired', updated_at=now)
+            cancelled_total += TaskAssignment.objects.filter(
+                task_id__in=task_ids,
+                status__in=['pending', 'accepted']
+            ).update(status='cancelled', reviewed_at=now)
+            TaskActivityLog.objects.bulk_create([
+                TaskActivityLog(
+                    task_id=task_id,
+                    activity_type='expired',
+                    details={'expired_at': now.isoformat()},
+                    timestamp=now
+                )
+                for task_id in task_ids
+            ])
+            expired_total += len(task_ids)
+
+        if len(task_ids) < chunk_size:
+            break
+
+    if expired_total:
+        invalidate_task_feeds()
+
+    return f"Expired {expired_total} tasks and cancelled {cancelled_total} assignments"
+
+@shared_task
+def reconcile_daily_assignment_counters():
+    """Correct drift between the cached daily assignment counters and the database"""
+    reconciled = reconcile_daily_counters()
+    return f"Reconciled daily assignment counters for {reconciled} users"
@@ -0,0 +1,41 @@
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.tasks.activity import MemoryActivityBuffer, log_task_activity
+from apps.tasks.models import Task, TaskActivityLog
+from apps.users.models import User
+
+def _event(task_id, user_id):
+    return {
+        'task_id': task_id, 'user_id': user_id, 'activity_type': 'assigned',
+        'details': {}, 'timestamp': timezone.now(),
+    }
+
+class SyncActivityLogTests(TestCase):
+    def test_sync_write_is_a_single_insert(self):
+        user = User.objects.create_user(email='admin@example.com', username='admin', password='pass')
+        task = Task.objects.create(title='Label images', description='Label 10 images', reward=1, created_by=user)
+        with CaptureQueriesContext(connection) as queries:
+            log_task_activity(task, user, 'assigned')
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(TaskActivityLog.objects.filter(task=task).count(), 1)
+
+class BufferedActivityLogTests(TransactionTestCase):
+    def test_flush_drops_events_for_deleted_tasks_and_users(self):
+        user = User.objects.create_user(email='admin@example.com', username='admin', password='pass')
+        gone_user = User.objects.create_user(email='gone@example.com', username='gone', password='pass')
+        task = Task.objects.create(title='Label images', description='Label 10 images', reward=1, created_by=user)
+        gone_task = Task.objects.create(title='Deleted', description='Deleted', reward=1, created_by=user)
+        gone_task_id, gone_user_id = gone_task.id, gone_user.id
+        gone_task.delete()
+        gone_user.delete()
+
+        buffer = MemoryActivityBuffer(batch_size=100, flush_interval=60, max_depth=100)
+        buffer._events = [
+            _event(task.id, user.id), _event(gone_task_id, user.id),
+            _event(task.id, gone_user_id), _event(task.id, None),
+        ]
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(buffer.depth(), 0)
+        self.assertEqual(TaskActivityLog.objects.filter(task=task).count(), 2)
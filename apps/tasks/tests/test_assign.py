@@ -0,0 +1,28 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.plans.models import Plan
+from apps.tasks.models import Task
+from apps.users.models import User
+
+class AssignWithoutPlanTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(email='admin@example.com', username='admin', password='pass', user_type='admin')
+        self.freelancer = User.objects.create_user(
+            email='worker@example.com', username='worker', password='pass', current_freelancer_plan='premium'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.freelancer)
+
+    def _task(self, **kwargs):
+        return Task.objects.create(
+            title='Label images', description='Label 10 images', reward=1, max_assignments=5,
+            status='active', created_by=self.admin, deadline=timezone.now() + timedelta(days=1), **kwargs
+        )
+
+    def test_missing_plan_is_refused_not_an_error(self):
+        task = self._task(plan_required=Plan.objects.create(name='basic', priority=1))
+        response = self.client.post(f'/api/tasks/assign/{task.id}/')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'No active freelancer subscription')
@@ -0,0 +1,20 @@
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from apps.tasks.models import Task, TaskAssignment
+
+# The in-memory SQLite test database locks whole tables under concurrent writers
+@skipUnlessDBFeature('has_select_for_update')
+class AssignmentRaceCommandTests(TransactionTestCase):
+    def test_task_is_capped_and_throughput_reported(self):
+        out = StringIO()
+        call_command('check_assignment_race', freelancers=8, max_assignments=3, stdout=out)
+        output = out.getvalue()
+        self.assertIn('current_assignments: 3', output)
+        self.assertIn('assign attempts/sec:', output)
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(TaskAssignment.objects.exists())
+
+    def test_fails_below_min_rate(self):
+        with self.assertRaisesMessage(CommandError, 'below --min-rate'):
+            call_command('check_assignment_race', freelancers=4, max_assignments=2, min_rate=1e9, stdout=StringIO())
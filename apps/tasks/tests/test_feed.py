@@ -0,0 +1,61 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from apps.plans.models import Plan
+from apps.tasks.feed import INDEX_KEY, _version, _index_version_key, FEED_VERSION_KEY, get_task_feed
+from apps.tasks.models import Task
+from apps.users.models import User
+
+class TaskFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(email='admin@example.com', username='admin', password='pass', user_type='admin')
+        # Plan saves reload the registry on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.basic = Plan.objects.create(name='basic', priority=1)
+            self.premium = Plan.objects.create(name='premium', priority=2)
+
+    def task(self, plan=None, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Task.objects.create(
+                title='Label images', description='Label 10 images', reward=1, max_assignments=5, status='active',
+                created_by=self.admin, deadline=timezone.now() + timedelta(days=1), plan_required=plan, **kwargs
+            )
+
+    def feed_ids(self, plan):
+        return [task['id'] for task in get_task_feed(plan)]
+
+    def cached_index(self, plan):
+        return cache.get(INDEX_KEY.format(
+            feed=_version(FEED_VERSION_KEY), plan=plan.id, index=_version(_index_version_key(plan.id))
+        ))
+
+    def test_each_tier_indexes_only_what_it_can_see(self):
+        basic_task = self.task(self.basic)
+        premium_task = self.task(self.premium)
+        simulated_task = self.task(is_simulated=True)
+
+        self.assertEqual(self.feed_ids(self.basic), [simulated_task.id, basic_task.id])
+        self.assertEqual(self.feed_ids(self.premium), [simulated_task.id, premium_task.id, basic_task.id])
+        self.assertEqual(self.cached_index(self.basic), [simulated_task.id, basic_task.id])
+
+    def test_new_task_moves_on_only_the_tiers_that_see_it(self):
+        self.task(self.basic)
+        self.feed_ids(self.basic)
+        self.feed_ids(self.premium)
+        basic_version = _version(_index_version_key(self.basic.id))
+
+        premium_task = self.task(self.premium)
+
+        self.assertEqual(_version(_index_version_key(self.basic.id)), basic_version)
+        self.assertIn(premium_task.id, self.feed_ids(self.premium))
+
+    def test_full_task_leaves_the_feed(self):
+        task = self.task(self.basic)
+        self.assertEqual(self.feed_ids(self.premium), [task.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.filter(id=task.id).update(current_assignments=5)
+            task.refresh_from_db()
+            task.save()
+        self.assertEqual(self.feed_ids(self.premium), [])
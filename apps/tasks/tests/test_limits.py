@@ -0,0 +1,33 @@
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from apps.tasks.limits import reconcile_daily_counters, release_daily_slot, reserve_daily_slot
+from apps.tasks.models import Task, TaskAssignment
+from apps.users.models import User
+
+class DailyLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='worker@example.com', username='worker', password='pass')
+        self.tasks = [
+            Task.objects.create(title=f'Task {i}', description='Task', reward=1, created_by=self.user)
+            for i in range(3)
+        ]
+
+    def assign(self, task):
+        TaskAssignment.objects.create(task=task, user=self.user, status='accepted')
+
+    def test_without_a_shared_cache_the_database_is_counted(self):
+        self.assign(self.tasks[0])
+        self.assertTrue(reserve_daily_slot(self.user, 2))
+        self.assign(self.tasks[1])
+        self.assertFalse(reserve_daily_slot(self.user, 2))
+        self.assertEqual(reconcile_daily_counters(), 0)
+
+    @mock.patch('apps.tasks.limits.cache_is_shared', return_value=True)
+    def test_shared_cache_counter_is_seeded_and_released(self, _):
+        self.assign(self.tasks[0])
+        self.assertTrue(reserve_daily_slot(self.user, 2))
+        self.assertFalse(reserve_daily_slot(self.user, 2))
+        release_daily_slot(self.user)
+        self.assertTrue(reserve_daily_slot(self.user, 2))
@@ -8,7 +8,9 @@ urlpatterns = [
     path('assign/<int:task_id>/', views.assign_task_view, name='assign_task_view'),
     path('submit/<int:assignment_id>/', views.submit_task_view, name='submit_task_view'),
     path('assignments/', views.user_assignments_view, name='user_assignments_view'),
+    path('review/batch/', views.admin_batch_review_submissions, name='admin_batch_review_submissions'),
     path('review/<int:submission_id>/', views.admin_review_submission, name='admin_review_submission'),
     path('simulate/', views.create_simulated_task_view, name='create_simulated_task_view'),
+    path('simulate/bulk/', views.bulk_create_simulated_tasks_view, name='bulk_create_simulated_tasks_view'),
     path('logs/<int:task_id>/', views.task_activity_logs_view, name='task_activity_logs_view'),
 ]
\ No newline at end of file
@@ -0,0 +1,271 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from .models import Task, TaskAssignment, TaskSubmission, TaskActivityLog
+from .feed import invalidate_task_feeds
+from apps.plans.registry import all_plans
+from apps.users.models import User
+from apps.wallets.models import Wallet, Transaction
+from apps.wallets.ledger import post_transactions_bulk
+from apps.notifications.utils import send_notifications_bulk
+import csv
+import io
+
+MAX_BULK_TASKS = 10000
+MAX_BATCH_REVIEWS = 1000
+
+def reserve_task_slot(task_id):
+    """Atomically take one assignment slot; returns False when the task is full"""
+    reserved = Task.objects.filter(
+        id=task_id,
+        status__in=['active', 'simulated'],
+        current_assignments__lt=F('max_assignments')
+    ).update(current_assignments=F('current_assignments') + 1)
+    return reserved == 1
+
+def expand_task_template(template, count):
+    """Repeat a task template count times, replacing {n} with the item number"""
+    items = []
+    for n in range(1, count + 1):
+        item = dict(template)
+        for field in ('title', 'description'):
+            if isinstance(item.get(field), str):
+                item[field] = item[field].replace('{n}', str(n))
+        items.append(item)
+    return items
+
+def parse_task_csv(content):
+    """Read task rows from CSV text or bytes with a header line"""
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    return [dict(row) for row in csv.DictReader(io.StringIO(content))]
+
+def _build_simulated_task(item, created_by, plans):
+    title = item.get('title')
+    description = item.get('description')
+    reward = item.get('reward')
+    plan_required_id = item.get('plan_required_id')
+
+    if not all([title, description, reward]):
+        raise ValueError('Title, description, and reward are required')
+
+    try:
+        reward = Decimal(str(reward))
+    except InvalidOperation:
+        raise ValueError('Invalid reward')
+    if not reward.is_finite() or reward < 0:
+        raise ValueError('Invalid reward')
+
+    plan = None
+    if plan_required_id:
+        try:
+            plan = plans.get(int(plan_required_id))
+        except (TypeError, ValueError):
+            plan = None
+        if plan is None:
+            raise ValueError('Plan not found')
+
+    deadline = None
+    if item.get('deadline'):
+        deadline = parse_datetime(str(item['deadline']))
+        if deadline is None:
+            raise ValueError('Invalid deadline')
+
+    try:
+        max_assignments = int(item.get('max_assignments') or 100)  # Simulated tasks can have many assignments
+    except (TypeError, ValueError):
+        raise ValueError('Invalid max_assignments')
+
+    return Task(
+        title=title,
+        description=description,
+        reward=reward,
+        max_assignments=max_assignments,
+        plan_required=plan,
+        deadline=deadline,
+        status='simulated',
+        created_by=created_by,
+        is_simulated=True
+    )
+
+def bulk_create_simulated_tasks(items, created_by, chunk_size=500):
+    """Validate and insert simulated tasks plus their activity logs in one transaction.
+
+    Returns the created tasks and a list of ``{'index', 'error'}`` entries for
+    the items that were skipped.
+    """
+    plans = {plan.id: plan for plan in all_plans()}
+    tasks = []
+    errors = []
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'error': 'Invalid item'})
+            continue
+        try:
+            tasks.append(_build_simulated_task(item, created_by, plans))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+
+    created = []
+    with transaction.atomic():
+        for start in range(0, len(tasks), chunk_size):
+            chunk = Task.objects.bulk_create(tasks[start:start + chunk_size])
+            TaskActivityLog.objects.bulk_create([
+                TaskActivityLog(
+                    task=task,
+                    user=created_by,
+                    activity_type='created',
+                    details={'admin_id': created_by.id, 'is_simulated': True, 'bulk': True}
+                )
+                for task in chunk
+            ])
+            created.extend(chunk)
+
+    if created:
+        # bulk_create skips post_save, so the feeds are rebuilt on next read
+        transaction.on_commit(invalidate_task_feeds)
+
+    return created, errors
+
+def _parse_reviews(reviews):
+    decisions = {}
+    errors = []
+    for index, review in enumerate(reviews):
+        try:
+            submission_id = int(review.get('submission_id'))
+        except (AttributeError, TypeError, ValueError):
+            errors.append({'index': index, 'error': 'Invalid submission_id'})
+            continue
+        if submission_id in decisions:
+            errors.append({'index': index, 'submission_id': submission_id, 'error': 'Duplicate submission_id'})
+            continue
+        decisions[submission_id] = {
+            'index': index,
+            'is_approved': bool(review.get('is_approved', False)),
+            'reviewer_notes': review.get('reviewer_notes', '') or '',
+        }
+    return decisions, errors
+
+def batch_review_submissions(reviews, reviewer):
+    """Approve or reject many submissions in a single transaction.
+
+    Related rows are loaded up front, wallet transactions, activity logs and
+    notifications are bulk inserted, and each freelancer's wallet balance and
+    total_earnings get one aggregated F() update. Submissions that were already reviewed are
+    reported as errors so they can never be paid twice.
+    """
+    decisions, errors = _parse_reviews(reviews)
+    reviewed = []
+    now = timezone.now()
+
+    with transaction.atomic():
+        submissions = TaskSubmission.objects.select_for_update(of=('self',)).filter(
+            id__in=decisions.keys(),
+            reviewed_at__isnull=True
+        ).select_related('assignment__task__created_by', 'assignment__user')
+        submissions = {submission.id: submission for submission in submissions}
+
+        for submission_id, decision in decisions.items():
+            if submission_id not in submissions:
+                errors.append({
+                    'index': decision['index'],
+                    'submission_id': submission_id,
+                    'error': 'Submission not found or already reviewed'
+                })
+
+        plans = {plan.name: plan for plan in all_plans()}
+
+        approved_user_ids = {
+            submission.assignment.user_id for submission in submissions.values()
+            if decisions[submission.id]['is_approved']
+        }
+        wallets = {wallet.user_id: wallet for wallet in Wallet.objects.filter(user_id__in=approved_user_ids)}
+        missing_wallets = [Wallet(user_id=user_id) for user_id in approved_user_ids if user_id not in wallets]
+        for wallet in Wallet.objects.bulk_create(missing_wallets):
+            wallets[wallet.user_id] = wallet
+
+        assignments = []
+        transactions = []
+        logs = []
+        notifications = []
+        earnings = defaultdict(Decimal)
+
+        for submission_id, submission in submissions.items():
+            decision = decisions[submission_id]
+            is_approved = decision['is_approved']
+            reviewer_notes = decision['reviewer_notes']
+            assignment = submission.assignment
+            task = assignment.task
+
+            if is_approved:
+                plan = plans.get(assignment.user.current_freelancer_plan)
+                if plan is None:
+                    errors.append({'index': decision['index'], 'submission_id': submission_id, 'error': 'Plan not found'})
+                    continue
+
+                # Apply plan multiplier
+                reward_with_multiplier = task.reward * plan.task_reward_multiplier
+                assignment.reward_earned = reward_with_multiplier
+                earnings[assignment.user_id] += reward_with_multiplier
+
+                transactions.append(Transaction(
+                    wallet=wallets[assignment.user_id],
+                    amount=reward_with_multiplier,
+                    transaction_type='earning',
+                    description=f'Task completion: {task.title}',
+                    reference=f'task_{task.id}'
+                ))
+                notifications.append({
+                    'user': assignment.user,
+                    'title': 'Task Approved',
+                    'message': f'Your submission for task "{task.title}" has been approved. ${reward_with_multiplier} earned.',
+                    'notification_type': 'task_approval'
+                })
+                notifications.append({
+                    'user': task.created_by,
+                    'title': 'Task Completed',
+                    'message': f'Task "{task.title}" has been completed successfully',
+                    'notification_type': 'task_completed'
+                })
+            else:
+                notifications.append({
+                    'user': assignment.user,
+                    'title': 'Task Rejected',
+                    'message': f'Your submission for task "{task.title}" has been rejected. Reason: {reviewer_notes}',
+                    'notification_type': 'task_rejection'
+                })
+
+            submission.is_approved = is_approved
+            submission.reviewer_notes = reviewer_notes
+            submission.reviewed_at = now
+            assignment.status = 'approved' if is_approved else 'rejected'
+            assignment.reviewed_at = now
+            assignments.append(assignment)
+
+            logs.append(TaskActivityLog(
+                task=task,
+                user=reviewer,
+                activity_type='approved' if is_approved else 'rejected',
+                details={'admin_id': reviewer.id, 'reviewer_notes': reviewer_notes, 'batch': True}
+            ))
+            reviewed.append({'submission_id': submission_id, 'status': assignment.status})
+
+        reviewed_ids = [item['submission_id'] for item in reviewed]
+        TaskSubmission.objects.bulk_update(
+            [submissions[submission_id] for submission_id in reviewed_ids],
+            ['is_approved', 'reviewer_notes', 'reviewed_at']
+        )
+        TaskAssignment.objects.bulk_update(assignments, ['status', 'reviewed_at', 'reward_earned'])
+        post_transactions_bulk(transactions)
+        TaskActivityLog.objects.bulk_create(logs)
+
+        for user_id, amount in earnings.items():
+            User.objects.filter(id=user_id).update(total_earnings=F('total_earnings') + amount)
+
+        send_notifications_bulk(notifications)
+
+    return reviewed, errors
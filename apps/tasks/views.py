@@ -3,73 +3,78 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.utils import timezone
+from django.db import transaction, IntegrityError
 from django.db.models import Q, F
-from django.core.paginator import Paginator
+from apps.core.pagination import paginate_request, parse_limit, InvalidCursor
 from .models import Task, TaskAssignment, TaskSubmission, TaskActivityLog
 from .serializers import TaskSerializer, TaskAssignmentSerializer, TaskSubmissionSerializer, TaskListSerializer, TaskActivityLogSerializer
+from .feed import get_task_feed, schedule_feed_refresh, FEED_PAGE_SIZE, FEED_MAX_PAGE_SIZE
+from .utils import (
+    reserve_task_slot, bulk_create_simulated_tasks, expand_task_template, parse_task_csv,
+    batch_review_submissions, MAX_BULK_TASKS, MAX_BATCH_REVIEWS
+)
+from .search import search_tasks
+from .activity import log_task_activity
+from .limits import reserve_daily_slot, release_daily_slot
 from apps.plans.models import Plan
+from apps.plans.registry import get_plan, get_plan_by_id
 from apps.users.models import User
 from apps.wallets.models import Wallet, Transaction
+from apps.wallets.ledger import post_transaction
 from apps.notifications.models import Notification
 from apps.notifications.utils import send_notification
 from apps.core.utils import validate_kyc_document
+from apps.authentication.entitlements import request_entitlements
+import csv
 import logging
 
 logger = logging.getLogger(__name__)
 
+def admin_task_row(task):
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'reward': float(task.reward),
+        'max_assignments': task.max_assignments,
+        'current_assignments': task.current_assignments,
+        'plan_required': task.plan_required.name if task.plan_required else None,
+        'status': task.status,
+        'created_by': {
+            'id': task.created_by.id,
+            'username': task.created_by.username,
+            'email': task.created_by.email
+        } if task.created_by else None,
+        'created_at': task.created_at.isoformat(),
+        'deadline': task.deadline.isoformat() if task.deadline else None,
+        'headline': getattr(task, 'search_headline', None),
+    }
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def task_list_api(request):
     """API endpoint for listing tasks"""
-    if request.user.user_type not in ['admin', 'moderator']:
+    if not request_entitlements(request).is_staff_member:
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
     # Get query parameters
     search_term = request.GET.get('search', '')
-    page = int(request.GET.get('page', 1))
-    limit = int(request.GET.get('limit', 10))
 
     # Filter tasks
     tasks = Task.objects.all().select_related('created_by', 'plan_required').order_by('-created_at')
 
     if search_term:
-        tasks = tasks.filter(
-            Q(title__icontains=search_term) |
-            Q(description__icontains=search_term)
-        )
+        # Keyset pages follow (created_at, id), not the search rank
+        if 'cursor' in request.GET:
+            return Response({'error': 'cursor cannot be combined with search'}, status=status.HTTP_400_BAD_REQUEST)
+        tasks = search_tasks(tasks, search_term)
 
-    # Paginate
-    paginator = Paginator(tasks, limit)
-    page_obj = paginator.get_page(page)
-
-    # Serialize data
-    task_data = []
-    for task in page_obj:
-        task_data.append({
-            'id': task.id,
-            'title': task.title,
-            'description': task.description,
-            'reward': float(task.reward),
-            'max_assignments': task.max_assignments,
-            'current_assignments': task.current_assignments,
-            'plan_required': task.plan_required.name if task.plan_required else None,
-            'status': task.status,
-            'created_by': {
-                'id': task.created_by.id,
-                'username': task.created_by.username,
-                'email': task.created_by.email
-            } if task.created_by else None,
-            'created_at': task.created_at.isoformat(),
-            'deadline': task.deadline.isoformat() if task.deadline else None,
-        })
-
-    response_data = {
-        'results': task_data,
-        'count': paginator.count,
-        'next': page_obj.has_next(),
-        'previous': page_obj.has_previous(),
-        'total_pages': paginator.num_pages
-    }
+    try:
+        response_data = paginate_request(request, tasks, admin_task_row)
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     return Response(response_data)
 
@@ -77,7 +82,7 @@ def task_list_api(request):
 @permission_classes([IsAuthenticated])
 def task_detail_api(request, task_id):
     """API endpoint for getting a specific task's details"""
-    if request.user.user_type not in ['admin', 'moderator']:
+    if not request_entitlements(request).is_staff_member:
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
     try:
@@ -91,31 +96,31 @@ def task_detail_api(request, task_id):
 @permission_classes([IsAuthenticated])
 def task_list_view(request):
     """Get available tasks for freelancers"""
-    if request.user.active_role not in ['freelancer', 'both']:
+    entitlements = request_entitlements(request)
+    if not entitlements.is_freelancer:
         return Response({'error': 'Access denied - freelancer role required'}, status=status.HTTP_403_FORBIDDEN)
 
-    if not request.user.can_access_freelancer_features():
+    if not entitlements.can_access_freelancer_features():
         return Response({'error': 'No active freelancer subscription'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Get current plan
-    current_plan = Plan.objects.get(name=request.user.current_freelancer_plan)
+    # The shared per-plan feed is built from the registry plan, never from token data
+    current_plan = get_plan(entitlements.freelancer_plan.name)
 
-    # Get tasks that are available and match the user's plan requirements
-    tasks = Task.objects.filter(
-        Q(plan_required__priority__lte=current_plan.priority) | Q(is_simulated=True),
-        status__in=['active', 'simulated'],
-        deadline__gt=timezone.now(),
-        current_assignments__lt=F('max_assignments')
-    ).select_related('plan_required').order_by('-created_at')
+    try:
+        limit = parse_limit(request.GET.get('limit'), FEED_PAGE_SIZE, FEED_MAX_PAGE_SIZE)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    serializer = TaskListSerializer(tasks, many=True)
-    return Response(serializer.data)
+    # Read the materialized feed for the user's plan tier
+    tasks = get_task_feed(current_plan, limit)
+    return Response(tasks)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def assign_task_view(request, task_id):
     """Assign a task to freelancer"""
-    if request.user.active_role not in ['freelancer', 'both']:
+    entitlements = request_entitlements(request)
+    if not entitlements.is_freelancer:
         return Response({'error': 'Access denied - freelancer role required'}, status=status.HTTP_403_FORBIDDEN)
 
     try:
@@ -124,9 +129,13 @@ def assign_task_view(request, task_id):
         if not task.is_available:
             return Response({'error': 'Task is not available'}, status=status.HTTP_400_BAD_REQUEST)
 
+        current_plan = entitlements.freelancer_plan
+        # No plan, or the plan was deleted or deactivated: no access
+        if current_plan.priority is None or not current_plan.is_active:
+            return Response({'error': 'No active freelancer subscription'}, status=status.HTTP_400_BAD_REQUEST)
+
         # Check plan requirements (skip for simulated tasks)
         if not task.is_simulated:
-            current_plan = Plan.objects.get(name=request.user.current_freelancer_plan)
             if task.plan_required and task.plan_required.priority > current_plan.priority:
                 return Response({'error': 'Your plan does not have access to this task'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -139,18 +148,34 @@ def assign_task_view(request, task_id):
         if active_assignments >= current_plan.max_concurrent_tasks:
             return Response({'error': 'You have reached your concurrent task limit'}, status=status.HTTP_400_BAD_REQUEST)
 
-        assignment, created = TaskAssignment.objects.get_or_create(
-            task=task,
-            user=request.user,
-            defaults={'status': 'accepted'}
-        )
+        assignment = TaskAssignment.objects.filter(task=task, user=request.user).first()
+
+        if assignment is None:
+            if not reserve_daily_slot(request.user, current_plan.daily_task_limit):
+                return Response({'error': 'You have reached your daily task limit'}, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                with transaction.atomic():
+                    # Reserve the slot with a conditional UPDATE so concurrent
+                    # assigns can never push the task past max_assignments
+                    if not reserve_task_slot(task.id):
+                        release_daily_slot(request.user)
+                        return Response({'error': 'Task is not available'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if created:
-            task.current_assignments += 1
-            task.save()
+                    assignment = TaskAssignment.objects.create(
+                        task=task,
+                        user=request.user,
+                        status='accepted'
+                    )
+            except IntegrityError:
+                # A parallel request from the same user won the race
+                release_daily_slot(request.user)
+                return Response({'error': 'Task already assigned'}, status=status.HTTP_400_BAD_REQUEST)
+
+            schedule_feed_refresh(task.id)
 
             # Log activity
-            TaskActivityLog.objects.create(
+            log_task_activity(
                 task=task,
                 user=request.user,
                 activity_type='assigned',
@@ -163,7 +188,7 @@ def assign_task_view(request, task_id):
             assignment.save()
 
             # Log activity
-            TaskActivityLog.objects.create(
+            log_task_activity(
                 task=task,
                 user=request.user,
                 activity_type='accepted',
@@ -179,7 +204,7 @@ def assign_task_view(request, task_id):
 @permission_classes([IsAuthenticated])
 def submit_task_view(request, assignment_id):
     """Submit completed task"""
-    if request.user.active_role not in ['freelancer', 'both']:
+    if not request_entitlements(request).is_freelancer:
         return Response({'error': 'Access denied - freelancer role required'}, status=status.HTTP_403_FORBIDDEN)
 
     try:
@@ -199,7 +224,7 @@ def submit_task_view(request, assignment_id):
         assignment.save()
 
         # Log activity
-        TaskActivityLog.objects.create(
+        log_task_activity(
             task=assignment.task,
             user=request.user,
             activity_type='submitted',
@@ -240,7 +265,7 @@ def user_assignments_view(request):
 @permission_classes([IsAuthenticated])
 def admin_review_submission(request, submission_id):
     """Admin review of task submission"""
-    if request.user.user_type not in ['admin', 'moderator']:
+    if not request_entitlements(request).is_staff_member:
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
     try:
@@ -259,7 +284,7 @@ def admin_review_submission(request, submission_id):
 
         if is_approved:
             # Apply plan multiplier
-            plan = Plan.objects.get(name=assignment.user.current_freelancer_plan)
+            plan = get_plan(assignment.user.current_freelancer_plan)
             reward_with_multiplier = assignment.task.reward * plan.task_reward_multiplier
 
             assignment.reward_earned = reward_with_multiplier
@@ -268,7 +293,7 @@ def admin_review_submission(request, submission_id):
 
             # Add to wallet
             wallet, created = Wallet.objects.get_or_create(user=assignment.user)
-            Transaction.objects.create(
+            post_transaction(
                 wallet=wallet,
                 amount=reward_with_multiplier,
                 transaction_type='earning',
@@ -302,7 +327,7 @@ def admin_review_submission(request, submission_id):
         assignment.save()
 
         # Log activity
-        TaskActivityLog.objects.create(
+        log_task_activity(
             task=assignment.task,
             user=request.user,
             activity_type='approved' if is_approved else 'rejected',
@@ -314,11 +339,33 @@ def admin_review_submission(request, submission_id):
     except TaskSubmission.DoesNotExist:
         return Response({'error': 'Submission not found'}, status=status.HTTP_404_NOT_FOUND)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def admin_batch_review_submissions(request):
+    """Admin review of many task submissions in one request"""
+    if not request_entitlements(request).is_staff_member:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    reviews = request.data.get('reviews')
+    if not isinstance(reviews, list) or not reviews:
+        return Response({'error': 'A list of reviews is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if len(reviews) > MAX_BATCH_REVIEWS:
+        return Response({'error': f'At most {MAX_BATCH_REVIEWS} reviews per batch'}, status=status.HTTP_400_BAD_REQUEST)
+
+    reviewed, errors = batch_review_submissions(reviews, request.user)
+
+    return Response({
+        'message': f'{len(reviewed)} submissions reviewed',
+        'reviewed': reviewed,
+        'errors': errors
+    })
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_simulated_task_view(request):
     """Admin create simulated task for freelancer feed"""
-    if request.user.user_type not in ['admin', 'moderator']:
+    if not request_entitlements(request).is_staff_member:
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
     title = request.data.get('title')
@@ -330,7 +377,7 @@ def create_simulated_task_view(request):
         return Response({'error': 'Title, description, and reward are required'}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        plan = Plan.objects.get(id=plan_required_id) if plan_required_id else None
+        plan = get_plan_by_id(plan_required_id) if plan_required_id else None
     except Plan.DoesNotExist:
         return Response({'error': 'Plan not found'}, status=status.HTTP_404_NOT_REQUEST)
 
@@ -346,7 +393,7 @@ def create_simulated_task_view(request):
     )
 
     # Log activity
-    TaskActivityLog.objects.create(
+    log_task_activity(
         task=task,
         user=request.user,
         activity_type='created',
@@ -358,11 +405,53 @@ def create_simulated_task_view(request):
         'task_id': task.id
     })
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_create_simulated_tasks_view(request):
+    """Admin create many simulated tasks from a JSON batch, a CSV file or a template"""
+    if not request_entitlements(request).is_staff_member:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    csv_file = request.FILES.get('file')
+    template = request.data.get('template')
+
+    if csv_file:
+        try:
+            items = parse_task_csv(csv_file.read())
+        except (UnicodeDecodeError, csv.Error):
+            return Response({'error': 'Invalid CSV file'}, status=status.HTTP_400_BAD_REQUEST)
+    elif template:
+        try:
+            count = int(request.data.get('count', 0))
+        except (TypeError, ValueError):
+            count = 0
+        if not isinstance(template, dict) or count <= 0:
+            return Response({'error': 'A template object and a positive count are required'}, status=status.HTTP_400_BAD_REQUEST)
+        if count > MAX_BULK_TASKS:
+            return Response({'error': f'At most {MAX_BULK_TASKS} tasks per batch'}, status=status.HTTP_400_BAD_REQUEST)
+        items = expand_task_template(template, count)
+    else:
+        items = request.data.get('tasks')
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'Provide tasks, a template and count, or a CSV file'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if len(items) > MAX_BULK_TASKS:
+        return Response({'error': f'At most {MAX_BULK_TASKS} tasks per batch'}, status=status.HTTP_400_BAD_REQUEST)
+
+    tasks, errors = bulk_create_simulated_tasks(items, request.user)
+
+    return Response({
+        'message': f'{len(tasks)} simulated tasks created',
+        'created': len(tasks),
+        'task_ids': [task.id for task in tasks],
+        'errors': errors
+    }, status=status.HTTP_200_OK if tasks else status.HTTP_400_BAD_REQUEST)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def task_activity_logs_view(request, task_id):
     """Get activity logs for a task"""
-    if request.user.user_type not in ['admin', 'moderator']:
+    if not request_entitlements(request).is_staff_member:
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
     try:
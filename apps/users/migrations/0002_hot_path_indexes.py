@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loginattempt',
+            index=models.Index(fields=['ip_address', 'timestamp'], name='loginattempt_ip_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sessioncontrol',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user'], name='session_active_user_idx'),
+        ),
+    ]
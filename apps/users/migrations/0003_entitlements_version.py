@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='entitlements_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
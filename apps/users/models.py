@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import DEFERRED, F
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from phonenumber_field.modelfields import PhoneNumberField
@@ -38,12 +39,22 @@ class User(AbstractUser):
     referred_by = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True)
     last_login_ip = models.GenericIPAddressField(null=True, blank=True)
     last_login_device = models.TextField(null=True, blank=True)
+    # Bumped whenever a field below changes so tokens minted earlier are refreshed
+    entitlements_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
     
+    ENTITLEMENT_FIELDS = ['user_type', 'active_role', 'current_freelancer_plan', 'current_client_plan', 'is_active']
+    
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pages order by (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='user_created_id_idx'),
+        ]
+    
     # Fix reverse accessor conflicts
     groups = models.ManyToManyField(
         'auth.Group',
@@ -56,25 +67,52 @@ class User(AbstractUser):
         blank=True,
     )
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_entitlements = instance._entitlement_state()
+        # Compared by the referral stats post_save receiver
+        instance._loaded_referred_by_id = instance.__dict__.get('referred_by_id', DEFERRED)
+        return instance
+    
+    def _entitlement_state(self):
+        # Deferred fields are missing from __dict__ and compare as unchanged
+        return tuple(self.__dict__.get(field) for field in self.ENTITLEMENT_FIELDS)
+    
     def save(self, *args, **kwargs):
         if not self.referral_code:
             self.referral_code = self.generate_referral_code()
+        
+        update_fields = kwargs.get('update_fields')
+        loaded = getattr(self, '_loaded_entitlements', None)
+        changed = not self._state.adding and loaded is not None and any(
+            old != new and (update_fields is None or field in update_fields)
+            for field, old, new in zip(self.ENTITLEMENT_FIELDS, loaded, self._entitlement_state())
+        )
+        if changed:
+            # Bumped in the same UPDATE, so tokens minted before the change are refreshed
+            self.entitlements_version = F('entitlements_version') + 1
+            if update_fields is not None:
+                kwargs['update_fields'] = [*update_fields, 'entitlements_version']
+        
         super().save(*args, **kwargs)
+        
+        if changed:
+            self.refresh_from_db(fields=['entitlements_version'])
+        self._loaded_entitlements = self._entitlement_state()
     
     def generate_referral_code(self):
         return str(uuid4())[:12].upper()
     
     def can_access_client_features(self):
         """Check if user has active client subscription"""
-        from apps.plans.models import Plan
-        plan = Plan.objects.filter(name=self.current_client_plan, is_active=True).first()
-        return plan is not None
+        from apps.plans.registry import is_active_plan
+        return is_active_plan(self.current_client_plan)
     
     def can_access_freelancer_features(self):
         """Check if user has active freelancer subscription"""
-        from apps.plans.models import Plan
-        plan = Plan.objects.filter(name=self.current_freelancer_plan, is_active=True).first()
-        return plan is not None
+        from apps.plans.registry import is_active_plan
+        return is_active_plan(self.current_freelancer_plan)
     
     def switch_role(self, new_role):
         """Switch between freelancer and client roles"""
@@ -116,6 +154,9 @@ class LoginAttempt(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['ip_address', 'timestamp'], name='loginattempt_ip_time_idx'),
+        ]
 
 class SessionControl(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -128,6 +169,9 @@ class SessionControl(models.Model):
     
     class Meta:
         unique_together = ['user', 'session_key']
+        indexes = [
+            models.Index(fields=['user'], name='session_active_user_idx', condition=models.Q(is_active=True)),
+        ]
 
 class KYCDocument(models.Model):
     DOCUMENT_TYPES = [
@@ -0,0 +1,48 @@
+from django.test import TestCase
+from apps.plans.models import Plan
+from apps.users.models import User
+
+class EntitlementsVersionTests(TestCase):
+    def setUp(self):
+        self.plan = Plan.objects.create(name='basic', priority=1)
+        created = User.objects.create_user(email='member@example.com', username='member', password='pass')
+        self.user = User.objects.get(pk=created.pk)
+
+    def version(self):
+        return User.objects.values_list('entitlements_version', flat=True).get(pk=self.user.pk)
+
+    def test_unrelated_save_is_a_plain_update(self):
+        self.user.first_name = 'Ada'
+        with self.assertNumQueries(1):
+            self.user.save()
+        self.assertEqual(self.version(), 0)
+
+    def test_role_change_bumps_version(self):
+        self.user.active_role = 'client'
+        self.user.save()
+        self.assertEqual(self.user.entitlements_version, 1)
+        self.assertEqual(self.version(), 1)
+
+    def test_role_change_outside_update_fields_does_not_bump(self):
+        self.user.active_role = 'client'
+        self.user.first_name = 'Ada'
+        self.user.save(update_fields=['first_name'])
+        self.assertEqual(self.version(), 0)
+
+    def test_save_of_a_deleted_row_inserts_it_again(self):
+        User.objects.filter(pk=self.user.pk).delete()
+        self.user.save()
+        self.assertTrue(User.objects.filter(pk=self.user.pk).exists())
+
+    def test_cosmetic_plan_edit_does_not_bump_members(self):
+        plan = Plan.objects.get(pk=self.plan.pk)
+        plan.monthly_price = 9
+        plan.features = ['Priority support']
+        plan.save()
+        self.assertEqual(self.version(), 0)
+
+    def test_plan_limit_edit_bumps_members(self):
+        plan = Plan.objects.get(pk=self.plan.pk)
+        plan.daily_task_limit = 20
+        plan.save()
+        self.assertEqual(self.version(), 1)
@@ -2,7 +2,7 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from django.core.paginator import Paginator
+from apps.core.pagination import paginate_request, InvalidCursor
 from django.db.models import Q
 from .models import User, EmailVerificationToken, PhoneVerificationToken, KYCDocument
 from .serializers import UserRegistrationSerializer, ProfileSerializer, ChangePasswordSerializer
@@ -43,6 +43,24 @@ def welcome_view(request):
     }
     return Response(welcome_data)
 
+def admin_user_row(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'phone_number': str(user.phone_number),
+        'user_type': user.user_type,
+        'is_active': user.is_active,
+        'is_email_verified': user.is_email_verified,
+        'is_phone_verified': user.is_phone_verified,
+        'is_kyc_verified': user.is_kyc_verified,
+        'current_plan': user.current_plan,
+        'total_earnings': float(user.total_earnings),
+        'total_deposits': float(user.total_deposits),
+        'total_withdrawals': float(user.total_withdrawals),
+        'created_at': user.created_at.isoformat()
+    }
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_list_api(request):
@@ -52,8 +70,6 @@ def user_list_api(request):
 
     # Get query parameters
     search_term = request.GET.get('search', '')
-    page = int(request.GET.get('page', 1))
-    limit = int(request.GET.get('limit', 10))
 
     # Filter users
     users = User.objects.all().order_by('-created_at')
@@ -65,37 +81,12 @@ def user_list_api(request):
             Q(phone_number__icontains=search_term)
         )
 
-    # Paginate
-    paginator = Paginator(users, limit)
-    page_obj = paginator.get_page(page)
-
-    # Serialize data
-    user_data = []
-    for user in page_obj:
-        user_data.append({
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'phone_number': str(user.phone_number),
-            'user_type': user.user_type,
-            'is_active': user.is_active,
-            'is_email_verified': user.is_email_verified,
-            'is_phone_verified': user.is_phone_verified,
-            'is_kyc_verified': user.is_kyc_verified,
-            'current_plan': user.current_plan,
-            'total_earnings': float(user.total_earnings),
-            'total_deposits': float(user.total_deposits),
-            'total_withdrawals': float(user.total_withdrawals),
-            'created_at': user.created_at.isoformat()
-        })
-
-    response_data = {
-        'results': user_data,
-        'count': paginator.count,
-        'next': page_obj.has_next(),
-        'previous': page_obj.has_previous(),
-        'total_pages': paginator.num_pages
-    }
+    try:
+        response_data = paginate_request(request, users, admin_user_row)
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     return Response(response_data)
 
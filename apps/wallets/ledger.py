@@ -0,0 +1,123 @@
+from django.db import transaction
+from django.db.models import Case, F, Max, OuterRef, Subquery, Sum, When, DecimalField
+from django.utils import timezone
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from .models import Wallet, Transaction, WalletBalanceSnapshot
+from apps.core.ids import new_reference
+
+# Transaction.amount is always stored positive; the type decides the direction
+CREDIT_TYPES = ['deposit', 'earning', 'referral_bonus', 'withdrawal_reversal']
+DEBIT_TYPES = ['withdrawal', 'plan_upgrade', 'task_penalty']
+
+SNAPSHOT_SETTLE_TIME = timedelta(minutes=1)  # Leave in-flight transactions to the next snapshot
+
+class InsufficientBalance(Exception):
+    pass
+
+def signed_amount(transaction_type, amount):
+    amount = Decimal(str(amount))
+    return -amount if transaction_type in DEBIT_TYPES else amount
+
+def signed_amount_expression():
+    """SQL expression for a transaction's effect on the balance"""
+    return Case(
+        When(transaction_type__in=DEBIT_TYPES, then=-F('amount')),
+        default=F('amount'),
+        output_field=DecimalField(max_digits=12, decimal_places=2)
+    )
+
+def _apply_delta(wallet_id, delta):
+    wallets = Wallet.objects.filter(pk=wallet_id)
+    if delta < 0:
+        # Conditional update: the balance check and the debit are one statement
+        wallets = wallets.filter(balance__gte=-delta)
+    if not wallets.update(balance=F('balance') + delta, updated_at=timezone.now()):
+        raise InsufficientBalance(f'Insufficient balance in wallet {wallet_id}')
+
+def post_transaction(wallet, amount, transaction_type, description, reference='', metadata=None):
+    """Record a Transaction and move the wallet's running balance atomically.
+
+    Debits raise InsufficientBalance instead of taking the balance negative;
+    a blank reference gets a generated txn_<id>.
+    """
+    with transaction.atomic():
+        _apply_delta(wallet.pk, signed_amount(transaction_type, amount))
+        return Transaction.objects.create(
+            wallet=wallet,
+            amount=amount,
+            transaction_type=transaction_type,
+            description=description,
+            reference=reference or new_reference('txn'),
+            metadata=metadata or {}
+        )
+
+def post_transactions_bulk(transactions):
+    """Post many unsaved Transaction objects with one balance update per wallet"""
+    deltas = defaultdict(Decimal)
+    for txn in transactions:
+        if not txn.reference:
+            txn.reference = new_reference('txn')
+        deltas[txn.wallet_id] += signed_amount(txn.transaction_type, txn.amount)
+
+    with transaction.atomic():
+        for wallet_id, delta in deltas.items():
+            _apply_delta(wallet_id, delta)
+        return Transaction.objects.bulk_create(transactions)
+
+def balance_at(wallet, moment):
+    """Rebuild a wallet's balance at a point in time from the nearest snapshot"""
+    snapshot = (
+        WalletBalanceSnapshot.objects.filter(wallet=wallet, taken_at__lte=moment)
+        .order_by('-taken_at')
+        .first()
+    )
+    base = snapshot.balance if snapshot else Decimal('0.00')
+    transactions = Transaction.objects.filter(wallet=wallet, created_at__lte=moment)
+    if snapshot:
+        transactions = transactions.filter(id__gt=snapshot.last_transaction_id)
+
+    delta = transactions.aggregate(total=Sum(signed_amount_expression()))['total'] or Decimal('0.00')
+    return base + delta
+
+def take_balance_snapshots():
+    """Snapshot every wallet that moved since the previous snapshot run"""
+    cutoff = timezone.now() - SNAPSHOT_SETTLE_TIME
+    cut_id = Transaction.objects.filter(created_at__lt=cutoff).aggregate(last=Max('id'))['last']
+    previous_cut = WalletBalanceSnapshot.objects.aggregate(last=Max('last_transaction_id'))['last'] or 0
+    if not cut_id or cut_id <= previous_cut:
+        return 0
+
+    deltas = (
+        Transaction.objects.filter(id__gt=previous_cut, id__lte=cut_id)
+        .values('wallet_id')
+        .annotate(delta=Sum(signed_amount_expression()))
+    )
+    deltas = {row['wallet_id']: row['delta'] for row in deltas}
+
+    latest = WalletBalanceSnapshot.objects.filter(wallet_id=OuterRef('pk')).order_by('-last_transaction_id')
+    previous = dict(
+        Wallet.objects.filter(pk__in=deltas.keys())
+        .annotate(previous_balance=Subquery(latest.values('balance')[:1]))
+        .values_list('pk', 'previous_balance')
+    )
+
+    snapshots = [
+        WalletBalanceSnapshot(
+            wallet_id=wallet_id,
+            balance=(previous.get(wallet_id) or Decimal('0.00')) + delta,
+            last_transaction_id=cut_id
+        )
+        for wallet_id, delta in deltas.items()
+    ]
+    WalletBalanceSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+    return len(snapshots)
+
+def rebuild_wallet_balance(wallet):
+    """Reset the running balance from the snapshot chain and the transactions since"""
+    with transaction.atomic():
+        wallet = Wallet.objects.select_for_update().get(pk=wallet.pk)
+        wallet.balance = balance_at(wallet, timezone.now())
+        wallet.save(update_fields=['balance', 'updated_at'])
+    return wallet.balance
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from apps.wallets.models import Wallet
+from apps.wallets.ledger import rebuild_wallet_balance
+
+class Command(BaseCommand):
+    help = 'Recompute running wallet balances from snapshots and the transaction ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, help='Only rebuild the wallet of this user')
+
+    def handle(self, *args, **options):
+        wallets = Wallet.objects.order_by('id')
+        if options['user_id']:
+            wallets = wallets.filter(user_id=options['user_id'])
+
+        changed = 0
+        for wallet in wallets.iterator():
+            old_balance = wallet.balance
+            if rebuild_wallet_balance(wallet) != old_balance:
+                changed += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt balances, {changed} wallets changed'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.wallets.reconciliation import reconcile_ledger, CHUNK_SIZE
+
+class Command(BaseCommand):
+    help = 'Diff wallet balances and user totals against the transaction ledger and write a CSV report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Split wallet id ranges across this many processes')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Transactions read per query')
+        parser.add_argument('--output', help='Report path (defaults to MEDIA_ROOT/reconciliation/)')
+
+    def handle(self, *args, **options):
+        summary = reconcile_ledger(
+            processes=options['processes'],
+            chunk_size=options['chunk_size'],
+            output=options['output']
+        )
+        for key, value in summary.items():
+            self.stdout.write(f'{key}: {value}')
+        if summary['discrepancies']:
+            raise CommandError(f"{summary['discrepancies']} discrepancies, see {summary['report']}")
+        self.stdout.write(self.style.SUCCESS('Ledger reconciled'))
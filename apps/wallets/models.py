@@ -20,6 +20,7 @@ class Transaction(models.Model):
         ('referral_bonus', 'Referral Bonus'),
         ('plan_upgrade', 'Plan Upgrade'),
         ('task_penalty', 'Task Penalty'),
+        ('withdrawal_reversal', 'Withdrawal Reversal'),
     ]
     
     wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='transactions')
@@ -32,6 +33,26 @@ class Transaction(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['wallet', 'transaction_type', 'created_at'], name='transaction_wallet_type_idx'),
+            models.Index(fields=['wallet', '-created_at', '-id'], name='transaction_wallet_created_idx'),
+            models.Index(fields=['created_at'], name='transaction_created_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.transaction_type} - ${self.amount} - {self.wallet.user.username}"
\ No newline at end of file
+        return f"{self.transaction_type} - ${self.amount} - {self.wallet.user.username}"
+
+class WalletBalanceSnapshot(models.Model):
+    """Wallet balance as of a transaction id, so history can be rebuilt without a full scan"""
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='snapshots')
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+    last_transaction_id = models.BigIntegerField()
+    taken_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['wallet', 'taken_at'], name='snapshot_wallet_taken_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.wallet.user.username} - ${self.balance} at {self.taken_at}"
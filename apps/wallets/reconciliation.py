@@ -0,0 +1,170 @@
+from django.conf import settings
+from django.db import connections
+from django.db.models import BigIntegerField, F, Max, Min, Sum
+from django.db.models.functions import Cast, Round
+from django.utils import timezone
+from .models import Wallet, Transaction
+from .ledger import DEBIT_TYPES, signed_amount_expression
+from apps.payments.models import Withdrawal
+from apps.users.models import User
+import logging
+import multiprocessing
+import os
+import pandas as pd
+import time
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 200000
+WALLET_BLOCK = 5000
+REPORT_COLUMNS = ['wallet_id', 'user_id', 'check', 'expected', 'actual', 'difference']
+
+# Which ledger types feed each denormalized User total
+USER_TOTALS = {
+    'total_earnings': {'earning': 1},
+    'total_deposits': {'deposit': 1},
+    'total_withdrawals': {'withdrawal': 1, 'withdrawal_reversal': -1},
+}
+
+def _cents(field):
+    # Exact integer arithmetic: money never goes through floats. Round before the
+    # cast, since SQLite multiplies as REAL and a bare cast truncates (0.29 -> 28)
+    return Cast(Round(F(field) * 100), BigIntegerField())
+
+def aggregate_ledger(wallet_range, max_transaction_id, chunk_size=CHUNK_SIZE):
+    """Stream transactions for a wallet id range and sum cents per (wallet, type)"""
+    low, high = wallet_range
+    totals = None
+    # Small wallet blocks keep each query on the wallet index instead of a table scan
+    for block_low in range(low, high + 1, WALLET_BLOCK):
+        block_high = min(block_low + WALLET_BLOCK - 1, high)
+        last_id = 0
+        while True:
+            rows = list(
+                Transaction.objects.filter(
+                    wallet_id__gte=block_low, wallet_id__lte=block_high,
+                    id__gt=last_id, id__lte=max_transaction_id
+                )
+                .order_by('id')
+                .annotate(cents=_cents('amount'))
+                .values_list('id', 'wallet_id', 'transaction_type', 'cents')[:chunk_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            chunk = pd.DataFrame.from_records(rows, columns=['id', 'wallet_id', 'transaction_type', 'cents'])
+            sums = chunk.groupby(['wallet_id', 'transaction_type'])['cents'].sum()
+            totals = sums if totals is None else totals.add(sums, fill_value=0)
+
+    if totals is None:
+        return pd.DataFrame(dtype='int64')
+    return totals.unstack(fill_value=0).astype('int64')
+
+def _aggregate_in_child(args):
+    wallet_range, max_transaction_id, chunk_size = args
+    try:
+        return aggregate_ledger(wallet_range, max_transaction_id, chunk_size)
+    finally:
+        connections.close_all()
+
+def _wallet_ranges(processes):
+    bounds = Wallet.objects.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return []
+    step = (bounds['high'] - bounds['low']) // processes + 1
+    return [(low, min(low + step - 1, bounds['high'])) for low in range(bounds['low'], bounds['high'] + 1, step)]
+
+def _expected_and_actual(ledger):
+    """Frame indexed by wallet with expected and stored values for every check, in cents"""
+    for transaction_type, _ in Transaction.TRANSACTION_TYPES:
+        if transaction_type not in ledger.columns:
+            ledger[transaction_type] = 0
+
+    wallets = pd.DataFrame.from_records(
+        Wallet.objects.annotate(balance_cents=_cents('balance')).values_list('id', 'user_id', 'balance_cents'),
+        columns=['wallet_id', 'user_id', 'balance']
+    ).set_index('wallet_id')
+    users = pd.DataFrame.from_records(
+        User.objects.annotate(
+            earnings=_cents('total_earnings'),
+            deposits=_cents('total_deposits'),
+            withdrawals=_cents('total_withdrawals')
+        ).values_list('id', 'earnings', 'deposits', 'withdrawals'),
+        columns=['user_id', 'total_earnings', 'total_deposits', 'total_withdrawals']
+    )
+    # Debited at claim time but only counted in total_withdrawals once completed
+    in_flight = pd.DataFrame.from_records(
+        Withdrawal.objects.filter(status='processing').values('user_id').annotate(cents=Sum(_cents('amount'))).values_list('user_id', 'cents'),
+        columns=['user_id', 'in_flight']
+    )
+
+    frame = wallets.join(ledger, how='left').fillna(0)
+    frame = frame.reset_index().merge(users, on='user_id', how='left').merge(in_flight, on='user_id', how='left')
+    frame = frame.fillna(0).set_index('wallet_id').astype('int64')
+
+    credit_columns = [t for t in ledger.columns if t not in DEBIT_TYPES]
+    expected = pd.DataFrame(index=frame.index)
+    expected['balance'] = frame[credit_columns].sum(axis=1) - frame[DEBIT_TYPES].sum(axis=1)
+    for field, weights in USER_TOTALS.items():
+        expected[field] = sum(frame[t] * weight for t, weight in weights.items())
+    expected['total_withdrawals'] -= frame['in_flight']
+
+    actual = frame[['balance', *USER_TOTALS]]
+    return frame['user_id'], expected, actual
+
+def _recheck_balance(wallet_id):
+    """Exact single-wallet check, to drop mismatches caused by writes during the run"""
+    wallet = Wallet.objects.get(pk=wallet_id)
+    ledger = Transaction.objects.filter(wallet_id=wallet_id).aggregate(total=Sum(signed_amount_expression()))['total'] or 0
+    return wallet.balance == ledger
+
+def reconcile_ledger(processes=1, chunk_size=CHUNK_SIZE, output=None):
+    """Compare wallet balances and user totals with the transaction ledger and write a CSV report"""
+    started = time.monotonic()
+    max_transaction_id = Transaction.objects.aggregate(last=Max('id'))['last'] or 0
+    ranges = _wallet_ranges(max(processes, 1))
+
+    if processes > 1 and len(ranges) > 1:
+        connections.close_all()  # Children must not share the parent's sockets
+        with multiprocessing.get_context('fork').Pool(processes) as pool:
+            parts = pool.map(_aggregate_in_child, [(r, max_transaction_id, chunk_size) for r in ranges])
+    else:
+        parts = [aggregate_ledger(r, max_transaction_id, chunk_size) for r in ranges]
+
+    parts = [part for part in parts if not part.empty]
+    ledger = pd.concat(parts).fillna(0).astype('int64') if parts else pd.DataFrame(dtype='int64')
+
+    user_ids, expected, actual = _expected_and_actual(ledger)
+    report = pd.DataFrame({'expected': expected.stack(), 'actual': actual.stack()})
+    report['difference'] = report['actual'] - report['expected']
+    report = report[report['difference'] != 0].rename_axis(['wallet_id', 'check']).reset_index()
+    report['user_id'] = report['wallet_id'].map(user_ids)
+
+    # Transactions posted after the cut can make a balance look wrong; confirm those exactly
+    balance_rows = report['check'] == 'balance'
+    stale = [w for w in report.loc[balance_rows, 'wallet_id'] if _recheck_balance(w)]
+    report = report[~(balance_rows & report['wallet_id'].isin(stale))]
+
+    for column in ['expected', 'actual', 'difference']:
+        report[column] = report[column] / 100
+
+    if output is None:
+        directory = os.path.join(settings.MEDIA_ROOT, 'reconciliation')
+        os.makedirs(directory, exist_ok=True)
+        output = os.path.join(directory, f'ledger_{timezone.now():%Y%m%d_%H%M%S}.csv')
+    report[REPORT_COLUMNS].to_csv(output, index=False)
+
+    summary = {
+        'wallets': len(actual),
+        'transactions_through_id': max_transaction_id,
+        'discrepancies': len(report),
+        'by_check': report['check'].value_counts().to_dict(),
+        'report': output,
+        'elapsed': round(time.monotonic() - started, 2),
+    }
+    if summary['discrepancies']:
+        logger.warning('Ledger reconciliation found discrepancies: %s', summary)
+    else:
+        logger.info('Ledger reconciliation clean: %s', summary)
+    return summary
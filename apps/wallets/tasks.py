@@ -0,0 +1,15 @@
+from celery import shared_task
+from .ledger import take_balance_snapshots
+from .reconciliation import reconcile_ledger
+
+@shared_task
+def snapshot_wallet_balances():
+    """Store balance snapshots for wallets with new transactions"""
+    count = take_balance_snapshots()
+    return f"Stored {count} wallet balance snapshots"
+
+@shared_task
+def reconcile_wallet_ledger(processes=1):
+    """Nightly check of balances and user totals against the transaction ledger"""
+    summary = reconcile_ledger(processes=processes)
+    return f"Reconciled {summary['wallets']} wallets, {summary['discrepancies']} discrepancies ({summary['report']})"
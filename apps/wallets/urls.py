@@ -4,5 +4,6 @@ from . import views
 urlpatterns = [
     path('', views.wallet_view, name='wallet'),
     path('transactions/', views.transaction_history_view, name='transaction_history'),
+    path('transactions/export/', views.export_transactions_view, name='export_transactions'),
     path('balance/', views.balance_view, name='balance'),
 ]
\ No newline at end of file
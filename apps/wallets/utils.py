@@ -0,0 +1,73 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time, timedelta
+from .models import Transaction
+import csv
+import json
+
+EXPORT_FIELDS = ['id', 'created_at', 'transaction_type', 'amount', 'description', 'reference']
+EXPORT_CHUNK_SIZE = 2000
+MAX_PAGE_SIZE = 200
+
+def _parse_bound(value, end=False):
+    """Accept an ISO datetime or a plain date; a date as the end bound covers the whole day"""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        moment = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+def filter_transactions(queryset, params):
+    """Apply the type and date range filters shared by the history and export views"""
+    transaction_types = [t for t in params.get('transaction_type', '').split(',') if t]
+    if transaction_types:
+        valid_types = {choice for choice, _ in Transaction.TRANSACTION_TYPES}
+        invalid = set(transaction_types) - valid_types
+        if invalid:
+            raise ValueError(f'Invalid transaction type: {", ".join(sorted(invalid))}')
+        queryset = queryset.filter(transaction_type__in=transaction_types)
+
+    if params.get('date_from'):
+        queryset = queryset.filter(created_at__gte=_parse_bound(params['date_from']))
+    if params.get('date_to'):
+        date_to = params['date_to']
+        if parse_datetime(date_to) is None:
+            queryset = queryset.filter(created_at__lt=_parse_bound(date_to, end=True))
+        else:
+            queryset = queryset.filter(created_at__lte=_parse_bound(date_to))
+    return queryset
+
+def _export_rows(queryset):
+    # values_list + iterator: a server-side cursor on PostgreSQL, no model instances
+    rows = queryset.order_by('-created_at', '-pk').values_list(*EXPORT_FIELDS)
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield dict(zip(EXPORT_FIELDS, row))
+
+class _Echo:
+    """File-like object that hands csv.writer output straight back"""
+
+    def write(self, value):
+        return value
+
+def stream_transactions_csv(queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in _export_rows(queryset):
+        yield writer.writerow([
+            row['id'],
+            row['created_at'].isoformat(),
+            row['transaction_type'],
+            str(row['amount']),
+            row['description'],
+            row['reference']
+        ])
+
+def stream_transactions_ndjson(queryset):
+    for row in _export_rows(queryset):
+        row['created_at'] = row['created_at'].isoformat()
+        row['amount'] = str(row['amount'])
+        yield json.dumps(row) + '\n'
@@ -1,9 +1,13 @@
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from apps.core.pagination import cursor_paginate, parse_limit, InvalidCursor
 from .models import Wallet, Transaction
 from .serializers import WalletSerializer, TransactionSerializer
+from .utils import filter_transactions, stream_transactions_csv, stream_transactions_ndjson, MAX_PAGE_SIZE
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,12 +23,51 @@ def wallet_view(request):
 @permission_classes([IsAuthenticated])
 def transaction_history_view(request):
     wallet, created = Wallet.objects.get_or_create(user=request.user)
-    transactions = Transaction.objects.filter(wallet=wallet)
-    serializer = TransactionSerializer(transactions, many=True)
-    return Response(serializer.data)
+
+    try:
+        transactions = filter_transactions(Transaction.objects.filter(wallet=wallet), request.GET)
+        # Keyset pages when a cursor is passed (even an empty one), the full list otherwise
+        if 'cursor' not in request.GET:
+            return Response(TransactionSerializer(transactions, many=True).data)
+        limit = parse_limit(request.GET.get('limit'), 50, MAX_PAGE_SIZE)
+        cursor_page = cursor_paginate(transactions, request.GET.get('cursor'), limit)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = TransactionSerializer(cursor_page.items, many=True)
+    return Response({
+        'results': serializer.data,
+        'next': cursor_page.next_cursor,
+        'previous': cursor_page.previous_cursor
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_transactions_view(request):
+    """Stream the filtered transaction history as CSV or NDJSON"""
+    export_format = request.GET.get('export_format', 'csv')
+    if export_format not in ['csv', 'ndjson']:
+        return Response({'error': 'export_format must be csv or ndjson'}, status=status.HTTP_400_BAD_REQUEST)
+
+    wallet, created = Wallet.objects.get_or_create(user=request.user)
+    try:
+        transactions = filter_transactions(Transaction.objects.filter(wallet=wallet), request.GET)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if export_format == 'csv':
+        response = StreamingHttpResponse(stream_transactions_csv(transactions), content_type='text/csv')
+    else:
+        response = StreamingHttpResponse(stream_transactions_ndjson(transactions), content_type='application/x-ndjson')
+
+    filename = f'transactions_{timezone.now():%Y%m%d}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def balance_view(request):
     wallet, created = Wallet.objects.get_or_create(user=request.user)
-    return Response({'balance': float(wallet.balance)})
\ No newline at end of file
+    return Response({'balance': float(wallet.balance)})
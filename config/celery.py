@@ -14,4 +14,48 @@ app.conf.beat_schedule = {
         'task': 'apps.users.tasks.cleanup_expired_tokens',
         'schedule': 3600.0,  # Every hour
     },
+    'flush-task-activity-logs': {
+        'task': 'apps.tasks.tasks.flush_task_activity_logs',
+        'schedule': 5.0,  # Every 5 seconds
+    },
+    'expire-overdue-tasks': {
+        'task': 'apps.tasks.tasks.expire_overdue_tasks',
+        'schedule': 300.0,  # Every 5 minutes
+    },
+    'reconcile-daily-assignment-counters': {
+        'task': 'apps.tasks.tasks.reconcile_daily_assignment_counters',
+        'schedule': 3600.0,  # Every hour
+    },
+    'snapshot-wallet-balances': {
+        'task': 'apps.wallets.tasks.snapshot_wallet_balances',
+        'schedule': 86400.0,  # Daily
+    },
+    'process-stripe-events': {
+        'task': 'apps.payments.tasks.process_stripe_events',
+        'schedule': 60.0,  # Sweep retries and anything the webhook could not queue
+    },
+    'process-withdrawals': {
+        'task': 'apps.payments.tasks.process_withdrawals',
+        'schedule': 60.0,  # Every minute
+    },
+    'pay-referral-bonuses': {
+        'task': 'apps.referrals.tasks.pay_referral_bonuses',
+        'schedule': 3600.0,  # Every hour
+    },
+    'reconcile-wallet-ledger': {
+        'task': 'apps.wallets.tasks.reconcile_wallet_ledger',
+        'schedule': 86400.0,  # Nightly
+    },
+    'update-daily-financial-rollups': {
+        'task': 'apps.admin_panel.tasks.update_daily_financial_rollups',
+        'schedule': 120.0,  # Every 2 minutes
+    },
+    'rebuild-recent-financial-rollups': {
+        'task': 'apps.admin_panel.tasks.rebuild_recent_financial_rollups',
+        'schedule': 86400.0,  # Nightly
+    },
+    'poll-payment-statuses': {
+        'task': 'apps.payments.tasks.poll_payment_statuses',
+        'schedule': 30.0,  # Every 30 seconds
+    },
 }
\ No newline at end of file
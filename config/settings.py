@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -16,6 +17,11 @@ ALLOWED_HOSTS = [
     '.onrender.com',  # ✅ Allows all Render subdomains (e.g., your-app.onrender.com)
 ]
 
+# Proxies in front of the app that append to X-Forwarded-For (Render's load
+# balancer is one; Render sets RENDER=true). Client IPs for rate limits and
+# login records are read from that header only when this is above zero.
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', '1' if os.getenv('RENDER') else '0'))
+
 # Application definition
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -68,7 +74,6 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',  # Add this line
     'apps.core.middleware.SessionControlMiddleware',
-    'apps.core.middleware.FraudDetectionMiddleware',
     'apps.core.middleware.RateLimitMiddleware',
     'apps.core.middleware.SubscriptionVerificationMiddleware',
 ]
@@ -143,19 +148,13 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
-    ],
-    'DEFAULT_THROTTLE_RATES': {
-        'anon': '100/hour',
-        'user': '5000/hour'
-    }
+    # Rate limiting is done once, in apps.core.middleware.RateLimitMiddleware
+    'DEFAULT_THROTTLE_CLASSES': [],
 }
 
 # JWT settings
@@ -166,6 +165,9 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': True,
+    # Access tokens carry entitlement claims (see apps.authentication.entitlements)
+    'TOKEN_OBTAIN_SERIALIZER': 'apps.authentication.tokens.EntitlementTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.authentication.tokens.EntitlementTokenRefreshSerializer',
 }
 
 # Email settings (optional for development)
@@ -183,16 +185,85 @@ CORS_ALLOWED_ORIGINS = [
     # "https://freelancer-frontend.onrender.com",
 ]
 
+# Celery: tasks run inline under `manage.py test`, which has no broker
+CELERY_TASK_ALWAYS_EAGER = sys.argv[1:2] == ['test']
+
 # Session settings
 SESSION_COOKIE_AGE = 3600  # 1 hour
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 SESSION_SAVE_EVERY_REQUEST = True
 
 # Cache settings
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            },
+        }
     }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Request rate limits (see apps.core.ratelimit). 'redis' shares the counters
+# between workers and needs REDIS_URL; 'local' counts per process
+RATE_LIMITS = {
+    'BACKEND': 'redis' if REDIS_URL else 'local',
+    'ANON_RATE': '100/hour',
+    'USER_RATE': '5000/hour',
+    'POLICIES': [
+        {'name': 'stripe_webhook', 'prefix': '/api/payments/webhook/', 'rate': None},
+        {'name': 'login', 'prefix': '/api/auth/login/', 'rate': '20/minute', 'scope': 'ip'},
+        {'name': 'token', 'prefix': '/api/token/', 'rate': '20/minute', 'scope': 'ip'},
+    ],
+}
+
+# Task activity log buffering: 'sync' writes inside the request (durable),
+# 'memory' batches per process (events are lost if a worker is killed),
+# 'redis' batches in a shared list flushed by Celery beat (durable)
+TASK_ACTIVITY_LOG = {
+    'BACKEND': os.getenv('TASK_ACTIVITY_LOG_BACKEND', 'sync'),
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+}
+
+# Single-session registry (see apps.core.sessions): the active session per user
+# lives in Redis ('local' keeps it per process) and SessionControl rows are
+# written behind in batches
+SESSION_CONTROL = {
+    'BACKEND': 'redis' if REDIS_URL else 'local',
+    'FLUSH_INTERVAL': 30.0,
+    'BATCH_SIZE': 500,
+}
+
+# Status polling for payment methods without webhooks (see apps.payments.polling)
+# The fake provider settles 'fake' deposits at random; opt in explicitly for local runs
+PAYMENT_STATUS_POLLING = {
+    'PROVIDERS': (
+        {'fake': 'apps.payments.polling.FakeStatusProvider'}
+        if os.getenv('PAYMENT_STATUS_FAKE_PROVIDER') == 'true' else {}
+    ),
+    'CONCURRENCY': 20,
+}
+
+# Worker id (0-1023) for apps.core.ids, unique per process; leave unset to lease
+# one per process from the shared cache
+ID_WORKER_ID = os.getenv('ID_WORKER_ID')
+
+# Withdrawal payouts: PROVIDER is a dotted path to a PayoutProvider subclass.
+# Unset means withdrawals stay pending; the fake provider is refused unless DEBUG
+PAYOUTS = {
+    'PROVIDER': os.getenv('PAYOUT_PROVIDER'),
+    'BATCH_SIZE': 100,
+    'CONCURRENCY': 8,
 }
 
 # Logging
@@ -215,4 +286,15 @@ STRIPE_PUBLISHABLE_KEY = os.getenv('STRIPE_PUBLISHABLE_KEY', '')
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY', '')
 STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET', '')
 
+# Outbound payment provider calls: pooled connections, strict timeouts,
+# bounded concurrency and a circuit breaker (see apps.payments.gateway)
+PAYMENT_GATEWAY = {
+    'BACKEND': os.getenv('PAYMENT_GATEWAY_BACKEND', 'apps.payments.gateway.StripeGateway'),
+    'CONNECT_TIMEOUT': 3.0,
+    'READ_TIMEOUT': 10.0,
+    'MAX_CONCURRENCY': 10,
+    'FAILURE_THRESHOLD': 5,
+    'RESET_TIMEOUT': 30.0,
+}
+
 AUTH_USER_MODEL = 'users.User'
\ No newline at end of file